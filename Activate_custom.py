@@ -16,13 +16,9 @@
 
 import os
 import sys
-import textwrap
-
-from CommonEnvironment.CallOnExit import CallOnExit
 
 sys.path.insert(0, os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"))
 from RepositoryBootstrap.SetupAndActivate import CommonEnvironment, CurrentShell
-from RepositoryBootstrap.Impl.ActivationActivity import ActivationActivity
 
 del sys.path[0]
 
@@ -34,7 +30,13 @@ _script_dir, _script_name                   = os.path.split(_script_fullpath)
 # Ensure that we are loading custom data from this dir and not some other repository.
 sys.modules.pop("_custom_data", None)
 
-from _custom_data import _CUSTOM_DATA
+from _custom_data import _CUSTOM_DATA, _MERKLE_ROOTS
+
+import _activation_plan
+import _activation_script
+import _background_verification
+import _kit_operations
+import _trace
 
 # <Class '<name>' has no '<attr>' member> pylint: disable = E1101
 # <Unrearchable code> pylint: disable = W0101
@@ -63,183 +65,135 @@ def GetCustomActions(
 
     actions = []
 
-    if fast:
-        actions.append(
-            CurrentShell.Commands.Message(
-                "** FAST: Activating without verifying content. ({})".format(
-                    _script_fullpath,
-                ),
-            ),
-        )
-    else:
-        if CurrentShell.CategoryName == "Windows":
-            # Verify install binaries
-            for name, version, path_parts in _CUSTOM_DATA:
-                this_dir = os.path.join(*([_script_dir] + path_parts))
-                assert os.path.isdir(this_dir), this_dir
-
-                actions += [
-                    CurrentShell.Commands.Execute(
-                        'python "{script}" Verify "{name}" "{dir}" "{version}"'.format(
-                            script=os.path.join(
-                                os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"),
-                                "RepositoryBootstrap",
-                                "SetupAndActivate",
-                                "AcquireBinaries.py",
-                            ),
-                            name=name,
-                            dir=this_dir,
-                            version=version,
-                        ),
+    with _trace.Session("Activate", configuration=configuration, fast=fast):
+        if fast:
+            actions.append(
+                CurrentShell.Commands.Message(
+                    "** FAST: Activating without verifying content. ({})".format(
+                        _script_fullpath,
                     ),
-                ]
-
-        if configuration != "noop":
-            library_version_info = version_specs.Libraries.get("Windows Kits", {})
-
-            # Add the Windows Kit
-            windows_kit_dir = os.path.join(_script_dir, "Libraries", "Windows Kits", "10")
-            assert os.path.isdir(windows_kit_dir), windows_kit_dir
-
-            actions += [
-                # These values are typically set when activating a Visual Studio environment.
-                CurrentShell.Commands.Set("WindowsSkdDir", windows_kit_dir),
-                CurrentShell.Commands.Set("UniversalCRTSdkDir", windows_kit_dir),
-                CurrentShell.Commands.Set(
-                    "ExtensionSdkDir",
-                    os.path.join(windows_kit_dir, "Extension SDKs"),
                 ),
-            ]
-
-            # Binaries
-            windows_kit_bin_dir = ActivationActivity.GetVersionedDirectory(
-                library_version_info,
-                windows_kit_dir,
-                "bin",
             )
-            assert os.path.isdir(windows_kit_bin_dir), windows_kit_bin_dir
-
-            windows_kit_bin_dir = os.path.join(windows_kit_bin_dir, configuration)
-            assert os.path.isdir(windows_kit_bin_dir), windows_kit_bin_dir
-
-            actions += [
-                CurrentShell.Commands.AugmentPath(windows_kit_bin_dir),
-                CurrentShell.Commands.AugmentPath(
-                    os.path.join(windows_kit_bin_dir, "ucrt"),
-                ),
-            ]
-
-            # Includes
-            windows_kit_include_dir = ActivationActivity.GetVersionedDirectory(
-                library_version_info,
-                windows_kit_dir,
-                "Include",
-            )
-            assert os.path.isdir(windows_kit_include_dir), windows_kit_include_dir
-
-            new_includes = []
-
-            for include_name in ["shared", "ucrt", "um"]:
-                this_include_dir = os.path.join(windows_kit_include_dir, include_name)
-                if os.path.isdir(this_include_dir):
-                    new_includes.append(this_include_dir)
-
-            if new_includes:
-                actions.append(CurrentShell.Commands.Augment("INCLUDE", new_includes))
-
-            # Libs
-            windows_kit_lib_dir = ActivationActivity.GetVersionedDirectory(
-                library_version_info,
-                windows_kit_dir,
-                "Lib",
-            )
-            assert os.path.isdir(windows_kit_lib_dir), windows_kit_lib_dir
-
-            new_libs = []
-
-            for lib_name in ["ucrt", "um"]:
-                this_lib_dir = os.path.join(windows_kit_lib_dir, lib_name, configuration)
-                if os.path.isdir(this_lib_dir):
-                    new_libs.append(this_lib_dir)
-
-            if new_libs:
-                actions.append(CurrentShell.Commands.Augment("LIB", new_libs))
-
-            # Additional setup
-
-            # ----------------------------------------------------------------------
-            def IsAdditionalSetupComplete():
-                if os.path.isfile(os.path.join(_script_dir, "admin_setup.complete")):
-                    return True
-
-                # Don't prompt if the key already exists
-                import winreg
-
-                try:
-                    key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"Software\WOW6432Node\Microsoft\Microsoft SDKs\Windows\v10.0")
-                    if key is None:
-                        return False
-
-                    with CallOnExit(lambda: winreg.CloseKey(key)):
-                        for value_name in [
-                            "InstallationFolder",
-                            "ProductName",
-                            "ProductVersion",
-                        ]:
-                            # The following line will raise an exception if the value does not exist
-                            value = winreg.QueryValueEx(key, value_name)
-
-                    return True
-
-                except FileNotFoundError:
-                    return False
-
-            # ----------------------------------------------------------------------
-
-            if not IsAdditionalSetupComplete():
-                actions.append(
-                    CurrentShell.Commands.Message(
-                        "\n".join(
-                            [
-                                "        {}".format(line) for line in textwrap.dedent(
-                                    """\
+        else:
+            plan = None
+            script_filename = None
+
+            if configuration != "noop":
+                library_version_info = version_specs.Libraries.get("Windows Kits", {})
+
+                # The script written by Setup (or a previous activation) makes all of the
+                # environment changes when it is current, so the plan isn't needed for them.
+                with _trace.Span("GetScript"):
+                    script_filename = _activation_script.GetScript(configuration, library_version_info)
+
+                # The plan identifies the content used by the configuration, which is the only
+                # content that is verified (it can't be created until the kit is installed).
+                if (
+                    not _background_verification.IsEnabled()
+                    and _kit_operations.HasManifest(_activation_plan.GetKitDir())
+                ):
+                    plan = _GetPlan(generated_dir, configuration, library_version_info)
+
+            # The kit is only installed on other platforms for cross-compiling configurations
+            if CurrentShell.CategoryName == "Windows" or configuration != "noop":
+                architectures = [configuration] if configuration != "noop" else None
+
+                # Verify install binaries
+                for name, version, path_parts in _CUSTOM_DATA:
+                    this_dir = os.path.join(*([_script_dir] + path_parts))
+                    assert os.path.isdir(this_dir), this_dir
+
+                    # Kits without a recorded root are verified against the manifest written
+                    # when their content was verified against `version`.
+                    merkle_root = _MERKLE_ROOTS.get(version)
+
+                    if _background_verification.IsEnabled():
+                        # Report the result of the previous verification and verify the kit
+                        # without blocking activation.
+                        message = _background_verification.Report(this_dir, version)
+                        if message is not None:
+                            actions.append(CurrentShell.Commands.Message(message))
+
+                        with _trace.Span("StartBackgroundVerification", name=name):
+                            _background_verification.Start(name, this_dir, version, architectures)
+
+                        continue
+
+                    if _kit_operations.HasManifest(this_dir):
+                        # Only the content used by the configuration is verified when the plan
+                        # describes this kit.
+                        if plan is not None and os.path.normcase(plan.kit_dir) == os.path.normcase(this_dir):
+                            subtrees = plan.content_dirs
+                        else:
+                            subtrees = None
+
+                        # Only files whose stat information has changed since Setup are rehashed
+                        result = _kit_operations.Verify(
+                            name,
+                            this_dir,
+                            version,
+                            architectures=architectures,
+                            subtrees=subtrees,
+                            merkle_root=merkle_root,
+                        )
+                        if not result.IsSuccessful:
+                            raise Exception(str(result))
+
+                        continue
+
+                    # Kits installed before manifests were available are verified by AcquireBinaries
+                    command_line = 'python "{script}" Verify "{name}" "{dir}" "{version}"'.format(
+                        script=os.path.join(
+                            os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"),
+                            "RepositoryBootstrap",
+                            "SetupAndActivate",
+                            "AcquireBinaries.py",
+                        ),
+                        name=name,
+                        dir=this_dir,
+                        version=version,
+                    )
 
-                                    # ----------------------------------------------------------------------
-                                    # ----------------------------------------------------------------------
+                    if _trace.IsEnabled():
+                        # Run the command here rather than in the shell so that it is part of the trace
+                        return_code, output = _trace.Execute("AcquireBinaries Verify", command_line)
+                        if return_code != 0:
+                            raise Exception(output)
 
-                                    WARNING ({}):
+                        continue
 
-                                    This repository includes setup activities that must be run as an administrator.
-                                    This additional setup is not required for all development activities, but is required
-                                    for the following:
+                    actions.append(CurrentShell.Commands.Execute(command_line))
 
-                                        - For external tools that use the registry to detect Windows Kits instances
+            if configuration != "noop":
+                if script_filename is not None:
+                    actions.append(CurrentShell.Commands.Call(script_filename))
+                    return actions
 
-                                    This warning is otherwise safe to ignore.
+                if plan is None:
+                    plan = _GetPlan(generated_dir, configuration, library_version_info)
 
-                                    To complete these optional setup activities:
+                actions += _activation_plan.CreateActions(plan)
 
-                                        1) Launch a command prompt with administrator rights:
-                                            - Windows Key
-                                            - Type "cmd"
-                                            - Right click and select "Run as Administrator"
+                # PATH, INCLUDE, and LIB are only augmented with the dirs that they don't already
+                # contain, so activating repeatedly never grows them.
+                actions += _activation_plan.CreateEnvironmentActions(plan)
 
-                                        2) Run "{}"
+                # Write the scripts so that subsequent activations can source them directly
+                with _trace.Span("WriteScript"):
+                    _activation_script.Write(configuration, library_version_info, plan)
 
-                                    # ----------------------------------------------------------------------
-                                    # ----------------------------------------------------------------------
+    return actions
 
-                                    """,
-                                ).format(
-                                    _script_dir,
-                                    os.path.join(_script_dir, "admin_setup.cmd"),
-                                ).split("\n")
-                            ],
-                        ),
-                    ),
-                )
 
-    return actions
+# ----------------------------------------------------------------------
+def _GetPlan(generated_dir, configuration, library_version_info):
+    # The plan is cached in the generated dir and only recreated when the configuration,
+    # version specs, installed kit, or admin setup state change.
+    return _activation_plan.GetPlan(
+        generated_dir,
+        configuration,
+        library_version_info,
+    )
 
 
 # ----------------------------------------------------------------------
@@ -0,0 +1,555 @@
+# ----------------------------------------------------------------------
+# |
+# |  Benchmark.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Measures the Setup and Activate hot paths against a synthetic kit.
+
+The repository's modules are copied to a temporary workspace along with a generated kit
+(committed parts and an installed versioned bin/Include/Lib tree) of configurable size.
+The stand-ins in the StandIns directory replace CommonEnvironment and RepositoryBootstrap,
+so the benchmarks run on any platform (including Linux machines where Common_Environment
+has not been set up).
+
+Results are written as JSON; provide '--compare <previous results>' to compare the results
+with those of a previous run (for example, one made at a different commit).
+
+Usage:
+
+    python Benchmark.py [--num-files <n>] [--file-size <bytes>] [--repeat <n>] [--output <filename>]
+"""
+
+import argparse
+import datetime
+import glob
+import hashlib
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+from contextlib import redirect_stdout
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = os.path.realpath(__file__)
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+REPO_DIR                                    = os.path.dirname(_script_dir)
+STAND_INS_DIR                               = os.path.join(_script_dir, "StandIns")
+
+KIT_NAME                                    = "Windows Kits - Benchmark"
+KIT_VERSION_DIRNAME                         = "10.0.17763.0"
+KIT_PATH_PARTS                              = ["Libraries", "Windows Kits", "10"]
+
+RESULTS_FORMAT_VERSION                      = 1
+
+_CONFIGURATIONS                             = ["x64", "x86"]
+
+
+# ----------------------------------------------------------------------
+def Main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+
+    parser.add_argument("--num-files", type=int, default=2000, help="Number of files in the synthetic kit")
+    parser.add_argument("--file-size", type=int, default=16 * 1024, help="Size of each file in the synthetic kit")
+    parser.add_argument("--part-size", type=int, default=8 * 1024 * 1024, help="Size of each '_Install.7z.NNN' part")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times that each benchmark is run")
+    parser.add_argument("--output", default="BenchmarkResults.json", help="Name of the JSON results file")
+    parser.add_argument("--compare", help="Results of a previous run to compare against")
+    parser.add_argument("--workspace", help="Directory for the synthetic kit (a temporary directory by default)")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the workspace when complete")
+
+    args = parser.parse_args()
+
+    workspace = args.workspace or tempfile.mkdtemp(prefix="WindowsKitsBenchmark_")
+
+    try:
+        sys.stdout.write("Creating the synthetic kit in '{}'...".format(workspace))
+        sys.stdout.flush()
+
+        kit_info = CreateWorkspace(
+            workspace,
+            args.num_files,
+            args.file_size,
+            args.part_size,
+        )
+
+        sys.stdout.write("DONE\n\n")
+
+        results = RunBenchmarks(workspace, kit_info, args.repeat)
+
+        content = {
+            "format": RESULTS_FORMAT_VERSION,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "commit": _GetCommit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                "num_files": args.num_files,
+                "file_size": args.file_size,
+                "part_size": args.part_size,
+                "repeat": args.repeat,
+            },
+            "kit": kit_info,
+            "results": results,
+        }
+
+        with open(args.output, "w") as f:
+            json.dump(content, f, indent=2, sort_keys=True)
+
+        sys.stdout.write("\nResults were written to '{}'.\n".format(args.output))
+
+        if args.compare:
+            with open(args.compare) as f:
+                previous = json.load(f)
+
+            sys.stdout.write("\n{}".format(Compare(previous, content)))
+
+    finally:
+        if not args.keep and not args.workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+def CreateWorkspace(
+    workspace,
+    num_files,
+    file_size,
+    part_size,
+):
+    """\
+    Copies the repository's modules to the workspace and creates a synthetic kit; returns
+    information about the kit.
+    """
+
+    # The workspace may be provided on the command line
+    os.makedirs(workspace, exist_ok=True)
+
+    for filename in glob.glob(os.path.join(REPO_DIR, "*.py")):
+        shutil.copy2(filename, workspace)
+
+    # Skip the winreg probe made when the admin setup state is unknown
+    with open(os.path.join(workspace, "admin_setup.complete"), "w"):
+        pass
+
+    kit_dir = os.path.join(workspace, *KIT_PATH_PARTS)
+    os.makedirs(kit_dir)
+
+    content_dir = os.path.join(workspace, "_content")
+    total_size = _CreateContent(content_dir, num_files, file_size)
+
+    seven_zip = shutil.which("7z") or shutil.which("7za")
+
+    # Create the parts
+    archive_filename = os.path.join(workspace, "_Install.7z")
+
+    if seven_zip:
+        subprocess.check_call(
+            [seven_zip, "a", "-mx=1", "-bd", archive_filename, "."],
+            cwd=content_dir,
+            stdout=subprocess.DEVNULL,
+        )
+    else:
+        # Reconstruct can still be measured with parts that aren't a 7z archive
+        with open(archive_filename, "wb") as f:
+            for root, _, filenames in os.walk(content_dir):
+                for filename in sorted(filenames):
+                    with open(os.path.join(root, filename), "rb") as source:
+                        shutil.copyfileobj(source, f)
+
+    hasher = hashlib.sha256()
+    num_parts = 0
+
+    with open(archive_filename, "rb") as source:
+        while True:
+            block = source.read(part_size)
+            if not block:
+                break
+
+            hasher.update(block)
+            num_parts += 1
+
+            with open(os.path.join(kit_dir, "_Install.7z.{:03d}".format(num_parts)), "wb") as f:
+                f.write(block)
+
+    os.remove(archive_filename)
+
+    version = hasher.hexdigest()
+
+    # The installed kit
+    for item in os.listdir(content_dir):
+        shutil.move(os.path.join(content_dir, item), kit_dir)
+
+    os.rmdir(content_dir)
+
+    # Installs and activation are verified against the root recorded for the kit
+    merkle_root = _CalculateMerkleRoot(workspace, kit_dir, version)
+
+    with open(os.path.join(workspace, "_custom_data.py"), "w") as f:
+        f.write(
+            "_CUSTOM_DATA = [({!r}, {!r}, {!r})]\n_MERKLE_ROOTS = {{{!r}: {!r}}}\n".format(
+                KIT_NAME,
+                version,
+                KIT_PATH_PARTS,
+                version,
+                merkle_root,
+            ),
+        )
+
+    return {
+        "num_files": num_files,
+        "num_bytes": total_size,
+        "num_parts": num_parts,
+        "version": version,
+        "merkle_root": merkle_root,
+        "can_install": bool(seven_zip),
+    }
+
+
+# ----------------------------------------------------------------------
+def RunBenchmarks(workspace, kit_info, repeat):
+    """Returns a dict of benchmark name -> timing information"""
+
+    os.environ["DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"] = STAND_INS_DIR
+
+    sys.path.insert(0, STAND_INS_DIR)
+    sys.path.insert(0, workspace)
+
+    kit_dir = os.path.join(workspace, *KIT_PATH_PARTS)
+    generated_dir = os.path.join(workspace, "Generated")
+
+    _kit_manifest = importlib.import_module("_kit_manifest")
+    _kit_operations = importlib.import_module("_kit_operations")
+    _activation_script = importlib.import_module("_activation_script")
+
+    Activate_custom = importlib.import_module("Activate_custom")
+    Setup_custom = importlib.import_module("Setup_custom")
+
+    name = KIT_NAME
+    version = kit_info["version"]
+
+    # ----------------------------------------------------------------------
+    def Reconstruct():
+        output_filename = os.path.join(workspace, "Install.7z")
+
+        _kit_operations.Reconstruct(name, kit_dir, output_filename)
+        os.remove(output_filename)
+
+    # ----------------------------------------------------------------------
+    def Install():
+        result = _kit_operations.Install(name, kit_dir, version, force=True, merkle_root=kit_info["merkle_root"])
+        assert result.IsSuccessful, result
+
+    # ----------------------------------------------------------------------
+    def CreateManifest():
+        _kit_manifest.Create(name, version, kit_dir).Save(kit_dir)
+
+    # ----------------------------------------------------------------------
+    def Verify(force):
+        result = _kit_operations.Verify(name, kit_dir, version, force=force, merkle_root=kit_info["merkle_root"])
+        assert result.IsSuccessful, result
+
+    # ----------------------------------------------------------------------
+    def Setup():
+        Setup_custom.GetCustomActions(False, False, [])
+
+    # ----------------------------------------------------------------------
+    def RemoveInstall():
+        # Setup doesn't install a kit whose manifest is current, so remove everything other than
+        # the committed parts (including the manifest) to measure a complete install.
+        for item in os.listdir(kit_dir):
+            if item.startswith("_Install.7z."):
+                continue
+
+            fullpath = os.path.join(kit_dir, item)
+
+            if os.path.isdir(fullpath) and not os.path.islink(fullpath):
+                shutil.rmtree(fullpath)
+            else:
+                os.remove(fullpath)
+
+    # ----------------------------------------------------------------------
+    def Activate(fast):
+        return Activate_custom.GetCustomActions(
+            sys.stdout,
+            "x64",
+            _VersionSpecs(),
+            generated_dir,
+            False,
+            False,
+            fast,
+            [],
+            False,
+        )
+
+    # ----------------------------------------------------------------------
+    def RemoveActivationState():
+        for dirname in [generated_dir, _activation_script.GetScriptsDir()]:
+            if os.path.isdir(dirname):
+                shutil.rmtree(dirname)
+
+    # ----------------------------------------------------------------------
+
+    benchmarks = [
+        ("reconstruct", Reconstruct, None),
+        ("install", Install if kit_info["can_install"] else None, None),
+        ("manifest_create", CreateManifest, None),
+        ("verify_warm", lambda: Verify(False), None),
+        ("verify_force", lambda: Verify(True), None),
+        ("setup", Setup if kit_info["can_install"] else None, RemoveInstall),
+        ("setup_warm", Setup, None),
+        ("activate_cold", lambda: Activate(False), RemoveActivationState),
+        ("activate_warm", lambda: Activate(False), None),
+        ("activate_fast", lambda: Activate(True), None),
+    ]
+
+    results = {}
+
+    for benchmark_name, func, prepare_func in benchmarks:
+        sys.stdout.write("{:<20}".format(benchmark_name))
+        sys.stdout.flush()
+
+        if func is None:
+            sys.stdout.write("skipped (7-Zip was not found)\n")
+            results[benchmark_name] = None
+
+            continue
+
+        timings = []
+
+        for _ in range(repeat):
+            if prepare_func is not None:
+                prepare_func()
+
+            # Progress written by Setup isn't part of the results
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+
+        results[benchmark_name] = {
+            "runs": timings,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+            "max": max(timings),
+        }
+
+        sys.stdout.write(
+            "min {:>10.4f}s  median {:>10.4f}s  max {:>10.4f}s\n".format(
+                results[benchmark_name]["min"],
+                results[benchmark_name]["median"],
+                results[benchmark_name]["max"],
+            ),
+        )
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def Compare(previous, current):
+    """Returns a description of the change in median times between two results"""
+
+    lines = [
+        "{:<20}{:>14}{:>14}{:>10}".format("", previous.get("commit") or "previous", current.get("commit") or "current", "change"),
+    ]
+
+    for benchmark_name, result in current["results"].items():
+        previous_result = previous["results"].get(benchmark_name)
+
+        if not result or not previous_result:
+            lines.append("{:<20}{:>14}".format(benchmark_name, "n/a"))
+            continue
+
+        lines.append(
+            "{:<20}{:>13.4f}s{:>13.4f}s{:>+9.1f}%".format(
+                benchmark_name,
+                previous_result["median"],
+                result["median"],
+                (result["median"] - previous_result["median"]) / previous_result["median"] * 100.0,
+            ),
+        )
+
+    return "".join("{}\n".format(line) for line in lines)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _VersionSpecs(object):
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self.Tools                          = {}
+        self.Libraries                      = {}
+
+
+# ----------------------------------------------------------------------
+def _GetCommit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ----------------------------------------------------------------------
+def _CalculateMerkleRoot(workspace, kit_dir, version):
+    """Returns the Merkle root of the synthetic kit, which is the content of the parts"""
+
+    sys.path.insert(0, STAND_INS_DIR)
+    sys.path.insert(0, workspace)
+
+    try:
+        _kit_manifest = importlib.import_module("_kit_manifest")
+        _merkle_tree = importlib.import_module("_merkle_tree")
+
+        return _kit_manifest.Create(KIT_NAME, version, kit_dir).MerkleNodes[_merkle_tree.ROOT_NODE]
+
+    finally:
+        del sys.path[:2]
+
+
+# ----------------------------------------------------------------------
+def _CreateContent(content_dir, num_files, file_size):
+    """\
+    Creates a versioned bin/Include/Lib tree modeled on the kit; returns the total size.
+
+    Half of the files are headers spread across the include subdirs, a quarter are binaries,
+    and a quarter are import libraries with a valid COFF symbol table.
+    """
+
+    dirs = {
+        "bin": [
+            os.path.join("bin", KIT_VERSION_DIRNAME, configuration, subdir)
+            for configuration in _CONFIGURATIONS
+            for subdir in ["", "ucrt"]
+        ],
+        "include": [
+            os.path.join("Include", KIT_VERSION_DIRNAME, subdir)
+            for subdir in ["shared", "ucrt", "um", "winrt"]
+        ],
+        "lib": [
+            os.path.join("Lib", KIT_VERSION_DIRNAME, subdir, configuration)
+            for subdir in ["ucrt", "um"]
+            for configuration in _CONFIGURATIONS
+        ],
+    }
+
+    for dirnames in dirs.values():
+        for dirname in dirnames:
+            os.makedirs(os.path.join(content_dir, dirname), exist_ok=True)
+
+    total_size = 0
+
+    for index in range(num_files):
+        if index % 4 in [0, 1]:
+            dirname = dirs["include"][index % len(dirs["include"])]
+            filename = "header{:06d}.h".format(index)
+            content = os.urandom(file_size)
+
+        elif index % 4 == 2:
+            dirname = dirs["bin"][index % len(dirs["bin"])]
+            filename = "tool{:06d}.exe".format(index)
+            content = os.urandom(file_size)
+
+        else:
+            dirname = dirs["lib"][index % len(dirs["lib"])]
+            filename = "lib{:06d}.lib".format(index)
+            content = _CreateArchive(index, file_size)
+
+        with open(os.path.join(content_dir, dirname, filename), "wb") as f:
+            f.write(content)
+
+        total_size += len(content)
+
+    return total_size
+
+
+# ----------------------------------------------------------------------
+def _CreateArchive(index, file_size):
+    """Returns the content of a COFF archive whose members each export a number of symbols"""
+
+    num_members = 4
+    symbols_per_member = 16
+
+    member_content = os.urandom(max(file_size // num_members, 2) & ~1)
+
+    # ----------------------------------------------------------------------
+    def Header(name, size):
+        return "{:<16}{:<12}{:<6}{:<6}{:<8}{:<10}`\n".format(name, 0, 0, 0, 0, size).encode("ascii")
+
+    # ----------------------------------------------------------------------
+
+    symbols = [
+        (
+            "__imp_Func{:06d}_{}_{}".format(index, member_index, symbol_index).encode("ascii"),
+            member_index,
+        )
+        for member_index in range(num_members)
+        for symbol_index in range(symbols_per_member)
+    ]
+
+    string_table = b"".join(name + b"\0" for name, _ in symbols)
+
+    linker_member_size = 4 + 4 * len(symbols) + len(string_table)
+    linker_member_size += linker_member_size & 1
+
+    first_member_offset = 8 + 60 + linker_member_size
+    member_offsets = [
+        first_member_offset + member_index * (60 + len(member_content))
+        for member_index in range(num_members)
+    ]
+
+    linker_member = struct.pack(
+        ">I{}I".format(len(symbols)),
+        len(symbols),
+        *[member_offsets[member_index] for _, member_index in symbols]
+    ) + string_table
+
+    linker_member += b"\0" * (linker_member_size - len(linker_member))
+
+    content = [b"!<arch>\n", Header("/", len(linker_member)), linker_member]
+
+    for member_index in range(num_members):
+        content += [
+            Header("M{:06d}_{}.dll/".format(index, member_index), len(member_content)),
+            member_content,
+        ]
+
+    return b"".join(content)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(Main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,42 @@
+# ----------------------------------------------------------------------
+# |
+# |  CommandLine.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Stand-in for CommonEnvironment.CommandLine.
+
+The decorators are no-ops; the benchmarks invoke the decorated functions directly.
+"""
+
+
+# ----------------------------------------------------------------------
+def EntryPoint(func):
+    return func
+
+
+# ----------------------------------------------------------------------
+def Constraints(**kwargs):
+    return lambda func: func
+
+
+# ----------------------------------------------------------------------
+def _TypeInfo(*args, **kwargs):
+    return None
+
+
+StringTypeInfo                              = _TypeInfo
+IntTypeInfo                                 = _TypeInfo
+EnumTypeInfo                                = _TypeInfo
+DirectoryTypeInfo                           = _TypeInfo
+FilenameTypeInfo                            = _TypeInfo
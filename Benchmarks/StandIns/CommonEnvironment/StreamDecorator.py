@@ -0,0 +1,51 @@
+# ----------------------------------------------------------------------
+# |
+# |  StreamDecorator.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Stand-in for CommonEnvironment.StreamDecorator"""
+
+from contextlib import contextmanager
+
+
+# ----------------------------------------------------------------------
+class StreamDecorator(object):
+
+    # ----------------------------------------------------------------------
+    def __init__(self, stream, *args, **kwargs):
+        self._stream                        = stream
+
+    # ----------------------------------------------------------------------
+    def write(self, content):
+        if self._stream is not None:
+            self._stream.write(content)
+
+    # ----------------------------------------------------------------------
+    def flush(self):
+        if self._stream is not None:
+            self._stream.flush()
+
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def DoneManager(self, *args, **kwargs):
+        dm = _DoneManager(self)
+        yield dm
+
+
+# ----------------------------------------------------------------------
+class _DoneManager(object):
+
+    # ----------------------------------------------------------------------
+    def __init__(self, stream):
+        self.stream                         = stream
+        self.result                         = 0
@@ -0,0 +1,31 @@
+# ----------------------------------------------------------------------
+# |
+# |  __init__.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Stand-in for the portions of CommonEnvironment used by this repository.
+
+Only used by the benchmarks, which must run on machines where Common_Environment has not
+been set up.
+"""
+
+import inspect
+import os
+
+
+# ----------------------------------------------------------------------
+def ThisFullpath():
+    """Returns the fullpath of the caller's file"""
+
+    return os.path.realpath(inspect.stack()[1].filename)
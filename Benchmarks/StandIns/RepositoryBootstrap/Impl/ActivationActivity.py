@@ -0,0 +1,45 @@
+# ----------------------------------------------------------------------
+# |
+# |  ActivationActivity.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Stand-in for RepositoryBootstrap.Impl.ActivationActivity"""
+
+import os
+
+
+# ----------------------------------------------------------------------
+class ActivationActivity(object):
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def GetVersionedDirectory(version_info, *path_components):
+        """Returns the requested version or the latest version in the directory"""
+
+        fullpath = os.path.join(*path_components)
+
+        version = version_info.get(path_components[-1])
+        if version is None:
+            versions = [
+                item
+                for item in os.listdir(fullpath)
+                if os.path.isdir(os.path.join(fullpath, item))
+            ]
+            assert versions, fullpath
+
+            version = max(
+                versions,
+                key=lambda value: tuple(int(part) if part.isdigit() else -1 for part in value.split(".")),
+            )
+
+        return os.path.join(fullpath, version)
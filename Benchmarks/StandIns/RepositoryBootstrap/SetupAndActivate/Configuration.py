@@ -0,0 +1,22 @@
+# ----------------------------------------------------------------------
+# |
+# |  Configuration.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Stand-in for RepositoryBootstrap.SetupAndActivate.Configuration"""
+
+from collections import namedtuple
+
+# ----------------------------------------------------------------------
+Configuration                               = namedtuple("Configuration", ["description", "dependencies"])
+Dependency                                  = namedtuple("Dependency", ["repository_id", "friendly_name", "configuration", "uri"])
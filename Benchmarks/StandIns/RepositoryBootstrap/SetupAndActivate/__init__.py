@@ -0,0 +1,71 @@
+# ----------------------------------------------------------------------
+# |
+# |  __init__.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:05:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Stand-in for RepositoryBootstrap.SetupAndActivate.
+
+CurrentShell reports the "Windows" category so that the Windows code paths are measured on
+any platform; the statements that it generates are Bash statements.
+"""
+
+import os
+
+from collections import namedtuple
+
+import CommonEnvironment
+
+
+# ----------------------------------------------------------------------
+class Commands(object):
+    Set                                     = namedtuple("Set", ["name", "value"])
+    Augment                                 = namedtuple("Augment", ["name", "values"])
+    Message                                 = namedtuple("Message", ["value"])
+    Execute                                 = namedtuple("Execute", ["command_line"])
+    Call                                    = namedtuple("Call", ["command_line"])
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def AugmentPath(value):
+        return Commands.Augment("PATH", value)
+
+
+# ----------------------------------------------------------------------
+class CurrentShell(object):
+    Name                                    = "Bash"
+    CategoryName                            = "Windows"
+    ScriptExtension                         = ".sh"
+    Commands                                = Commands
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def GenerateCommands(cls, commands):
+        lines = []
+
+        for command in commands:
+            if isinstance(command, Commands.Set):
+                lines.append('export {}="{}"'.format(command.name, command.value))
+            elif isinstance(command, Commands.Augment):
+                values = command.values if isinstance(command.values, list) else [command.values]
+                lines.append('export {name}="{values}:${name}"'.format(name=command.name, values=os.pathsep.join(values)))
+            elif isinstance(command, Commands.Message):
+                lines.append("echo '{}'".format(command.value.replace("'", "")))
+            elif isinstance(command, Commands.Execute):
+                lines.append(command.command_line)
+            elif isinstance(command, Commands.Call):
+                lines.append('source "{}"'.format(command.command_line))
+            else:
+                raise Exception("'{}' is not a supported command".format(command))
+
+        return "\n".join(lines)
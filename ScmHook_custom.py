@@ -41,7 +41,8 @@ def OnCommitting(data, output_stream):
     doesn't include the value, it will only be called once.
     """
 
-    return
+    # The content that is about to be committed is in the index
+    return _ValidatePayload([(None, data)], output_stream)
 
 
 # ----------------------------------------------------------------------
@@ -56,7 +57,22 @@ def OnPushing(data, output_stream):
     doesn't include the value, it will only be called once.
     """
 
-    return
+    changes = getattr(data, "changes", None)
+
+    if changes is None:
+        # Validate the complete payload of the revision that is pushed
+        revisions = [("HEAD", None)]
+    else:
+        revisions = []
+
+        for change in changes:
+            revision = getattr(change, "id", None)
+            if revision is None:
+                raise Exception("The revision of a pushed change could not be determined")
+
+            revisions.append((revision, change))
+
+    return _ValidatePayload(revisions, output_stream)
 
 
 # ----------------------------------------------------------------------
@@ -72,3 +88,79 @@ def OnPulled(data, output_stream):
     """
 
     return
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _ValidatePayload(revisions, output_stream):
+    """\
+    Returns -1 if the committed payload of a kit is not consistent with the committed
+    _custom_data.py. `revisions` is a list of (revision, change): the payload is read from the
+    index when the revision is None. Nothing is read from the repository unless the change
+    modifies the payload (or is None), and then only the content that hasn't been validated
+    before is hashed. The payload is read from git, so other working copies (for example,
+    Mercurial clones) aren't validated.
+    """
+
+    # The kit modules import CommonEnvironment directly
+    sys.modules.setdefault("CommonEnvironment", CommonEnvironmentImports.CommonEnvironment)
+
+    sys.path.insert(0, _script_dir)
+
+    import _payload_validation
+
+    del sys.path[0]
+
+    return_code = 0
+
+    for revision, change in revisions:
+        changed_filenames = None
+
+        if change is not None:
+            for attribute_name in ["added", "modified", "removed"]:
+                filenames = getattr(change, attribute_name, None)
+                if filenames is None:
+                    continue
+
+                if changed_filenames is None:
+                    changed_filenames = []
+
+                changed_filenames += filenames
+
+        # Changes that don't modify the payload are skipped without running git
+        if changed_filenames is not None and not _payload_validation.IsAffected(None, changed_filenames):
+            continue
+
+        repository = _payload_validation.Repository.Create(_script_dir, revision)
+        if repository is None:
+            return 0
+
+        # The data is read from the revision (or index) rather than the working tree
+        custom_data, merkle_roots = _payload_validation.LoadCustomData(repository)
+
+        errors = []
+
+        for name, version, path_parts in custom_data:
+            errors += _payload_validation.Validate(
+                name,
+                version,
+                os.path.join(*([_script_dir] + path_parts)),
+                repository,
+                merkle_roots.get(version),
+                changed_filenames=changed_filenames,
+            )
+
+        for error in errors:
+            output_stream.write(
+                "ERROR: {}{}.\n".format(
+                    "" if revision is None else "[{}] ".format(revision),
+                    error,
+                ),
+            )
+
+        if errors:
+            return_code = -1
+
+    return return_code
+
@@ -53,7 +53,11 @@ from RepositoryBootstrap.SetupAndActivate.Configuration import *            # <U
 
 del sys.path[0]
 
-from _custom_data import _CUSTOM_DATA
+from _custom_data import _CUSTOM_DATA, _MERKLE_ROOTS
+
+import _activation_script
+import _setup_scheduler
+import _trace
 
 # ----------------------------------------------------------------------
 # There are two types of repositories: Standard and Mixin. Only one standard
@@ -113,6 +117,22 @@ def GetDependencies():
                 ],
             )
 
+    else:
+        # Windows targets are cross-compiled (with clang-cl and lld-link) against the kit; INCLUDE
+        # and LIB refer to a case-folded overlay of the kit built by Setup.
+        for architecture in ["x64", "x86"]:
+            d[architecture] = Configuration(
+                "Cross-compiles {} targets; headers and libraries are activated through a case-folded overlay of the kit".format(architecture),
+                [
+                    Dependency(
+                        "0EAA1DCF22804F90AD9F5A3B85A5D706",
+                        "Common_Environment",
+                        "python36",
+                        "https://github.com/davidbrownell/Common_Environment_v3.git",
+                    )
+                ],
+            )
+
     d["noop"] = Configuration(
         "Configuration that doesn't do anything; this is useful on non-Windows machines or in Bootstrap repositories (where different versions of MSVC conflict with each other (normally, MSVC repositories are mutually exclusive))",
         [
@@ -139,56 +159,71 @@ def GetCustomActions(debug, verbose, explicit_configurations):
     cases, this is Bash on Linux systems and Batch or PowerShell on Windows systems.
     """
 
-    if CurrentShell.CategoryName != "Windows":
-        return []
+    is_windows = CurrentShell.CategoryName == "Windows"
 
     actions = []
 
-    for name, version, path_parts in _CUSTOM_DATA:
-        this_dir = os.path.join(*([_script_dir] + path_parts))
-        assert os.path.isdir(this_dir), this_dir
-
-        install_filename = os.path.join(this_dir, "Install.7z")
-
-        # Reconstruct the binary
-        if not os.path.isfile(install_filename):
-            actions += [CurrentShell.Commands.Execute(
-                'python "{script}" Reconstruct "{filename}"'.format(
-                    script=os.path.join(
-                        os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"),
-                        "RepositoryBootstrap",
-                        "SetupAndActivate",
-                        "LargeFileSupport.py",
-                    ),
-                    filename=os.path.join(this_dir, "_Install.7z.001"),
-                ),
-            )]
-
-        # Install the file
-        actions += [
-            CurrentShell.Commands.Execute(
-                'python "{script}" Install "{name}" "{uri}" "{dir}" "/unique_id={version}" /unique_id_is_hash'.format(
-                    script=os.path.join(
-                        os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"),
-                        "RepositoryBootstrap",
-                        "SetupAndActivate",
-                        "AcquireBinaries.py",
-                    ),
-                    name=name,
-                    uri=CommonEnvironmentImports.FileSystem.FilenameToUri(
-                        install_filename,
-                    ).replace("%", "%%"),
-                    dir=this_dir,
-                    version=version,
+    # On other platforms, the kit is only installed when a cross-compiling configuration is
+    # explicitly requested ('noop' remains sufficient for everything else).
+    configurations = [
+        configuration
+        for configuration in explicit_configurations or (["x64", "x86"] if is_windows else [])
+        if configuration != "noop"
+    ]
+
+    if not is_windows and not configurations:
+        return actions
+
+    # Only extract the architecture-specific content for explicitly requested configurations;
+    # content for other configurations is added by a later Setup that requests them.
+    architectures = configurations if explicit_configurations else None
+
+    with _trace.Session("Setup", configurations=configurations):
+        entries = []
+
+        for name, version, path_parts in _CUSTOM_DATA:
+            this_dir = os.path.join(*([_script_dir] + path_parts))
+            assert os.path.isdir(this_dir), this_dir
+
+            entries.append(_setup_scheduler.Entry(name, version, this_dir, _MERKLE_ROOTS.get(version)))
+
+        # ----------------------------------------------------------------------
+        def OnComplete(result):
+            sys.stdout.write(
+                "Installing '{}'...DONE ({}, {:.2f}s)\n".format(
+                    result.entry.name,
+                    result.return_code,
+                    result.elapsed,
                 ),
-                exit_on_error=False,
-            ),
-            CurrentShell.Commands.PersistError("_setup_error"),
-            CurrentShell.Commands.Delete(install_filename),
-            CurrentShell.Commands.ExitOnError(
-                variable_name="_setup_error",
-            ),
-        ]
+            )
+            sys.stdout.flush()
+
+        # ----------------------------------------------------------------------
+
+        # The entries are installed concurrently (each extracts the parts directly, without
+        # reconstructing "Install.7z" on disk, while hashing them) and then indexed; every
+        # entry runs to completion before failures are reported.
+        results = _setup_scheduler.Run(
+            entries,
+            configurations,
+            architectures=architectures,
+            create_overlay=not is_windows,
+            on_complete=OnComplete,
+        )
+
+        failures = [result for result in results if not result.IsSuccessful]
+        if failures:
+            raise Exception("\n\n".join(str(result) for result in failures))
+
+        # Precompile the activation scripts for every shell; activation sources these directly
+        # rather than generating the statements each time. Scripts for non-default version specs
+        # are written during the first activation that needs them.
+        for configuration in configurations:
+            with _trace.Span("WriteScript", configuration=configuration):
+                _activation_script.Write(configuration, {})
+
+    if not is_windows:
+        return actions
 
     # Write the admin setup registry file
     with open(os.path.join(_script_dir, "admin_setup.reg"), "w") as f:
@@ -0,0 +1,543 @@
+# ----------------------------------------------------------------------
+# |
+# |  _activation_plan.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 11:27:05
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Computes the environment changes made when activating a configuration.
+
+The computed plan is cached in the generated dir; subsequent activations replay the cached
+plan as long as the configuration, version specs, installed kit, and admin setup state are
+unchanged, avoiding file system and registry probing.
+
+PATH, INCLUDE, and LIB are only augmented with the dirs that they don't already contain during
+each activation so that repeated (or nested) activations never grow them, and the absolute paths
+of the kit's tools are written to a table so that build scripts can invoke them without
+searching PATH.
+
+When cross-compiling on other platforms, INCLUDE and LIB refer to the case-folded overlay of
+the kit built by Setup (see _case_folded_overlay.py) and PATH is not modified.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import textwrap
+
+import CommonEnvironment
+from CommonEnvironment.CallOnExit import CallOnExit
+
+sys.path.insert(0, os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"))
+from RepositoryBootstrap.SetupAndActivate import CurrentShell
+from RepositoryBootstrap.Impl.ActivationActivity import ActivationActivity
+
+del sys.path[0]
+
+import _case_folded_overlay
+import _kit_manifest
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+CACHE_FILENAME                              = "WindowsKitsActivationPlan.json"
+
+TOOL_TABLES_DIRNAME                         = "ToolTables"
+
+# Environment variable set during activation to the name of the JSON file that maps the
+# names of the kit's tools (for example, 'rc.exe') to their absolute paths.
+TOOL_TABLE_ENV_VAR                          = "DEVELOPMENT_ENVIRONMENT_WINDOWS_KITS_TOOLS"
+
+_PLAN_FORMAT_VERSION                        = 4
+
+
+# ----------------------------------------------------------------------
+class Plan(object):
+    """Directories and state used to generate activation actions"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        kit_dir,
+        bin_dirs,
+        include_dirs,
+        lib_dirs,
+        is_admin_setup_complete,
+        tools,
+        tool_table_filename,
+        content_dirs,
+    ):
+        self.kit_dir                        = kit_dir
+        self.bin_dirs                       = bin_dirs
+        self.include_dirs                   = include_dirs
+        self.lib_dirs                       = lib_dirs
+        self.is_admin_setup_complete        = is_admin_setup_complete
+        self.tools                          = tools
+        self.tool_table_filename            = tool_table_filename
+
+        # The dirs of the kit's content used by the configuration, relative to the kit dir;
+        # activation only verifies this content.
+        self.content_dirs                   = content_dirs
+
+    # ----------------------------------------------------------------------
+    def ToJson(self):
+        return {
+            "kit_dir": self.kit_dir,
+            "bin_dirs": self.bin_dirs,
+            "include_dirs": self.include_dirs,
+            "lib_dirs": self.lib_dirs,
+            "is_admin_setup_complete": self.is_admin_setup_complete,
+            "tools": self.tools,
+            "tool_table_filename": self.tool_table_filename,
+            "content_dirs": self.content_dirs,
+        }
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def FromJson(cls, content):
+        return cls(
+            content["kit_dir"],
+            content["bin_dirs"],
+            content["include_dirs"],
+            content["lib_dirs"],
+            content["is_admin_setup_complete"],
+            content["tools"],
+            content["tool_table_filename"],
+            content["content_dirs"],
+        )
+
+
+# ----------------------------------------------------------------------
+def GetKitDir():
+    return os.path.join(_script_dir, "Libraries", "Windows Kits", "10")
+
+
+# ----------------------------------------------------------------------
+def GetCacheKey(configuration, library_version_info):
+    """\
+    Returns a value that changes when any of the inputs used to create the plan change.
+
+    Only `stat` calls are made here; the identity of the kit is based on the inode and
+    modification time of the directories that are searched by `ActivationActivity.GetVersionedDirectory`,
+    all of which are recreated when Setup installs a kit.
+    """
+
+    kit_dir = GetKitDir()
+
+    values = [
+        configuration,
+        json.dumps(library_version_info, sort_keys=True, default=str),
+        kit_dir,
+    ]
+
+    for fullpath in [
+        kit_dir,
+        os.path.join(kit_dir, "bin"),
+        os.path.join(kit_dir, "Include"),
+        os.path.join(kit_dir, "Lib"),
+        os.path.join(_script_dir, "admin_setup.complete"),
+        _case_folded_overlay.GetIndexFilename(kit_dir),
+    ]:
+        try:
+            stat_result = os.stat(fullpath)
+            values.append("{}-{}".format(stat_result.st_ino, stat_result.st_mtime_ns))
+        except FileNotFoundError:
+            values.append("")
+
+    return hashlib.sha256("\n".join(values).encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------------------
+def GetToolTableFilename(configuration, library_version_info):
+    # The table is stored with the kit's metadata and, like the activation scripts, its name
+    # incorporates the cache key so that a table that exists is known to be current.
+    return os.path.join(
+        _kit_manifest.GetMetadataDir(GetKitDir()),
+        TOOL_TABLES_DIRNAME,
+        "{}-{}.json".format(
+            configuration,
+            GetCacheKey(configuration, library_version_info)[:16],
+        ),
+    )
+
+
+# ----------------------------------------------------------------------
+def CreatePlan(configuration, library_version_info):
+    """Creates the plan by probing the file system and registry"""
+
+    # Add the Windows Kit
+    windows_kit_dir = GetKitDir()
+    assert os.path.isdir(windows_kit_dir), windows_kit_dir
+
+    is_cross_compiling = CurrentShell.CategoryName != "Windows"
+
+    # Binaries (the kit's binaries can't be run when cross-compiling)
+    if is_cross_compiling:
+        bin_dirs = []
+    else:
+        windows_kit_bin_dir = _GetVersionedDirectory(
+            library_version_info,
+            windows_kit_dir,
+            "bin",
+        )
+        assert os.path.isdir(windows_kit_bin_dir), windows_kit_bin_dir
+
+        windows_kit_bin_dir = os.path.join(windows_kit_bin_dir, configuration)
+        assert os.path.isdir(windows_kit_bin_dir), windows_kit_bin_dir
+
+        bin_dirs = [
+            windows_kit_bin_dir,
+            os.path.join(windows_kit_bin_dir, "ucrt"),
+        ]
+
+    # Includes
+    windows_kit_include_dir = _GetVersionedDirectory(
+        library_version_info,
+        windows_kit_dir,
+        "Include",
+    )
+    assert os.path.isdir(windows_kit_include_dir), windows_kit_include_dir
+
+    include_dirs = []
+
+    for include_name in ["shared", "ucrt", "um"]:
+        this_include_dir = os.path.join(windows_kit_include_dir, include_name)
+        if os.path.isdir(this_include_dir):
+            include_dirs.append(this_include_dir)
+
+    # Libs
+    windows_kit_lib_dir = _GetVersionedDirectory(
+        library_version_info,
+        windows_kit_dir,
+        "Lib",
+    )
+    assert os.path.isdir(windows_kit_lib_dir), windows_kit_lib_dir
+
+    lib_dirs = []
+
+    for lib_name in ["ucrt", "um"]:
+        this_lib_dir = os.path.join(windows_kit_lib_dir, lib_name, configuration)
+        if os.path.isdir(this_lib_dir):
+            lib_dirs.append(this_lib_dir)
+
+    content_dirs = [
+        os.path.relpath(dirname, windows_kit_dir).replace(os.path.sep, "/")
+        for dirname in bin_dirs + include_dirs + lib_dirs
+    ]
+
+    # Headers and libraries are referenced with inconsistent case, so the case-folded overlay is
+    # used on case-sensitive file systems.
+    if is_cross_compiling:
+        include_dirs = [_case_folded_overlay.GetOverlayPath(windows_kit_dir, include_dir) for include_dir in include_dirs]
+        lib_dirs = [_case_folded_overlay.GetOverlayPath(windows_kit_dir, lib_dir) for lib_dir in lib_dirs]
+
+        # The overlay is built by Setup for the default version of the kit
+        if _case_folded_overlay.LoadIndex(windows_kit_dir) is None or not all(
+            os.path.isdir(overlay_dir) for overlay_dir in include_dirs + lib_dirs
+        ):
+            raise Exception(
+                "The case-folded overlay of '{}' does not exist; please run Setup with '/configuration={}'".format(
+                    windows_kit_dir,
+                    configuration,
+                ),
+            )
+
+    # Tools (the first bin dir takes precedence when a name exists in more than one)
+    tools = {}
+
+    for bin_dir in bin_dirs:
+        if not os.path.isdir(bin_dir):
+            continue
+
+        for entry in os.scandir(bin_dir):
+            if entry.name.lower().endswith(".exe") and entry.is_file():
+                tools.setdefault(entry.name.lower(), entry.path)
+
+    return Plan(
+        windows_kit_dir,
+        bin_dirs,
+        include_dirs,
+        lib_dirs,
+        # The registry only applies to Windows
+        is_cross_compiling or _IsAdditionalSetupComplete(),
+        tools,
+        GetToolTableFilename(configuration, library_version_info),
+        content_dirs,
+    )
+
+
+# ----------------------------------------------------------------------
+def GetPlan(
+    generated_dir,
+    configuration,
+    library_version_info,
+):
+    """Returns the cached plan if it is still valid, creating and caching a new plan if it isn't"""
+
+    cache_filename = os.path.join(generated_dir, CACHE_FILENAME)
+    cache_key = GetCacheKey(configuration, library_version_info)
+
+    if os.path.isfile(cache_filename):
+        try:
+            with open(cache_filename) as f:
+                content = json.load(f)
+
+            if (
+                content.get("format") == _PLAN_FORMAT_VERSION
+                and content.get("key") == cache_key
+            ):
+                with _trace.Span("GetPlan", cached=True):
+                    plan = Plan.FromJson(content["plan"])
+
+                if not os.path.isfile(plan.tool_table_filename):
+                    WriteToolTable(plan)
+
+                return plan
+
+        except (ValueError, KeyError):
+            # The cache is corrupt; it will be overwritten below
+            pass
+
+    with _trace.Span("GetPlan", cached=False):
+        plan = CreatePlan(configuration, library_version_info)
+
+    if not os.path.isdir(generated_dir):
+        os.makedirs(generated_dir)
+
+    temp_filename = "{}.tmp".format(cache_filename)
+
+    with open(temp_filename, "w") as f:
+        json.dump(
+            {
+                "format": _PLAN_FORMAT_VERSION,
+                "key": cache_key,
+                "plan": plan.ToJson(),
+            },
+            f,
+        )
+
+    os.replace(temp_filename, cache_filename)
+
+    WriteToolTable(plan)
+
+    return plan
+
+
+# ----------------------------------------------------------------------
+def WriteToolTable(plan):
+    """Writes the plan's tool table, removing any previous tables for the configuration"""
+
+    dirname, basename = os.path.split(plan.tool_table_filename)
+
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    temp_filename = "{}.tmp".format(plan.tool_table_filename)
+
+    with open(temp_filename, "w") as f:
+        json.dump(plan.tools, f, sort_keys=True, indent=1)
+
+    os.replace(temp_filename, plan.tool_table_filename)
+
+    # Remove stale tables (the configuration is the portion of the name before the cache key)
+    prefix = basename[:basename.rindex("-") + 1]
+
+    for item in os.listdir(dirname):
+        if item != basename and item.startswith(prefix) and item.endswith(".json"):
+            os.remove(os.path.join(dirname, item))
+
+
+# ----------------------------------------------------------------------
+def CreateActions(plan):
+    """\
+    Returns the activation actions for the plan that do not depend on the current environment;
+    the precompiled activation scripts make these changes and those of `CreateEnvironmentActions`.
+    """
+
+    actions = [
+        # These values are typically set when activating a Visual Studio environment.
+        CurrentShell.Commands.Set("WindowsSkdDir", plan.kit_dir),
+        CurrentShell.Commands.Set("UniversalCRTSdkDir", plan.kit_dir),
+        CurrentShell.Commands.Set(
+            "ExtensionSdkDir",
+            os.path.join(plan.kit_dir, "Extension SDKs"),
+        ),
+    ]
+
+    actions.append(CurrentShell.Commands.Set(TOOL_TABLE_ENV_VAR, plan.tool_table_filename))
+
+    if not plan.is_admin_setup_complete:
+        actions.append(CurrentShell.Commands.Message(_CreateAdminSetupWarning()))
+
+    return actions
+
+
+# ----------------------------------------------------------------------
+def CreateEnvironmentActions(plan, environ=None):
+    """\
+    Returns the actions that augment PATH, INCLUDE, and LIB with the plan's dirs that aren't
+    already in their values in `environ` (or the current environment).
+
+    The variables are augmented rather than set so that changes made by actions that precede
+    these in the same activation (by other repositories or dependencies) are preserved;
+    activating repeatedly never adds a dir that is already present.
+    """
+
+    environ = os.environ if environ is None else environ
+
+    actions = []
+
+    for name, values in GetEnvironmentValues(plan):
+        values = GetMissingValues(values, environ.get(name, ""))
+        if not values:
+            continue
+
+        if name == "PATH":
+            actions.append(CurrentShell.Commands.AugmentPath(values))
+        else:
+            actions.append(CurrentShell.Commands.Augment(name, values))
+
+    return actions
+
+
+# ----------------------------------------------------------------------
+def GetEnvironmentValues(plan):
+    """Returns the names of the variables augmented by the plan and the dirs added to each (without duplicates)"""
+
+    return [
+        (name, GetMissingValues(values, ""))
+        for name, values in [
+            ("PATH", plan.bin_dirs),
+            ("INCLUDE", plan.include_dirs),
+            ("LIB", plan.lib_dirs),
+        ]
+    ]
+
+
+# ----------------------------------------------------------------------
+def GetMissingValues(values, current_value):
+    """\
+    Returns the items in `values` (in order and without duplicates) that aren't entries in
+    `current_value` (a delimited string).
+    """
+
+    encountered = set(
+        _NormalizePath(value)
+        for value in current_value.split(os.pathsep)
+        if value
+    )
+
+    results = []
+
+    for value in values:
+        normalized_value = _NormalizePath(value)
+
+        if normalized_value in encountered:
+            continue
+
+        encountered.add(normalized_value)
+        results.append(value)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _NormalizePath(value):
+    # normcase is case-insensitive on Windows
+    return os.path.normcase(os.path.normpath(value.strip().strip('"')))
+
+
+# ----------------------------------------------------------------------
+def _GetVersionedDirectory(library_version_info, *path_components):
+    with _trace.Span("GetVersionedDirectory", subdir=path_components[-1]):
+        return ActivationActivity.GetVersionedDirectory(library_version_info, *path_components)
+
+
+# ----------------------------------------------------------------------
+def _IsAdditionalSetupComplete():
+    with _trace.Span("IsAdditionalSetupComplete"):
+        return _IsAdditionalSetupCompleteImpl()
+
+
+# ----------------------------------------------------------------------
+def _IsAdditionalSetupCompleteImpl():
+    if os.path.isfile(os.path.join(_script_dir, "admin_setup.complete")):
+        return True
+
+    # Don't prompt if the key already exists
+    import winreg
+
+    try:
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"Software\WOW6432Node\Microsoft\Microsoft SDKs\Windows\v10.0")
+        if key is None:
+            return False
+
+        with CallOnExit(lambda: winreg.CloseKey(key)):
+            for value_name in [
+                "InstallationFolder",
+                "ProductName",
+                "ProductVersion",
+            ]:
+                # The following line will raise an exception if the value does not exist
+                value = winreg.QueryValueEx(key, value_name)
+
+        return True
+
+    except FileNotFoundError:
+        return False
+
+
+# ----------------------------------------------------------------------
+def _CreateAdminSetupWarning():
+    return "\n".join(
+        [
+            "        {}".format(line) for line in textwrap.dedent(
+                """\
+
+                # ----------------------------------------------------------------------
+                # ----------------------------------------------------------------------
+
+                WARNING ({}):
+
+                This repository includes setup activities that must be run as an administrator.
+                This additional setup is not required for all development activities, but is required
+                for the following:
+
+                    - For external tools that use the registry to detect Windows Kits instances
+
+                This warning is otherwise safe to ignore.
+
+                To complete these optional setup activities:
+
+                    1) Launch a command prompt with administrator rights:
+                        - Windows Key
+                        - Type "cmd"
+                        - Right click and select "Run as Administrator"
+
+                    2) Run "{}"
+
+                # ----------------------------------------------------------------------
+                # ----------------------------------------------------------------------
+
+                """,
+            ).format(
+                _script_dir,
+                os.path.join(_script_dir, "admin_setup.cmd"),
+            ).split("\n")
+        ],
+    )
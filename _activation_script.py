@@ -0,0 +1,298 @@
+# ----------------------------------------------------------------------
+# |
+# |  _activation_script.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 13:41:52
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Precompiled, shell-specific activation scripts.
+
+Setup writes Batch, PowerShell, and Bash scripts for each configuration that make all of the
+environment changes of the activation plan. PATH, INCLUDE, and LIB are only augmented with the
+dirs that they don't already contain when the script is sourced, so sourcing a script
+repeatedly (or after other repositories have augmented the variables) never grows them.
+
+Activation sources the script for the current shell directly when it is current, without loading
+the plan or generating any statements, and only falls back to generating the statements (and
+writing new scripts) when the kit, admin setup state, or version specs have changed since the
+scripts were written.
+"""
+
+import os
+import sys
+
+from collections import OrderedDict
+
+import CommonEnvironment
+
+sys.path.insert(0, os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"))
+from RepositoryBootstrap.SetupAndActivate import CurrentShell
+
+del sys.path[0]
+
+import _activation_plan
+import _kit_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+SCRIPTS_DIRNAME                             = "ActivationScripts"
+
+# Scripts are only valid for the format of the statements written by this version of the module
+_SCRIPT_FORMAT_VERSION                      = 3
+
+# Name of the variable used by Batch scripts while augmenting a variable; it is removed at the end
+# of the script.
+_BATCH_TEMP_VAR                             = "_WINDOWS_KITS_ACTIVATION_VALUE"
+
+
+# ----------------------------------------------------------------------
+def GetScriptsDir():
+    # The scripts are stored with the kit's metadata; reinstalling the kit preserves the
+    # metadata dir, so scripts that are no longer current are removed by `RemoveStaleScripts`.
+    return os.path.join(
+        _kit_manifest.GetMetadataDir(_activation_plan.GetKitDir()),
+        SCRIPTS_DIRNAME,
+    )
+
+
+# ----------------------------------------------------------------------
+def GetScriptFilename(configuration, library_version_info, extension=None):
+    """\
+    Returns the name of the script for the shell with the extension (or the current shell).
+
+    The name incorporates the activation plan's cache key, so a script that exists is
+    known to be current without reading its content.
+    """
+
+    return os.path.join(
+        GetScriptsDir(),
+        "{}-{}-{}{}".format(
+            configuration,
+            _SCRIPT_FORMAT_VERSION,
+            _activation_plan.GetCacheKey(configuration, library_version_info)[:16],
+            extension or CurrentShell.ScriptExtension,
+        ),
+    )
+
+
+# ----------------------------------------------------------------------
+def GetScript(configuration, library_version_info):
+    """\
+    Returns the name of the current script for the configuration and the current shell or None if
+    it doesn't exist, is stale, or scripts aren't written for the current shell.
+    """
+
+    if CurrentShell.ScriptExtension not in _GENERATORS:
+        return None
+
+    filename = GetScriptFilename(configuration, library_version_info)
+    if not os.path.isfile(filename):
+        RemoveStaleScripts(configuration, library_version_info)
+        return None
+
+    return filename
+
+
+# ----------------------------------------------------------------------
+def RemoveStaleScripts(configuration, library_version_info):
+    """\
+    Removes the scripts for the configuration (for any shell) whose cache key doesn't match the
+    current state; returns the number of scripts removed.
+    """
+
+    dirname, basename = os.path.split(GetScriptFilename(configuration, library_version_info))
+    if not os.path.isdir(dirname):
+        return 0
+
+    # Scripts for other shells share the name, other than the extension
+    current_prefix = os.path.splitext(basename)[0]
+    prefix = "{}-".format(configuration)
+
+    num_removed = 0
+
+    for item in os.listdir(dirname):
+        # Temp files may be written by concurrent activations
+        if item.endswith(".tmp"):
+            continue
+
+        if item.startswith(prefix) and os.path.splitext(item)[0] != current_prefix:
+            os.remove(os.path.join(dirname, item))
+            num_removed += 1
+
+    return num_removed
+
+
+# ----------------------------------------------------------------------
+def Write(configuration, library_version_info, plan=None):
+    """\
+    Writes the scripts for the configuration for every supported shell, removing any stale
+    scripts for the configuration.
+
+    Returns the names of the scripts.
+    """
+
+    if plan is None:
+        plan = _activation_plan.CreatePlan(configuration, library_version_info)
+
+    _activation_plan.WriteToolTable(plan)
+
+    actions = _activation_plan.CreateActions(plan)
+    environment_values = _activation_plan.GetEnvironmentValues(plan)
+
+    filenames = []
+
+    for extension, generator in _GENERATORS.items():
+        filename = GetScriptFilename(configuration, library_version_info, extension)
+
+        dirname = os.path.dirname(filename)
+
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            f.write(generator(actions, environment_values))
+
+        os.replace(temp_filename, filename)
+
+        filenames.append(filename)
+
+    RemoveStaleScripts(configuration, library_version_info)
+
+    return filenames
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GenerateBatch(actions, environment_values):
+    lines = ["@echo off"]
+
+    for action in actions:
+        if isinstance(action, CurrentShell.Commands.Set):
+            lines.append('set "{}={}"'.format(action.name, action.value.replace("%", "%%")))
+        elif isinstance(action, CurrentShell.Commands.Message):
+            for line in action.value.split("\n"):
+                if not line.strip():
+                    lines.append("echo.")
+                    continue
+
+                for char in "^&|<>":
+                    line = line.replace(char, "^{}".format(char))
+
+                lines.append("echo {}".format(line.replace("%", "%%")))
+        else:
+            raise Exception("'{}' is not a supported action".format(action))
+
+    for name, values in environment_values:
+        # Values are prepended in reverse so that they appear in order. The variable is delimited
+        # with ';' on both ends so that only complete entries match; the match is case-insensitive.
+        for value in reversed(values):
+            lines += [
+                'if not defined {name} set "{name}={value}"'.format(
+                    name=name,
+                    value=value,
+                ),
+                'set "{temp}=;%{name}%;"'.format(
+                    temp=_BATCH_TEMP_VAR,
+                    name=name,
+                ),
+                'call set "{temp}=%%{temp}:;{value};=%%"'.format(
+                    temp=_BATCH_TEMP_VAR,
+                    value=value,
+                ),
+                'if "%{temp}%"==";%{name}%;" set "{name}={value};%{name}%"'.format(
+                    temp=_BATCH_TEMP_VAR,
+                    name=name,
+                    value=value,
+                ),
+            ]
+
+    lines.append('set "{}="'.format(_BATCH_TEMP_VAR))
+
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+def _GeneratePowerShell(actions, environment_values):
+    lines = []
+
+    for action in actions:
+        if isinstance(action, CurrentShell.Commands.Set):
+            lines.append("$env:{} = {}".format(action.name, _QuotePowerShell(action.value)))
+        elif isinstance(action, CurrentShell.Commands.Message):
+            lines.append("Write-Host {}".format(_QuotePowerShell(action.value)))
+        else:
+            raise Exception("'{}' is not a supported action".format(action))
+
+    for name, values in environment_values:
+        # Values are prepended in reverse so that they appear in order; -notcontains is
+        # case-insensitive.
+        for value in reversed(values):
+            lines.append(
+                'if (@("${{env:{name}}}" -split ";") -notcontains {value}) {{ ${{env:{name}}} = ({value} + ";" + "${{env:{name}}}").TrimEnd(";") }}'.format(
+                    name=name,
+                    value=_QuotePowerShell(value),
+                ),
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+def _GenerateBash(actions, environment_values):
+    lines = []
+
+    for action in actions:
+        if isinstance(action, CurrentShell.Commands.Set):
+            lines.append("export {}={}".format(action.name, _QuoteBash(action.value)))
+        elif isinstance(action, CurrentShell.Commands.Message):
+            lines.append("echo {}".format(_QuoteBash(action.value)))
+        else:
+            raise Exception("'{}' is not a supported action".format(action))
+
+    for name, values in environment_values:
+        # Values are prepended in reverse so that they appear in order. The variable is delimited
+        # with ':' on both ends so that only complete entries match.
+        for value in reversed(values):
+            lines.append(
+                'case ":${{{name}}}:" in *:{value}:*) ;; *) export {name}={value}"${{{name}:+:${{{name}}}}}" ;; esac'.format(
+                    name=name,
+                    value=_QuoteBash(value),
+                ),
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+def _QuotePowerShell(value):
+    return "'{}'".format(value.replace("'", "''"))
+
+
+# ----------------------------------------------------------------------
+def _QuoteBash(value):
+    return "'{}'".format(value.replace("'", "'\\''"))
+
+
+# ----------------------------------------------------------------------
+_GENERATORS                                 = OrderedDict(
+    [
+        (".cmd", _GenerateBatch),
+        (".ps1", _GeneratePowerShell),
+        (".sh", _GenerateBash),
+    ],
+)
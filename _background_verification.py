@@ -0,0 +1,460 @@
+# ----------------------------------------------------------------------
+# |
+# |  _background_verification.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 23:05:14
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Verifies installed kits in a detached, low-priority process so that activation doesn't block.
+
+Activation starts the verification and returns immediately; the result is written to a status
+file in the kit's metadata dir. The next activation (or the Status command) reports a failed
+verification loudly, and continues to do so until a subsequent verification succeeds.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import time
+import traceback
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+
+import _activation_plan
+import _kit_manifest
+import _kit_operations
+import _merkle_tree
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Environment variable that selects how a non-fast activation verifies the kits; when the value
+# is 'background', verification runs in a detached process rather than blocking activation.
+VERIFY_MODE_ENV_VAR                         = "DEVELOPMENT_ENVIRONMENT_WINDOWS_KITS_VERIFY"
+
+BACKGROUND_VERIFY_MODE                      = "background"
+
+STATUS_FILENAME                             = "VerificationStatus.json"
+
+_STATUS_FORMAT_VERSION                      = 1
+
+# A verification that has been running for longer than this is assumed to have been terminated
+# without writing its result, and another one is started.
+_STALE_RUNNING_SECONDS                      = 60 * 60
+
+# A process that hasn't recorded its id within this time failed to start
+_STALE_STARTING_SECONDS                     = 60
+
+# Process creation flags (the constants aren't available in the subprocess module of all
+# supported versions of Python).
+_DETACHED_PROCESS                           = 0x00000008
+_CREATE_NEW_PROCESS_GROUP                   = 0x00000200
+_BELOW_NORMAL_PRIORITY_CLASS                = 0x00004000
+
+_POSIX_NICE_INCREMENT                       = 10
+
+
+# ----------------------------------------------------------------------
+class VerificationStatus(object):
+    """State of the background verification of a kit"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, kit_dir, running=None, result=None):
+        self.kit_dir                        = kit_dir
+
+        # {"pid", "started"} while a verification is running
+        self.running                        = running
+
+        # {"name", "version", "tree_hash", "architectures", "return_code", "output", "completed"}
+        # of the most recent verification; "tree_hash" identifies the manifest that was verified.
+        self.result                         = result
+
+    # ----------------------------------------------------------------------
+    @property
+    def IsRunning(self):
+        if self.running is None:
+            return False
+
+        elapsed = time.time() - self.running["started"]
+
+        if self.running["pid"] is None:
+            return elapsed < _STALE_STARTING_SECONDS
+
+        return elapsed < _STALE_RUNNING_SECONDS
+
+    # ----------------------------------------------------------------------
+    @property
+    def HasFailed(self):
+        return self.result is not None and self.result["return_code"] != 0
+
+    # ----------------------------------------------------------------------
+    def IsCurrent(self, version):
+        """\
+        Returns True if the most recent verification describes the kit that is installed now;
+        results for a previous install (or version) of the kit are no longer relevant.
+        """
+
+        return (
+            self.result is not None
+            and self.result["version"] == version
+            and self.result.get("tree_hash") == _GetTreeHash(self.kit_dir)
+        )
+
+    # ----------------------------------------------------------------------
+    def Describe(self):
+        lines = []
+
+        if self.result is None:
+            lines.append("'{}' has not been verified in the background.".format(self.kit_dir))
+        else:
+            lines.append(
+                "The verification of '{}' {} at {} ({}).".format(
+                    self.result["name"],
+                    "failed" if self.HasFailed else "succeeded",
+                    _FormatTime(self.result["completed"]),
+                    self.result["return_code"],
+                ),
+            )
+
+            if self.result["output"].strip():
+                lines.append("")
+                lines += ["    {}".format(line) for line in self.result["output"].rstrip().split("\n")]
+                lines.append("")
+
+        if self.IsRunning:
+            lines.append(
+                "A verification has been running since {}{}.".format(
+                    _FormatTime(self.running["started"]),
+                    " (process {})".format(self.running["pid"]) if self.running["pid"] else "",
+                ),
+            )
+
+        return "\n".join(lines) + "\n"
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        filename = GetStatusFilename(kit_dir)
+
+        if os.path.isfile(filename):
+            try:
+                with open(filename) as f:
+                    content = json.load(f)
+
+                if content.get("format") == _STATUS_FORMAT_VERSION:
+                    return cls(kit_dir, content["running"], content["result"])
+
+            except (ValueError, KeyError):
+                # The status is corrupt (or being written); it will be overwritten
+                pass
+
+        return cls(kit_dir)
+
+    # ----------------------------------------------------------------------
+    def Save(self):
+        filename = GetStatusFilename(self.kit_dir)
+
+        dirname = os.path.dirname(filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        # The name is unique so that concurrent writers never share a temp file
+        temp_filename = "{}.{}.tmp".format(filename, os.getpid())
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _STATUS_FORMAT_VERSION,
+                    "running": self.running,
+                    "result": self.result,
+                },
+                f,
+                indent=1,
+            )
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def IsEnabled():
+    return (os.getenv(VERIFY_MODE_ENV_VAR) or "").lower() == BACKGROUND_VERIFY_MODE
+
+
+# ----------------------------------------------------------------------
+def GetStatusFilename(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), STATUS_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def RemoveStatus(kit_dir):
+    """Removes the status of previous verifications; this is called when the kit is installed"""
+
+    filename = GetStatusFilename(kit_dir)
+    if os.path.isfile(filename):
+        os.remove(filename)
+
+
+# ----------------------------------------------------------------------
+def Start(
+    name,
+    kit_dir,
+    version,
+    architectures=None,
+):
+    """\
+    Starts the verification of the kit in a detached, low-priority process; returns False if a
+    verification of the kit is already running.
+    """
+
+    status = VerificationStatus.Load(kit_dir)
+    if status.IsRunning:
+        return False
+
+    # The process records its id when it starts
+    status.running = {
+        "pid": None,
+        "started": time.time(),
+    }
+
+    status.Save()
+
+    command_line = [
+        sys.executable,
+        _script_fullpath,
+        "Run",
+        name,
+        kit_dir,
+        version,
+    ] + ["/architecture={}".format(architecture) for architecture in architectures or []]
+
+    # The process may not be able to import the modules that were imported by the activating
+    # process without its search path.
+    environ = dict(os.environ)
+    environ["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+
+    kwargs = {}
+
+    if sys.platform.startswith("win"):
+        kwargs["creationflags"] = _DETACHED_PROCESS | _CREATE_NEW_PROCESS_GROUP | _BELOW_NORMAL_PRIORITY_CLASS
+    else:
+        kwargs["start_new_session"] = True
+
+    subprocess.Popen(
+        command_line,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        env=environ,
+        **kwargs
+    )
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def Report(kit_dir, version):
+    """\
+    Returns a message that describes a failed verification or None if the most recent
+    verification didn't fail (or was a verification of a different install of the kit).
+    """
+
+    status = VerificationStatus.Load(kit_dir)
+    if not status.HasFailed or not status.IsCurrent(version):
+        return None
+
+    return "\n".join(
+        [
+            "        {}".format(line) for line in textwrap.dedent(
+                """\
+
+                # ----------------------------------------------------------------------
+                # ----------------------------------------------------------------------
+
+                ERROR: '{name}' IS CORRUPT
+
+                {description}
+                Please run Setup to install the kit again; this error is displayed during each activation
+                until a background verification succeeds. To see the status of the verification, run:
+
+                    python "{script}" Status "{kit_dir}"
+
+                # ----------------------------------------------------------------------
+                # ----------------------------------------------------------------------
+
+                """,
+            ).format(
+                name=status.result["name"],
+                description=status.Describe(),
+                script=_script_fullpath,
+                kit_dir=kit_dir,
+            ).split("\n")
+        ],
+    )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    name=CommandLine.StringTypeInfo(),
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    version=CommandLine.StringTypeInfo(),
+    architecture=CommandLine.StringTypeInfo(
+        arity="*",
+    ),
+    output_stream=None,
+)
+def Run(
+    name,
+    kit_dir,
+    version,
+    architecture=None,
+    output_stream=sys.stdout,
+):
+    """Verifies the kit and writes the result to its status file; this is invoked by activation"""
+
+    if hasattr(os, "nice"):
+        os.nice(_POSIX_NICE_INCREMENT)
+
+    status = VerificationStatus.Load(kit_dir)
+
+    status.running = {
+        "pid": os.getpid(),
+        "started": time.time(),
+    }
+
+    status.Save()
+
+    # The install that is verified
+    tree_hash = _GetTreeHash(kit_dir)
+
+    try:
+        if _kit_operations.HasManifest(kit_dir):
+            result = _kit_operations.Verify(
+                name,
+                kit_dir,
+                version,
+                architectures=architecture or None,
+                merkle_root=_merkle_tree.GetRecordedRoot(version),
+            )
+
+            return_code = result.return_code
+            output = result.output
+
+        else:
+            # Kits installed before manifests were available are verified by AcquireBinaries
+            process = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.join(
+                        os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"),
+                        "RepositoryBootstrap",
+                        "SetupAndActivate",
+                        "AcquireBinaries.py",
+                    ),
+                    "Verify",
+                    name,
+                    kit_dir,
+                    version,
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+
+            return_code = process.returncode
+            output = process.stdout.decode("utf-8", "replace")
+
+    except Exception:
+        return_code = -1
+        output = traceback.format_exc()
+
+    # Another verification may have been started and completed in the meantime; the most recent
+    # result wins.
+    status = VerificationStatus.Load(kit_dir)
+
+    status.running = None
+    status.result = {
+        "name": name,
+        "version": version,
+        "tree_hash": tree_hash,
+        "architectures": architecture or None,
+        "return_code": return_code,
+        "output": output,
+        "completed": time.time(),
+    }
+
+    status.Save()
+
+    output_stream.write(status.Describe())
+
+    return return_code
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Status(
+    kit_dir=None,
+    output_stream=sys.stdout,
+):
+    """Writes the status of the background verification; returns a non-zero value if it failed"""
+
+    kit_dir = kit_dir or _activation_plan.GetKitDir()
+
+    status = VerificationStatus.Load(kit_dir)
+
+    output_stream.write(status.Describe())
+
+    return -1 if status.HasFailed else 0
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _FormatTime(value):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+
+
+# ----------------------------------------------------------------------
+def _GetTreeHash(kit_dir):
+    """Returns the tree hash of the kit's manifest or None if the kit doesn't have a manifest"""
+
+    manifest = _kit_manifest.Manifest.Load(kit_dir)
+    if manifest is None:
+        return None
+
+    return manifest.TreeHash
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,417 @@
+# ----------------------------------------------------------------------
+# |
+# |  _case_folded_overlay.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 22:31:52
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Case-folded overlay of the kit's versioned Include and Lib directories, used when cross-compiling
+on file systems that are case-sensitive.
+
+Headers and libraries are referenced with inconsistent case ('Windows.h' and 'windows.h',
+'Kernel32.lib' and 'kernel32.lib'), which only resolves on Windows. The overlay mirrors the
+directories with lowercase names and contains a symbolic link for each name by which a file
+or directory can be referenced: its name on disk, its lowercase name, and every spelling used by
+an '#include' or '#pragma comment(lib, ...)' in the kit's headers. INCLUDE and LIB refer to the
+overlay, so every reference resolves with a single lookup.
+
+The overlay is built by Setup and is only rebuilt when the installed kit changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+sys.path.insert(0, os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"))
+from RepositoryBootstrap.Impl.ActivationActivity import ActivationActivity
+
+del sys.path[0]
+
+import _activation_plan
+import _kit_hashing
+import _kit_manifest
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+OVERLAY_DIRNAME                             = "CaseFolded"
+INDEX_FILENAME                              = "CaseFolded.json"
+
+_INDEX_FORMAT_VERSION                       = 1
+
+_INCLUDE_REGEX                              = re.compile(br"""^[ \t]*#[ \t]*include[ \t]*[<"]([^>"\r\n]+)[>"]""", re.MULTILINE)
+_PRAGMA_LIB_REGEX                           = re.compile(br"""^[ \t]*#[ \t]*pragma[ \t]+comment[ \t]*\([ \t]*lib[ \t]*,[ \t]*"([^"\r\n]+)\"""", re.MULTILINE)
+
+
+# ----------------------------------------------------------------------
+def GetOverlayDir(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), OVERLAY_DIRNAME)
+
+
+# ----------------------------------------------------------------------
+def GetIndexFilename(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), INDEX_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def GetOverlayPath(kit_dir, fullpath):
+    """Returns the path within the overlay that corresponds to a path within the kit dir"""
+
+    relative_path = os.path.relpath(fullpath, kit_dir)
+    assert not relative_path.startswith(os.pardir), fullpath
+
+    return os.path.join(GetOverlayDir(kit_dir), *[part.lower() for part in relative_path.split(os.path.sep)])
+
+
+# ----------------------------------------------------------------------
+def LoadIndex(kit_dir):
+    """\
+    Returns the index of the overlay (a dict with the 'key' that identifies the content that it was
+    built from and the 'aliases' that map paths within the overlay to paths within the kit dir),
+    or None if the overlay hasn't been built.
+    """
+
+    filename = GetIndexFilename(kit_dir)
+    if not os.path.isfile(filename):
+        return None
+
+    try:
+        with open(filename) as f:
+            content = json.load(f)
+
+    except ValueError:
+        return None
+
+    if content.get("format") != _INDEX_FORMAT_VERSION or not os.path.isdir(GetOverlayDir(kit_dir)):
+        return None
+
+    return content
+
+
+# ----------------------------------------------------------------------
+def GetKey(kit_dir, library_version_info):
+    """Returns a value that changes when the content used to build the overlay changes"""
+
+    include_dir, lib_dir = _GetVersionedDirs(kit_dir, library_version_info)
+
+    manifest = _kit_manifest.Manifest.Load(kit_dir)
+    if manifest is None:
+        return None
+
+    return hashlib.sha256(
+        "\n".join(
+            [
+                str(_INDEX_FORMAT_VERSION),
+                os.path.relpath(include_dir, kit_dir),
+                os.path.relpath(lib_dir, kit_dir),
+                manifest.TreeHash,
+            ],
+        ).encode("utf-8"),
+    ).hexdigest()
+
+
+# ----------------------------------------------------------------------
+def Create(
+    kit_dir,
+    library_version_info,
+    max_workers=None,
+):
+    """\
+    Builds the overlay and its index, replacing any previous overlay. Returns the number of
+    aliases in the overlay.
+    """
+
+    include_dir, lib_dir = _GetVersionedDirs(kit_dir, library_version_info)
+
+    with _trace.Span("ScanReferences"):
+        include_spellings, lib_spellings = ScanReferences(include_dir, max_workers=max_workers)
+
+    overlay_dir = GetOverlayDir(kit_dir)
+    temp_overlay_dir = "{}.tmp".format(overlay_dir)
+
+    if os.path.isdir(temp_overlay_dir):
+        shutil.rmtree(temp_overlay_dir)
+
+    aliases = {}
+
+    with _trace.Span("CreateOverlay"):
+        for source_dir, spellings, is_lib in [
+            (include_dir, include_spellings, False),
+            (lib_dir, lib_spellings, True),
+        ]:
+            relative_dir = os.path.relpath(source_dir, kit_dir)
+
+            _CreateOverlayDir(
+                source_dir,
+                os.path.join(temp_overlay_dir, *[part.lower() for part in relative_dir.split(os.path.sep)]),
+                relative_dir.replace(os.path.sep, "/"),
+                spellings,
+                is_lib,
+                aliases,
+            )
+
+    previous_overlay_dir = "{}.old".format(overlay_dir)
+
+    if os.path.isdir(previous_overlay_dir):
+        shutil.rmtree(previous_overlay_dir)
+
+    if os.path.isdir(overlay_dir):
+        os.rename(overlay_dir, previous_overlay_dir)
+
+    os.rename(temp_overlay_dir, overlay_dir)
+
+    if os.path.isdir(previous_overlay_dir):
+        shutil.rmtree(previous_overlay_dir)
+
+    filename = GetIndexFilename(kit_dir)
+    temp_filename = "{}.tmp".format(filename)
+
+    with open(temp_filename, "w") as f:
+        json.dump(
+            {
+                "format": _INDEX_FORMAT_VERSION,
+                "key": GetKey(kit_dir, library_version_info),
+                "aliases": aliases,
+            },
+            f,
+            sort_keys=True,
+        )
+
+    os.replace(temp_filename, filename)
+
+    return len(aliases)
+
+
+# ----------------------------------------------------------------------
+def Update(
+    kit_dir,
+    library_version_info,
+    max_workers=None,
+):
+    """Builds the overlay if the kit has changed since it was last built; returns True if it was built"""
+
+    index = LoadIndex(kit_dir)
+
+    if index is not None and index["key"] is not None and index["key"] == GetKey(kit_dir, library_version_info):
+        return False
+
+    Create(
+        kit_dir,
+        library_version_info,
+        max_workers=max_workers,
+    )
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def ScanReferences(include_dir, max_workers=None):
+    """\
+    Returns the spellings of the names referenced by the headers, as dicts of lowercase name ->
+    set of spellings for (include path components, libraries).
+    """
+
+    filenames = []
+
+    for root, _, these_filenames in os.walk(include_dir):
+        filenames += [os.path.join(root, filename) for filename in these_filenames]
+
+    # ----------------------------------------------------------------------
+    def Scan(filename):
+        with open(filename, "rb") as f:
+            content = f.read()
+
+        # Most headers don't contain a pragma, so avoid the search when possible
+        return (
+            _INCLUDE_REGEX.findall(content),
+            _PRAGMA_LIB_REGEX.findall(content) if b"pragma" in content else [],
+        )
+
+    # ----------------------------------------------------------------------
+
+    include_spellings = {}
+    lib_spellings = {}
+
+    with ThreadPoolExecutor(max(1, min(_kit_hashing.GetNumWorkers(max_workers), len(filenames)))) as executor:
+        for includes, libs in executor.map(_trace.Bind(Scan), filenames):
+            for include in includes:
+                for part in include.decode("utf-8", "replace").replace("\\", "/").split("/"):
+                    if part and part not in [os.curdir, os.pardir]:
+                        include_spellings.setdefault(part.lower(), set()).add(part)
+
+            for lib in libs:
+                lib = lib.decode("utf-8", "replace").strip()
+
+                if not lib.lower().endswith(".lib"):
+                    lib += ".lib"
+
+                lib_spellings.setdefault(lib.lower(), set()).add(lib)
+
+    return include_spellings, lib_spellings
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(
+        arity="?",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Build(
+    kit_dir=None,
+    force=False,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Builds the case-folded overlay of the kit's versioned Include and Lib directories; '/force' rebuilds a current overlay"""
+
+    kit_dir = kit_dir or _activation_plan.GetKitDir()
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        dm.stream.write("Building the overlay for '{}'...".format(kit_dir))
+        with dm.stream.DoneManager() as this_dm:
+            if force:
+                Create(kit_dir, {}, max_workers=max_workers)
+
+            elif not Update(kit_dir, {}, max_workers=max_workers):
+                this_dm.stream.write("The overlay is current.\n")
+                return this_dm.result
+
+            this_dm.stream.write(
+                "{} aliases were created.\n".format(len(LoadIndex(kit_dir)["aliases"])),
+            )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetVersionedDirs(kit_dir, library_version_info):
+    include_dir = ActivationActivity.GetVersionedDirectory(
+        library_version_info,
+        kit_dir,
+        "Include",
+    )
+    assert os.path.isdir(include_dir), include_dir
+
+    lib_dir = ActivationActivity.GetVersionedDirectory(
+        library_version_info,
+        kit_dir,
+        "Lib",
+    )
+    assert os.path.isdir(lib_dir), lib_dir
+
+    return include_dir, lib_dir
+
+
+# ----------------------------------------------------------------------
+def _CreateOverlayDir(
+    source_dir,
+    overlay_dir,
+    relative_dir,
+    spellings,
+    is_lib,
+    aliases,
+):
+    """\
+    Mirrors `source_dir` with lowercase names in `overlay_dir`, adding links for every spelling
+    of each name. `aliases` is populated with the overlay path -> kit path of each file.
+    """
+
+    os.makedirs(overlay_dir, exist_ok=True)
+
+    overlay_relative_dir = relative_dir.lower()
+
+    # Names as they exist on disk take precedence over other spellings, and names that fold to
+    # the same value (which is rare) are resolved in sorted order.
+    links = {}
+
+    items = sorted(os.listdir(source_dir))
+
+    for item in items:
+        links[item] = item
+
+    for item in items:
+        folded = item.lower()
+
+        names = set([folded])
+        names.update(spellings.get(folded, []))
+
+        if is_lib and os.path.isfile(os.path.join(source_dir, item)):
+            names.add(item.upper())
+
+        for name in names:
+            links.setdefault(name, item)
+
+    for item in items:
+        source = os.path.join(source_dir, item)
+
+        if os.path.isdir(source):
+            _CreateOverlayDir(
+                source,
+                os.path.join(overlay_dir, item.lower()),
+                "{}/{}".format(relative_dir, item),
+                spellings,
+                is_lib,
+                aliases,
+            )
+
+    for name, item in links.items():
+        source = os.path.join(source_dir, item)
+        dest = os.path.join(overlay_dir, name)
+
+        if os.path.isdir(source):
+            # The dir exists with its lowercase name; other spellings link to it
+            if name != item.lower():
+                os.symlink(item.lower(), dest, target_is_directory=True)
+
+            continue
+
+        os.symlink(os.path.relpath(source, overlay_dir), dest)
+
+        aliases["{}/{}".format(overlay_relative_dir, name)] = "{}/{}".format(relative_dir, item)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
@@ -27,3 +27,11 @@ _script_dir, _script_name                   = os.path.split(_script_fullpath)
 _CUSTOM_DATA                                = [
     ("Windows Kits - 10.0.17763.0", "f8f19a7b35fe7d1c9d651512c9da3fbad9052713ab0f1fcad1252dca9c82dade", ["Libraries", "Windows Kits", "10"]),
 ]
+
+# Merkle root of the installed content (version -> root); installs are verified against the
+# root, and activation verifies the content used by a configuration against it without hashing
+# the rest of the kit. Kits without a root are verified against the SHA256 in _CUSTOM_DATA
+# alone. The root is calculated from the committed content (not an install) and recorded here
+# with `python _merkle_tree.py Root "<kit_dir>" /record`.
+_MERKLE_ROOTS                               = {
+}
@@ -0,0 +1,70 @@
+# ----------------------------------------------------------------------
+# |
+# |  _file_lock.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 21:12:06
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Exclusive, machine-wide locks held on lock files"""
+
+import contextlib
+import os
+import sys
+import time
+
+import CommonEnvironment
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+_POLL_INTERVAL                              = 0.5
+
+
+# ----------------------------------------------------------------------
+@contextlib.contextmanager
+def Lock(filename):
+    """Holds an exclusive lock on `filename`, which is created if it doesn't exist"""
+
+    dirname = os.path.dirname(filename)
+    if dirname and not os.path.isdir(dirname):
+        os.makedirs(dirname, exist_ok=True)
+
+    with open(filename, "a+b") as f:
+        if sys.platform.startswith("win"):
+            import msvcrt
+
+            # msvcrt.locking gives up after 10 seconds when blocking, so poll instead
+            f.seek(0)
+
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(_POLL_INTERVAL)
+
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
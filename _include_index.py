@@ -0,0 +1,348 @@
+# ----------------------------------------------------------------------
+# |
+# |  _include_index.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 14:22:07
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Persistent index of every header in the kit's versioned Include directory.
+
+The index maps an include name to the subdirs that contain it, allowing build tools to
+resolve '#include' statements in the same order as INCLUDE without searching the file system.
+"""
+
+import json
+import os
+import sys
+
+from collections import namedtuple
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+sys.path.insert(0, os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"))
+from RepositoryBootstrap.Impl.ActivationActivity import ActivationActivity
+
+del sys.path[0]
+
+import _activation_plan
+import _kit_hashing
+import _kit_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+INDEX_FILENAME                              = "IncludeIndex.json"
+
+# The subdirs added to INCLUDE during activation, in order
+DEFAULT_SUBDIRS                             = ["shared", "ucrt", "um"]
+
+_INDEX_FORMAT_VERSION                       = 1
+
+# ----------------------------------------------------------------------
+HeaderInfo                                  = namedtuple("HeaderInfo", ["name", "subdir", "size", "hash"])
+
+
+# ----------------------------------------------------------------------
+class IncludeIndex(object):
+    """Headers within a versioned Include directory"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, include_dir, headers):
+        self.include_dir                    = include_dir
+
+        # Include names are case-insensitive on Windows; the lookup key is the normalized
+        # name while the HeaderInfo preserves the name as it exists on disk.
+        self._lookup                        = {}
+
+        for header in headers:
+            self._lookup.setdefault(NormalizeName(header.name), {})[header.subdir] = header
+
+    # ----------------------------------------------------------------------
+    @property
+    def Headers(self):
+        for subdirs in self._lookup.values():
+            yield from subdirs.values()
+
+    # ----------------------------------------------------------------------
+    @property
+    def Subdirs(self):
+        return sorted(set(header.subdir for header in self.Headers))
+
+    # ----------------------------------------------------------------------
+    def Resolve(self, include_name, subdirs=None):
+        """\
+        Returns the HeaderInfo of the header that would be found first when searching
+        `subdirs` (DEFAULT_SUBDIRS if None) in order, or None if no subdir contains it.
+        """
+
+        candidates = self._lookup.get(NormalizeName(include_name))
+        if not candidates:
+            return None
+
+        for subdir in subdirs or DEFAULT_SUBDIRS:
+            header = candidates.get(subdir)
+            if header is not None:
+                return header
+
+        return None
+
+    # ----------------------------------------------------------------------
+    def GetFullpath(self, header):
+        return os.path.join(self.include_dir, header.subdir, *header.name.split("/"))
+
+    # ----------------------------------------------------------------------
+    def GetSubdirsFromIncludeVar(self, include_value):
+        """\
+        Returns the subdirs in this index that appear in `include_value` (the value of
+        the INCLUDE environment variable), in order.
+        """
+
+        include_dir = os.path.normcase(os.path.normpath(self.include_dir))
+        index_subdirs = {os.path.normcase(subdir): subdir for subdir in self.Subdirs}
+
+        subdirs = []
+
+        for value in include_value.split(os.pathsep):
+            value = value.strip()
+            if not value:
+                continue
+
+            dirname, basename = os.path.split(os.path.normcase(os.path.normpath(value)))
+            if dirname != include_dir:
+                continue
+
+            subdir = index_subdirs.get(basename)
+            if subdir is not None and subdir not in subdirs:
+                subdirs.append(subdir)
+
+        return subdirs
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        """Returns the index associated with the kit or None if an index doesn't exist"""
+
+        filename = GetIndexFilename(kit_dir)
+        if not os.path.isfile(filename):
+            return None
+
+        with open(filename) as f:
+            content = json.load(f)
+
+        if content.get("format") != _INDEX_FORMAT_VERSION:
+            return None
+
+        return cls(
+            os.path.join(kit_dir, *content["include_dir"].split("/")),
+            [
+                HeaderInfo(name, subdir, size, file_hash)
+                for subdir, headers in content["subdirs"].items()
+                for name, (size, file_hash) in headers.items()
+            ],
+        )
+
+    # ----------------------------------------------------------------------
+    def Save(self, kit_dir):
+        filename = GetIndexFilename(kit_dir)
+
+        dirname = os.path.dirname(filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        subdirs = {}
+
+        for header in self.Headers:
+            subdirs.setdefault(header.subdir, {})[header.name] = [header.size, header.hash]
+
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _INDEX_FORMAT_VERSION,
+                    "include_dir": os.path.relpath(self.include_dir, kit_dir).replace(os.path.sep, "/"),
+                    "subdirs": subdirs,
+                },
+                f,
+                sort_keys=True,
+            )
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def GetIndexFilename(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), INDEX_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def NormalizeName(include_name):
+    return include_name.replace("\\", "/").lstrip("/").lower()
+
+
+# ----------------------------------------------------------------------
+def Create(
+    kit_dir,
+    library_version_info,
+    max_workers=None,
+):
+    """\
+    Creates an index of the kit's versioned Include directory.
+
+    Hashes are taken from the kit's manifest when it is available; only those files that
+    aren't in the manifest are hashed.
+    """
+
+    include_dir = ActivationActivity.GetVersionedDirectory(
+        library_version_info,
+        kit_dir,
+        "Include",
+    )
+    assert os.path.isdir(include_dir), include_dir
+
+    manifest = _kit_manifest.Manifest.Load(kit_dir)
+    manifest_files = manifest.files if manifest is not None else {}
+
+    manifest_prefix = "{}/".format(os.path.relpath(include_dir, kit_dir).replace(os.path.sep, "/"))
+
+    headers = {}
+    to_hash = []
+
+    for subdir in sorted(os.listdir(include_dir)):
+        subdir_fullpath = os.path.join(include_dir, subdir)
+        if not os.path.isdir(subdir_fullpath):
+            continue
+
+        for root, _, filenames in os.walk(subdir_fullpath):
+            for filename in filenames:
+                fullpath = os.path.join(root, filename)
+                name = os.path.relpath(fullpath, subdir_fullpath).replace(os.path.sep, "/")
+                size = os.path.getsize(fullpath)
+
+                info = manifest_files.get("{}{}/{}".format(manifest_prefix, subdir, name))
+                if info is not None and info.size == size:
+                    headers[(subdir, name)] = HeaderInfo(name, subdir, size, info.hash)
+                else:
+                    headers[(subdir, name)] = HeaderInfo(name, subdir, size, None)
+                    to_hash.append(((subdir, name), fullpath, size))
+
+    for key, file_hash in _kit_hashing.HashFiles(to_hash, max_workers=max_workers).items():
+        headers[key] = headers[key]._replace(hash=file_hash)
+
+    return IncludeIndex(include_dir, headers.values())
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(
+        arity="?",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Build(
+    kit_dir=None,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Builds the index of headers in the kit's versioned Include directory"""
+
+    kit_dir = kit_dir or _activation_plan.GetKitDir()
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        dm.stream.write("Indexing '{}'...".format(kit_dir))
+        with dm.stream.DoneManager() as this_dm:
+            index = Create(
+                kit_dir,
+                {},
+                max_workers=max_workers,
+            )
+            index.Save(kit_dir)
+
+            this_dm.stream.write("{} headers were indexed.\n".format(sum(1 for _ in index.Headers)))
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    include_name=CommandLine.StringTypeInfo(
+        arity="+",
+    ),
+    subdir=CommandLine.StringTypeInfo(
+        arity="*",
+    ),
+    kit_dir=CommandLine.DirectoryTypeInfo(
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Resolve(
+    include_name,
+    subdir=None,
+    kit_dir=None,
+    output_stream=sys.stdout,
+):
+    """\
+    Writes the fullpath of each include name. Subdirs are searched in the order provided by
+    '/subdir=<name>', the order in which they appear in INCLUDE, or the activation order.
+    """
+
+    kit_dir = kit_dir or _activation_plan.GetKitDir()
+
+    index = IncludeIndex.Load(kit_dir)
+    if index is None:
+        output_stream.write("ERROR: The include index for '{}' does not exist; please run Setup.\n".format(kit_dir))
+        return -1
+
+    subdirs = subdir or index.GetSubdirsFromIncludeVar(os.getenv("INCLUDE", "")) or None
+
+    result = 0
+
+    for name in include_name:
+        header = index.Resolve(name, subdirs)
+        if header is None:
+            output_stream.write("ERROR: '{}' could not be resolved.\n".format(name))
+            result = -1
+
+            continue
+
+        output_stream.write("{}\n".format(index.GetFullpath(header)))
+
+    return result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,247 @@
+# ----------------------------------------------------------------------
+# |
+# |  _install_checkpoint.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 18:52:26
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Progress of an install that allows an interrupted Setup to resume.
+
+The checkpoint records whether the hash of the committed parts has been verified, whether
+extraction has completed, and the files that have been extracted (or hashed) and verified.
+A checkpoint is only used when the version, requested architectures, and committed parts
+are the same as when it was written; files are only reused when their stat information
+still matches the checkpoint.
+"""
+
+import json
+import os
+import threading
+import time
+
+import CommonEnvironment
+
+import _kit_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+CHECKPOINT_FILENAME                         = "InstallCheckpoint.json"
+
+_CHECKPOINT_FORMAT_VERSION                  = 1
+
+# Progress is written at most this often (in seconds); the cost of losing this much work is
+# far less than the cost of writing the checkpoint after every file.
+_SAVE_INTERVAL                              = 2.0
+
+
+# ----------------------------------------------------------------------
+class Checkpoint(object):
+    """Progress of an install"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        kit_dir,
+        name,
+        version,
+        architectures,
+        parts_identity,
+        archive_verified=False,
+        extracted=False,
+        files=None,
+    ):
+        self.kit_dir                        = kit_dir
+        self.name                           = name
+        self.version                        = version
+        self.architectures                  = sorted(architectures) if architectures is not None else None
+        self.parts_identity                 = parts_identity
+        self.archive_verified               = archive_verified
+        self.extracted                      = extracted
+
+        # relative_path -> _kit_manifest.FileInfo for files that are known to be complete
+        self.files                          = files or {}
+
+        self._lock                          = threading.Lock()
+        self._last_save                     = 0.0
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(
+        cls,
+        kit_dir,
+        name,
+        version,
+        architectures,
+        parts,
+    ):
+        """Returns the checkpoint if it exists and applies to this install, or None"""
+
+        filename = GetCheckpointFilename(kit_dir)
+        if not os.path.isfile(filename):
+            return None
+
+        try:
+            with open(filename) as f:
+                content = json.load(f)
+
+            checkpoint = cls(
+                kit_dir,
+                content["name"],
+                content["version"],
+                content["architectures"],
+                content["parts_identity"],
+                content["archive_verified"],
+                content["extracted"],
+                {k: _kit_manifest.FileInfo(*v) for k, v in content["files"].items()},
+            )
+
+        except (ValueError, KeyError, TypeError):
+            # The checkpoint is corrupt
+            return None
+
+        if (
+            content.get("format") != _CHECKPOINT_FORMAT_VERSION
+            or checkpoint.name != name
+            or checkpoint.version != version
+            or checkpoint.architectures != (sorted(architectures) if architectures is not None else None)
+            or checkpoint.parts_identity != GetPartsIdentity(parts)
+        ):
+            return None
+
+        return checkpoint
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Create(
+        cls,
+        kit_dir,
+        name,
+        version,
+        architectures,
+        parts,
+    ):
+        checkpoint = cls(
+            kit_dir,
+            name,
+            version,
+            architectures,
+            GetPartsIdentity(parts),
+        )
+
+        checkpoint.Save(force=True)
+
+        return checkpoint
+
+    # ----------------------------------------------------------------------
+    def GetCompleteFiles(self):
+        """\
+        Returns the files that are known to be complete and whose stat information hasn't
+        changed since they were recorded.
+        """
+
+        results = {}
+
+        for relative_path, info in self.files.items():
+            try:
+                stat_result = os.stat(os.path.join(self.kit_dir, *relative_path.split("/")))
+            except FileNotFoundError:
+                continue
+
+            if stat_result.st_size == info.size and stat_result.st_mtime_ns == info.mtime_ns:
+                results[relative_path] = info
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def SetArchiveVerified(self):
+        with self._lock:
+            self.archive_verified = True
+
+        self.Save(force=True)
+
+    # ----------------------------------------------------------------------
+    def SetExtracted(self):
+        with self._lock:
+            self.extracted = True
+
+        self.Save(force=True)
+
+    # ----------------------------------------------------------------------
+    def AddFiles(self, files):
+        """Records files (relative_path -> _kit_manifest.FileInfo) that are complete"""
+
+        with self._lock:
+            self.files.update(files)
+
+        self.Save()
+
+    # ----------------------------------------------------------------------
+    def Save(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+
+            if not force and now - self._last_save < _SAVE_INTERVAL:
+                return
+
+            self._last_save = now
+
+            filename = GetCheckpointFilename(self.kit_dir)
+
+            dirname = os.path.dirname(filename)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+
+            temp_filename = "{}.tmp".format(filename)
+
+            with open(temp_filename, "w") as f:
+                json.dump(
+                    {
+                        "format": _CHECKPOINT_FORMAT_VERSION,
+                        "name": self.name,
+                        "version": self.version,
+                        "architectures": self.architectures,
+                        "parts_identity": self.parts_identity,
+                        "archive_verified": self.archive_verified,
+                        "extracted": self.extracted,
+                        "files": {k: list(v) for k, v in self.files.items()},
+                    },
+                    f,
+                )
+
+            os.replace(temp_filename, filename)
+
+    # ----------------------------------------------------------------------
+    def Delete(self):
+        filename = GetCheckpointFilename(self.kit_dir)
+        if os.path.isfile(filename):
+            os.remove(filename)
+
+
+# ----------------------------------------------------------------------
+def GetCheckpointFilename(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), CHECKPOINT_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def GetPartsIdentity(parts):
+    """Returns a value that changes when any of the committed parts change"""
+
+    results = []
+
+    for part in parts:
+        stat_result = os.stat(part)
+        results.append([os.path.basename(part), stat_result.st_size, stat_result.st_mtime_ns])
+
+    return results
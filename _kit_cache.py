@@ -0,0 +1,252 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_cache.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 20:07:44
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Machine-wide cache of installed kits shared by every clone of the repository.
+
+The hash in _CUSTOM_DATA identifies the content of a kit exactly, so a kit is installed once
+into the cache and each clone's kit dir links to that install. Cache entries are never
+modified once they are complete: an entry contains all architectures or a specific set of
+them, and a clone links to any complete entry that contains the architectures it requires.
+
+Concurrent Setup runs are serialized with a lock file per version.
+"""
+
+import contextlib
+import os
+import shutil
+import stat
+import sys
+
+import CommonEnvironment
+
+import _file_lock
+import _kit_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Environment variable that enables the cache; the value is the directory that contains the
+# cached installs. Each clone installs its own copy of the kit when the variable isn't defined.
+CACHE_DIR_ENV_VAR                           = "DEVELOPMENT_ENVIRONMENT_WINDOWS_KITS_CACHE"
+
+INSTALLS_DIRNAME                            = "installs"
+LOCKS_DIRNAME                               = "locks"
+
+# Prefixes of the committed files required to install a kit ('_Install.7z.NNN' parts and
+# their manifest, the '_Pack.NNN' parts and their index, or the '_Chunks' dir and its index)
+_COMMITTED_PREFIXES                         = ("_Install.7z.", "_Pack.", "_Chunks")
+
+
+# ----------------------------------------------------------------------
+def GetCacheDir():
+    """Returns the cache dir or None if the cache isn't enabled"""
+
+    return os.getenv(CACHE_DIR_ENV_VAR) or None
+
+
+# ----------------------------------------------------------------------
+def GetEntryDir(cache_dir, version, architectures=None):
+    """Returns the dir of the cache entry that contains `architectures` (or all architectures)"""
+
+    if architectures is None:
+        entry_name = version
+    else:
+        entry_name = "-".join([version] + sorted(architectures))
+
+    return os.path.join(cache_dir, INSTALLS_DIRNAME, entry_name)
+
+
+# ----------------------------------------------------------------------
+def FindEntry(cache_dir, version, architectures=None):
+    """\
+    Returns the dir of a complete cache entry that contains `architectures` (or all architectures),
+    or None if one doesn't exist. Entries that contain all architectures are preferred.
+    """
+
+    installs_dir = os.path.join(cache_dir, INSTALLS_DIRNAME)
+    if not os.path.isdir(installs_dir):
+        return None
+
+    candidates = []
+
+    for item in os.listdir(installs_dir):
+        if item != version and not item.startswith("{}-".format(version)):
+            continue
+
+        entry_dir = os.path.join(installs_dir, item)
+
+        manifest = _kit_manifest.Manifest.Load(entry_dir)
+        if manifest is None or manifest.version != version or not manifest.HasArchitectures(architectures):
+            continue
+
+        candidates.append((manifest.architectures is not None, item, entry_dir))
+
+    if not candidates:
+        return None
+
+    candidates.sort()
+
+    return candidates[0][-1]
+
+
+# ----------------------------------------------------------------------
+@contextlib.contextmanager
+def Lock(cache_dir, version):
+    """Holds an exclusive, machine-wide lock on the cache entries for `version`"""
+
+    with _file_lock.Lock(os.path.join(cache_dir, LOCKS_DIRNAME, "{}.lock".format(version))):
+        yield
+
+
+# ----------------------------------------------------------------------
+def LinkParts(kit_dir, entry_dir):
+    """Makes the committed parts in `kit_dir` available in the cache entry"""
+
+    if not os.path.isdir(entry_dir):
+        os.makedirs(entry_dir)
+
+    for item in os.listdir(kit_dir):
+        if not item.startswith(_COMMITTED_PREFIXES):
+            continue
+
+        source = os.path.join(kit_dir, item)
+        dest = os.path.join(entry_dir, item)
+
+        if os.path.exists(dest) or IsLink(dest):
+            if os.path.exists(dest) and os.path.samefile(source, dest):
+                continue
+
+            RemoveLink(dest)
+
+        if os.path.isdir(source):
+            _LinkDirectory(source, dest)
+        else:
+            _LinkOrCopyFile(source, dest)
+
+
+# ----------------------------------------------------------------------
+def RemoveParts(entry_dir):
+    """Removes the parts from a complete cache entry; they are provided again if it must be reinstalled"""
+
+    for item in os.listdir(entry_dir):
+        if item.startswith(_COMMITTED_PREFIXES):
+            RemoveLink(os.path.join(entry_dir, item))
+
+
+# ----------------------------------------------------------------------
+def IsLinked(kit_dir, entry_dir):
+    """Returns True if the content of the kit dir is linked to the cache entry"""
+
+    for item in os.listdir(entry_dir):
+        if item.startswith("_"):
+            continue
+
+        fullpath = os.path.join(kit_dir, item)
+
+        if not os.path.exists(fullpath) or not os.path.samefile(fullpath, os.path.join(entry_dir, item)):
+            return False
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def Link(kit_dir, entry_dir):
+    """\
+    Links the installed content of the cache entry into the kit dir (which must not contain
+    installed content) and writes the entry's manifest to the kit dir.
+    """
+
+    for item in os.listdir(entry_dir):
+        if item.startswith("_"):
+            continue
+
+        source = os.path.join(entry_dir, item)
+        dest = os.path.join(kit_dir, item)
+
+        if os.path.isdir(source):
+            _LinkDirectory(source, dest)
+        else:
+            _LinkOrCopyFile(source, dest)
+
+    # Files are accessed through the links, so their stat information matches the entry's manifest
+    _kit_manifest.Manifest.Load(entry_dir).Save(kit_dir)
+
+
+# ----------------------------------------------------------------------
+def IsLink(fullpath):
+    """Returns True if `fullpath` is a symbolic link or a directory junction"""
+
+    if os.path.islink(fullpath):
+        return True
+
+    if sys.platform.startswith("win"):
+        try:
+            stat_result = os.lstat(fullpath)
+        except FileNotFoundError:
+            return False
+
+        return bool(stat_result.st_file_attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+    return False
+
+
+# ----------------------------------------------------------------------
+def RemoveLink(fullpath):
+    """\
+    Removes a link without modifying the content that it refers to; a directory that isn't a link
+    (for example, a copy) is removed with its content.
+    """
+
+    if IsLink(fullpath):
+        # Directory links and junctions are removed as directories on Windows
+        if sys.platform.startswith("win") and os.path.isdir(fullpath):
+            os.rmdir(fullpath)
+        else:
+            os.remove(fullpath)
+
+    elif os.path.isdir(fullpath):
+        shutil.rmtree(fullpath)
+
+    else:
+        os.remove(fullpath)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _LinkDirectory(source, dest):
+    try:
+        os.symlink(source, dest, target_is_directory=True)
+
+    except OSError:
+        if not sys.platform.startswith("win"):
+            raise
+
+        # Creating symbolic links requires a privilege on Windows, but junctions do not
+        import _winapi
+
+        _winapi.CreateJunction(source, dest)
+
+
+# ----------------------------------------------------------------------
+def _LinkOrCopyFile(source, dest):
+    try:
+        os.link(source, dest)
+    except OSError:
+        # Hard links can't span volumes
+        shutil.copy2(source, dest)
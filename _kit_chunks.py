@@ -0,0 +1,796 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_chunks.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 21:48:36
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Content-defined chunk storage format for the committed kit payload.
+
+The content of the kit (the files in path order) is split into chunks whose boundaries are
+defined by the content itself (FastCDC): a gear hash of the preceding 64 bytes is evaluated at
+each offset, and a chunk ends where the hash matches a mask. Chunks are at least a quarter of
+and at most four times the average chunk size; a stricter mask is used before the average size
+and a looser one after it, so most chunks are close to the average size. Because a boundary
+only depends on the bytes before it, inserting, removing, or changing bytes (within a file or
+by adding or removing files) only changes the chunks around the change; the boundaries after
+it are found at the same content as before.
+
+Each chunk is compressed independently and committed as '_Chunks/<id>.xz', where the id is
+the hash of the chunk's content; '_Chunks.json' describes the layout. Chunks that exist in the
+previous version of the kit are reused as-is, so updating the kit only adds the chunks that
+are new.
+
+As with packed kits, each file is verified against its hash in '_Chunks.json' as it is
+extracted, and the files described by the index are verified against the Merkle root recorded
+for the version in _custom_data.py (when one is recorded) before anything is extracted.
+"""
+
+import bisect
+import hashlib
+import json
+import lzma
+import os
+import sys
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+import _kit_hashing
+import _kit_manifest
+import _kit_pack
+import _merkle_tree
+import _parts_manifest
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+INDEX_FILENAME                              = "_Chunks.json"
+CHUNKS_DIRNAME                              = "_Chunks"
+CHUNK_EXTENSION                             = ".xz"
+
+DEFAULT_AVG_CHUNK_SIZE                      = 2 * 1024 * 1024
+
+# Chunks are never smaller than the average chunk size divided by this value (other than the
+# last chunk) and never larger than this multiple of the average chunk size
+_MIN_CHUNK_SIZE_DIVISOR                     = 4
+_MAX_CHUNK_SIZE_MULTIPLE                    = 4
+
+# Number of bytes that the gear hash depends on
+_GEAR_WINDOW_SIZE                           = 64
+
+# Random values for the gear hash; they are derived from SHA256 so that the content is chunked
+# identically everywhere.
+_GEAR                                       = [
+    int.from_bytes(hashlib.sha256(bytes([value])).digest()[:8], "big")
+    for value in range(256)
+]
+
+_INDEX_FORMAT_VERSION                       = 1
+
+_LZMA_PRESET                                = 6
+
+_READ_BLOCK_SIZE                            = 4 * 1024 * 1024
+
+# ----------------------------------------------------------------------
+ChunkInfo                                   = namedtuple("ChunkInfo", ["id", "size", "compressed_size"])
+
+# `offset` is the offset of the file's content within the content of the kit
+ChunkedFileInfo                             = namedtuple("ChunkedFileInfo", ["size", "hash", "offset"])
+
+
+# ----------------------------------------------------------------------
+class ChunkIndex(object):
+    """Layout of the kit's content within the '_Chunks/<id>.xz' files"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        name,
+        version,
+        tree_hashes,
+        chunks,
+        files,
+    ):
+        self.name                           = name
+        self.version                        = version
+        self.tree_hashes                    = tree_hashes
+        self.chunks                         = chunks
+        self.files                          = files
+
+        # Offset of each chunk's content within the content of the kit
+        self.chunk_offsets                  = []
+
+        offset = 0
+        for chunk in chunks:
+            self.chunk_offsets.append(offset)
+            offset += chunk.size
+
+    # ----------------------------------------------------------------------
+    def Select(self, architectures=None, prefixes=None):
+        """\
+        Returns the relative paths of the shared content and the content for `architectures`
+        (or all content if None) that begin with one of `prefixes` (if provided).
+        """
+
+        results = []
+
+        for relative_path in self.files:
+            if architectures is not None:
+                architecture = _kit_manifest.GetArchitecture(relative_path)
+                if architecture is not None and architecture not in architectures:
+                    continue
+
+            if prefixes and not any(relative_path.startswith(prefix) for prefix in prefixes):
+                continue
+
+            results.append(relative_path)
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def GetChunkIndexes(self, relative_path):
+        """Returns the indexes of the chunks that contain the file's content"""
+
+        info = self.files[relative_path]
+        if info.size == 0:
+            return []
+
+        first = bisect.bisect_right(self.chunk_offsets, info.offset) - 1
+        last = bisect.bisect_right(self.chunk_offsets, info.offset + info.size - 1) - 1
+
+        return list(range(first, last + 1))
+
+    # ----------------------------------------------------------------------
+    def GetPartInfos(self):
+        """Returns _parts_manifest.PartInfo for each chunk file (hashes are not recorded)"""
+
+        return [
+            _parts_manifest.PartInfo(GetChunkRelativePath(chunk.id), chunk.compressed_size, None)
+            for chunk in self.chunks
+        ]
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        """Returns the index of the chunked kit or None if the kit isn't chunked"""
+
+        filename = os.path.join(kit_dir, INDEX_FILENAME)
+        if not os.path.isfile(filename):
+            return None
+
+        with open(filename) as f:
+            content = json.load(f)
+
+        if content.get("format") != _INDEX_FORMAT_VERSION:
+            return None
+
+        return cls(
+            content["name"],
+            content["version"],
+            content["tree_hashes"],
+            [ChunkInfo(*chunk) for chunk in content["chunks"]],
+            {k: ChunkedFileInfo(*v) for k, v in content["files"].items()},
+        )
+
+    # ----------------------------------------------------------------------
+    def Save(self, output_dir):
+        filename = os.path.join(output_dir, INDEX_FILENAME)
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _INDEX_FORMAT_VERSION,
+                    "name": self.name,
+                    "version": self.version,
+                    "tree_hashes": self.tree_hashes,
+                    "chunks": [list(chunk) for chunk in self.chunks],
+                    "files": {k: list(v) for k, v in self.files.items()},
+                },
+                f,
+                sort_keys=True,
+                indent=1,
+            )
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def HasChunks(kit_dir):
+    return os.path.isfile(os.path.join(kit_dir, INDEX_FILENAME))
+
+
+# ----------------------------------------------------------------------
+def GetChunkRelativePath(chunk_id):
+    return "{}/{}{}".format(CHUNKS_DIRNAME, chunk_id, CHUNK_EXTENSION)
+
+
+# ----------------------------------------------------------------------
+def Create(
+    manifest,
+    kit_dir,
+    output_dir,
+    avg_chunk_size=DEFAULT_AVG_CHUNK_SIZE,
+    max_workers=None,
+):
+    """\
+    Chunks the installed kit described by the (verified) manifest into `output_dir`, returning
+    (index, num_new_chunks). Chunk files that already exist in `output_dir` are reused and
+    chunk files that are no longer referenced are removed.
+    """
+
+    max_workers = _kit_hashing.GetNumWorkers(max_workers)
+
+    # The content of the kit is the content of its files in path order
+    files = {}
+    offset = 0
+
+    for relative_path in sorted(manifest.files):
+        info = manifest.files[relative_path]
+
+        files[relative_path] = ChunkedFileInfo(info.size, info.hash, offset)
+        offset += info.size
+
+    # Empty files don't contribute any content
+    relative_paths = [relative_path for relative_path in files if files[relative_path].size]
+    file_offsets = [files[relative_path].offset for relative_path in relative_paths]
+
+    # Find the boundaries of the chunks; the content is read sequentially (the boundaries depend
+    # on the content before them) and each chunk's id is the hash of its content.
+    finder = _BoundaryFinder(avg_chunk_size)
+
+    chunk_ids = []
+    chunk_sizes = []
+
+    hasher = hashlib.sha256()
+    chunk_size = 0
+
+    for relative_path in relative_paths:
+        with open(os.path.join(kit_dir, *relative_path.split("/")), "rb") as f:
+            while True:
+                block = f.read(_READ_BLOCK_SIZE)
+                if not block:
+                    break
+
+                view = memoryview(block)
+                begin = 0
+
+                for end in finder.Find(block):
+                    hasher.update(view[begin:end])
+                    chunk_size += end - begin
+
+                    chunk_ids.append(hasher.hexdigest())
+                    chunk_sizes.append(chunk_size)
+
+                    hasher = hashlib.sha256()
+                    chunk_size = 0
+
+                    begin = end
+
+                hasher.update(view[begin:])
+                chunk_size += len(block) - begin
+
+    if chunk_size:
+        chunk_ids.append(hasher.hexdigest())
+        chunk_sizes.append(chunk_size)
+
+    # Write the chunks that don't already exist
+    chunks_dir = os.path.join(output_dir, CHUNKS_DIRNAME)
+    if not os.path.isdir(chunks_dir):
+        os.makedirs(chunks_dir)
+
+    chunk_offsets = []
+
+    offset = 0
+    for chunk_size in chunk_sizes:
+        chunk_offsets.append(offset)
+        offset += chunk_size
+
+    # ----------------------------------------------------------------------
+    def WriteChunk(chunk_index):
+        filename = os.path.join(output_dir, *GetChunkRelativePath(chunk_ids[chunk_index]).split("/"))
+
+        if os.path.isfile(filename):
+            return os.path.getsize(filename), False
+
+        begin = chunk_offsets[chunk_index]
+        end = begin + chunk_sizes[chunk_index]
+
+        content = []
+        file_index = bisect.bisect_right(file_offsets, begin) - 1
+
+        while begin < end:
+            relative_path = relative_paths[file_index]
+            info = files[relative_path]
+
+            with open(os.path.join(kit_dir, *relative_path.split("/")), "rb") as f:
+                f.seek(begin - info.offset)
+                content.append(f.read(min(end, info.offset + info.size) - begin))
+
+            begin += len(content[-1])
+            file_index += 1
+
+        content = b"".join(content)
+
+        if hashlib.sha256(content).hexdigest() != chunk_ids[chunk_index]:
+            raise Exception("The content of '{}' changed while it was chunked".format(kit_dir))
+
+        compressed = lzma.compress(content, preset=_LZMA_PRESET)
+
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "wb") as f:
+            f.write(compressed)
+
+        os.replace(temp_filename, filename)
+
+        return len(compressed), True
+
+    # ----------------------------------------------------------------------
+
+    # Chunks with the same content are only written once
+    chunk_indexes = {}
+
+    for chunk_index, chunk_id in enumerate(chunk_ids):
+        chunk_indexes.setdefault(chunk_id, chunk_index)
+
+    with ThreadPoolExecutor(max(1, min(max_workers, len(chunk_indexes)))) as executor:
+        write_results = dict(zip(chunk_indexes, executor.map(_trace.Bind(WriteChunk), chunk_indexes.values())))
+
+    chunks = [
+        ChunkInfo(chunk_id, chunk_size, write_results[chunk_id][0])
+        for chunk_id, chunk_size in zip(chunk_ids, chunk_sizes)
+    ]
+
+    # Remove chunks that are no longer referenced
+    referenced = set("{}{}".format(chunk_id, CHUNK_EXTENSION) for chunk_id in chunk_ids)
+
+    for item in os.listdir(chunks_dir):
+        if item not in referenced:
+            os.remove(os.path.join(chunks_dir, item))
+
+    # Create the index
+    tree_hashes = manifest.ArchitectureTreeHashes
+    tree_hashes[""] = manifest.TreeHash
+
+    index = ChunkIndex(
+        manifest.name,
+        manifest.version,
+        tree_hashes,
+        chunks,
+        files,
+    )
+
+    index.Save(output_dir)
+
+    return index, sum(1 for _, is_new in write_results.values() if is_new)
+
+
+# ----------------------------------------------------------------------
+def ReadChunk(kit_dir, index, chunk_index):
+    """Returns the decompressed content of a chunk"""
+
+    chunk = index.chunks[chunk_index]
+
+    with open(os.path.join(kit_dir, *GetChunkRelativePath(chunk.id).split("/")), "rb") as f:
+        compressed = f.read()
+
+    _trace.AddCounters(
+        bytes_read=len(compressed),
+    )
+
+    content = lzma.decompress(compressed)
+
+    if len(content) != chunk.size:
+        raise Exception("The chunk '{}' is corrupt".format(chunk.id))
+
+    return content
+
+
+# ----------------------------------------------------------------------
+def Extract(
+    kit_dir,
+    index,
+    output_dir,
+    relative_paths,
+    max_workers=None,
+    on_extracted=None,
+):
+    """\
+    Extracts the files to `output_dir`, verifying the hash of each file. Chunks are decompressed
+    and written in parallel; this accepts the same arguments as `_kit_pack.Extract`.
+
+    Returns a dict of relative_path -> _kit_manifest.FileInfo.
+    """
+
+    chunk_paths = {}
+    spanning_paths = []
+    results = {}
+
+    for relative_path in relative_paths:
+        info = index.files[relative_path]
+        fullpath = os.path.join(output_dir, *relative_path.split("/"))
+
+        chunk_indexes = index.GetChunkIndexes(relative_path)
+
+        if len(chunk_indexes) < 2:
+            if not chunk_indexes:
+                # Empty files aren't stored in any chunk
+                _WriteFile(fullpath, b"")
+                results[relative_path] = _kit_manifest.FileInfo(0, os.stat(fullpath).st_mtime_ns, info.hash)
+
+                continue
+
+        else:
+            # Files that span chunks are written at their offsets by the chunks that contain
+            # them and verified once all of the chunks have been written.
+            _WriteFile(fullpath, b"")
+
+            with open(fullpath, "r+b") as f:
+                f.truncate(info.size)
+
+            spanning_paths.append(relative_path)
+
+        for chunk_index in chunk_indexes:
+            chunk_paths.setdefault(chunk_index, []).append(relative_path)
+
+    spanning_paths_set = set(spanning_paths)
+
+    # ----------------------------------------------------------------------
+    def ExtractChunk(chunk_index):
+        content = ReadChunk(kit_dir, index, chunk_index)
+        chunk_offset = index.chunk_offsets[chunk_index]
+
+        these_results = {}
+
+        for relative_path in chunk_paths[chunk_index]:
+            info = index.files[relative_path]
+            fullpath = os.path.join(output_dir, *relative_path.split("/"))
+
+            begin = max(info.offset, chunk_offset)
+            end = min(info.offset + info.size, chunk_offset + len(content))
+
+            file_content = content[begin - chunk_offset : end - chunk_offset]
+
+            if relative_path in spanning_paths_set:
+                with open(fullpath, "r+b") as f:
+                    f.seek(begin - info.offset)
+                    f.write(file_content)
+
+                continue
+
+            if hashlib.sha256(file_content).hexdigest() != info.hash:
+                raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+            _trace.AddCounters(
+                bytes_hashed=info.size,
+            )
+
+            _WriteFile(fullpath, file_content)
+
+            these_results[relative_path] = _kit_manifest.FileInfo(
+                info.size,
+                os.stat(fullpath).st_mtime_ns,
+                info.hash,
+            )
+
+        if on_extracted is not None and these_results:
+            on_extracted(these_results)
+
+        return these_results
+
+    # ----------------------------------------------------------------------
+
+    max_workers = _kit_hashing.GetNumWorkers(max_workers)
+
+    chunk_indexes = sorted(chunk_paths)
+
+    if max_workers == 1 or len(chunk_indexes) < 2:
+        for chunk_index in chunk_indexes:
+            results.update(ExtractChunk(chunk_index))
+    else:
+        with ThreadPoolExecutor(min(max_workers, len(chunk_indexes))) as executor:
+            for chunk_results in executor.map(_trace.Bind(ExtractChunk), chunk_indexes):
+                results.update(chunk_results)
+
+    # Verify the files that span chunks
+    if spanning_paths:
+        spanning_results = {}
+
+        for relative_path, file_hash in _kit_hashing.HashFiles(
+            [
+                (relative_path, os.path.join(output_dir, *relative_path.split("/")), index.files[relative_path].size)
+                for relative_path in spanning_paths
+            ],
+            max_workers=max_workers,
+        ).items():
+            info = index.files[relative_path]
+
+            if file_hash != info.hash:
+                raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+            spanning_results[relative_path] = _kit_manifest.FileInfo(
+                info.size,
+                os.stat(os.path.join(output_dir, *relative_path.split("/"))).st_mtime_ns,
+                info.hash,
+            )
+
+        if on_extracted is not None:
+            on_extracted(spanning_results)
+
+        results.update(spanning_results)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def Install(
+    name,
+    kit_dir,
+    version,
+    output_stream,
+    max_workers=None,
+    store_dir=None,
+    architectures=None,
+    previous_manifest=None,
+    merkle_root=None,
+):
+    """\
+    Installs the kit from its '_Chunks/<id>.xz' files; this is the equivalent of
+    `_kit_pack.Install` for chunked kits and accepts the same arguments.
+
+    Returns 0 on success or a non-zero value on failure.
+    """
+
+    index = ChunkIndex.Load(kit_dir)
+    assert index is not None, kit_dir
+
+    return _kit_pack.InstallFromIndex(
+        name,
+        kit_dir,
+        version,
+        output_stream,
+        index,
+        index.GetPartInfos(),
+        Extract,
+        max_workers=max_workers,
+        store_dir=store_dir,
+        architectures=architectures,
+        previous_manifest=previous_manifest,
+        merkle_root=merkle_root,
+    )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    output_dir=CommandLine.DirectoryTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    avg_chunk_size=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Chunk(
+    kit_dir,
+    output_dir=None,
+    avg_chunk_size=DEFAULT_AVG_CHUNK_SIZE,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """\
+    Writes the installed kit as content-defined chunks (to the kit dir by default); chunks
+    written for a previous version of the kit are reused.
+    """
+
+    output_dir = output_dir or kit_dir
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        manifest = _kit_manifest.Manifest.Load(kit_dir)
+        if manifest is None:
+            dm.stream.write("ERROR: The manifest for '{}' does not exist; please run Setup.\n".format(kit_dir))
+            dm.result = -1
+
+            return dm.result
+
+        if manifest.architectures is not None:
+            dm.stream.write("ERROR: Only some architectures were installed; please run Setup for all configurations.\n")
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Verifying '{}'...".format(manifest.name))
+        with dm.stream.DoneManager() as this_dm:
+            result = _kit_manifest.Verify(
+                manifest,
+                kit_dir,
+                force=True,
+                max_workers=max_workers,
+            )
+
+            if not result.IsValid:
+                this_dm.stream.write(result.Describe())
+                this_dm.result = -1
+
+                return this_dm.result
+
+        dm.stream.write("Chunking '{}'...".format(manifest.name))
+        with dm.stream.DoneManager() as this_dm:
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir)
+
+            index, num_new_chunks = Create(
+                manifest,
+                kit_dir,
+                output_dir,
+                avg_chunk_size=avg_chunk_size,
+                max_workers=max_workers,
+            )
+
+            this_dm.stream.write(
+                "{} files were written to {} chunks ({} new, {} reused).\n".format(
+                    len(index.files),
+                    len(index.chunks),
+                    num_new_chunks,
+                    len(index.chunks) - num_new_chunks,
+                ),
+            )
+
+            # Setup verifies the chunks against this root once it is recorded
+            this_dm.stream.write(
+                "The Merkle root of '{}' ('{}') is '{}'; record it in _MERKLE_ROOTS in _custom_data.py.\n".format(
+                    index.name,
+                    index.version,
+                    _merkle_tree.GetRoot(
+                        {relative_path: (info.size, info.hash) for relative_path, info in index.files.items()},
+                    ),
+                ),
+            )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _BoundaryFinder(object):
+    """Finds the chunk boundaries in content that is provided in blocks"""
+
+    _HASH_MASK                              = (1 << 64) - 1
+
+    # ----------------------------------------------------------------------
+    def __init__(self, avg_chunk_size):
+        self._min_size                      = avg_chunk_size // _MIN_CHUNK_SIZE_DIVISOR
+        self._avg_size                      = avg_chunk_size
+        self._max_size                      = avg_chunk_size * _MAX_CHUNK_SIZE_MULTIPLE
+
+        # The hash only depends on the preceding bytes, so hashing starts just before the first
+        # offset at which a chunk can end.
+        self._hash_start                    = max(self._min_size - _GEAR_WINDOW_SIZE, 0)
+
+        # The masks select the high bits of the hash (which depend on all of the preceding
+        # bytes); the strict mask matches half as often as the average chunk size requires and
+        # the loose mask twice as often (normalized chunking).
+        num_bits = max(avg_chunk_size.bit_length() - 1, 2)
+
+        self._strict_mask                   = ((1 << (num_bits + 1)) - 1) << (64 - num_bits - 1)
+        self._loose_mask                    = ((1 << (num_bits - 1)) - 1) << (64 - num_bits + 1)
+
+        self._chunk_size                    = 0
+        self._hash                          = 0
+
+    # ----------------------------------------------------------------------
+    def Find(self, block):
+        """Returns the offsets within the block at which chunks end"""
+
+        gear = _GEAR
+        hash_mask = self._HASH_MASK
+
+        results = []
+
+        offset = 0
+        block_size = len(block)
+
+        while offset < block_size:
+            chunk_size = self._chunk_size
+
+            if chunk_size < self._hash_start:
+                num_bytes = min(block_size - offset, self._hash_start - chunk_size)
+            else:
+                if chunk_size < self._min_size:
+                    limit = self._min_size
+                    mask = None
+                elif chunk_size < self._avg_size:
+                    limit = self._avg_size
+                    mask = self._strict_mask
+                else:
+                    limit = self._max_size
+                    mask = self._loose_mask
+
+                end = min(block_size, offset + limit - chunk_size)
+                hash_value = self._hash
+
+                if mask is None:
+                    for value in block[offset:end]:
+                        hash_value = ((hash_value << 1) + gear[value]) & hash_mask
+                else:
+                    index = offset
+
+                    for value in block[offset:end]:
+                        hash_value = ((hash_value << 1) + gear[value]) & hash_mask
+                        index += 1
+
+                        if not hash_value & mask:
+                            end = index
+                            break
+
+                self._hash = hash_value
+                num_bytes = end - offset
+
+                # A chunk ends when the hash matches or the chunk reaches the maximum size
+                if mask is not None and (not hash_value & mask or chunk_size + num_bytes == self._max_size):
+                    results.append(end)
+
+                    self._chunk_size = 0
+                    self._hash = 0
+
+                    offset = end
+                    continue
+
+            self._chunk_size += num_bytes
+            offset += num_bytes
+
+        return results
+
+
+# ----------------------------------------------------------------------
+def _WriteFile(fullpath, content):
+    dirname = os.path.dirname(fullpath)
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname, exist_ok=True)
+
+    with open(fullpath, "wb") as f:
+        f.write(content)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
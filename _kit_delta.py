@@ -0,0 +1,881 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_delta.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 23:58:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+In-place upgrade of an installed kit to a new version (identity in _CUSTOM_DATA).
+
+The delta between two installed kits (the files that were added, replaced, and removed) is
+created by the CreateDelta command and committed with the new version as '_Delta.NNN' parts
+and '_Delta.json'. When Setup finds an install of the version that the delta was created from,
+only the changed files are extracted and moved into place.
+
+Each changed file is verified against its hash in the index as it is extracted. When a Merkle
+root is recorded for the new version in _custom_data.py, the upgraded content is also verified
+against it before the installed kit is modified. The index records the Merkle nodes of the new
+version, which stand in for the content of architectures that weren't installed when a partial
+install is upgraded (the installed content must still hash to the recorded root).
+
+The changes are applied atomically: new content is extracted and verified before the installed
+kit is modified, replaced and removed files are moved aside (rather than deleted), and a journal
+records the changes so that a failed (or interrupted) upgrade is rolled back to the previous
+version.
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import sys
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+import _kit_hashing
+import _kit_manifest
+import _kit_store
+import _merkle_tree
+import _parts_manifest
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+INDEX_FILENAME                              = "_Delta.json"
+PART_FILENAME_TEMPLATE                      = "_Delta.{:03d}"
+
+DEFAULT_PART_SIZE                           = 64 * 1024 * 1024
+
+# Created in the kit's metadata dir while a delta is applied
+STAGING_DIRNAME                             = "Delta"
+JOURNAL_FILENAME                            = "DeltaJournal.json"
+
+_INDEX_FORMAT_VERSION                       = 2
+_JOURNAL_FORMAT_VERSION                     = 1
+
+_LZMA_PRESET                                = 6
+
+# ----------------------------------------------------------------------
+DeltaFileInfo                               = namedtuple("DeltaFileInfo", ["size", "hash", "part", "offset", "compressed_size"])
+
+
+# ----------------------------------------------------------------------
+class DeltaIndex(object):
+    """Changes between the installed content of two versions of a kit"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        name,
+        from_version,
+        version,
+        merkle_nodes,
+        parts,
+        files,
+        removed,
+    ):
+        self.name                           = name
+        self.from_version                   = from_version
+        self.version                        = version
+
+        # dir -> hash for the complete install of `version`
+        self.merkle_nodes                   = merkle_nodes
+
+        self.parts                          = parts
+
+        # relative_path -> DeltaFileInfo for files that were added or replaced
+        self.files                          = files
+
+        self.removed                        = removed
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        """Returns the index of the delta or None if a delta hasn't been committed"""
+
+        filename = os.path.join(kit_dir, INDEX_FILENAME)
+        if not os.path.isfile(filename):
+            return None
+
+        with open(filename) as f:
+            content = json.load(f)
+
+        if content.get("format") != _INDEX_FORMAT_VERSION:
+            return None
+
+        return cls(
+            content["name"],
+            content["from_version"],
+            content["version"],
+            content["merkle_nodes"],
+            content["parts"],
+            {k: DeltaFileInfo(*v) for k, v in content["files"].items()},
+            content["removed"],
+        )
+
+    # ----------------------------------------------------------------------
+    def Save(self, output_dir):
+        filename = os.path.join(output_dir, INDEX_FILENAME)
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _INDEX_FORMAT_VERSION,
+                    "name": self.name,
+                    "from_version": self.from_version,
+                    "version": self.version,
+                    "merkle_nodes": self.merkle_nodes,
+                    "parts": self.parts,
+                    "files": {k: list(v) for k, v in self.files.items()},
+                    "removed": self.removed,
+                },
+                f,
+                sort_keys=True,
+                indent=1,
+            )
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def HasDelta(kit_dir):
+    return os.path.isfile(os.path.join(kit_dir, INDEX_FILENAME))
+
+
+# ----------------------------------------------------------------------
+def GetStagingDir(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), STAGING_DIRNAME)
+
+
+# ----------------------------------------------------------------------
+def GetJournalFilename(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), JOURNAL_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def IsApplicable(kit_dir, version):
+    """Returns True if the kit has an install that the committed delta upgrades to `version`"""
+
+    index = DeltaIndex.Load(kit_dir)
+    if index is None or index.version != version:
+        return False
+
+    manifest = _kit_manifest.Manifest.Load(kit_dir)
+
+    return manifest is not None and manifest.version == index.from_version
+
+
+# ----------------------------------------------------------------------
+def Create(
+    from_manifest,
+    manifest,
+    kit_dir,
+    output_dir,
+    part_size=DEFAULT_PART_SIZE,
+):
+    """\
+    Writes the delta that upgrades the kit described by `from_manifest` to the installed kit
+    described by the (verified) `manifest` to `output_dir`, returning the index.
+    """
+
+    changed = sorted(
+        relative_path
+        for relative_path, info in manifest.files.items()
+        if relative_path not in from_manifest.files
+        or from_manifest.files[relative_path].hash != info.hash
+        or from_manifest.files[relative_path].size != info.size
+    )
+
+    removed = sorted(
+        relative_path
+        for relative_path in from_manifest.files
+        if relative_path not in manifest.files
+    )
+
+    for item in os.listdir(output_dir):
+        if item == INDEX_FILENAME or item.startswith("_Delta."):
+            os.remove(os.path.join(output_dir, item))
+
+    parts = []
+    files = {}
+
+    part_file = None
+    part_hasher = None
+
+    try:
+        for relative_path in changed:
+            with open(os.path.join(kit_dir, *relative_path.split("/")), "rb") as f:
+                compressed = lzma.compress(f.read(), preset=_LZMA_PRESET)
+
+            if part_file is None or (part_file.tell() and part_file.tell() + len(compressed) > part_size):
+                if part_file is not None:
+                    parts[-1]["size"] = part_file.tell()
+                    parts[-1]["hash"] = part_hasher.hexdigest()
+                    part_file.close()
+
+                parts.append({"name": PART_FILENAME_TEMPLATE.format(len(parts) + 1)})
+
+                part_file = open(os.path.join(output_dir, parts[-1]["name"]), "wb")
+                part_hasher = hashlib.sha256()
+
+            info = manifest.files[relative_path]
+
+            files[relative_path] = DeltaFileInfo(
+                info.size,
+                info.hash,
+                len(parts) - 1,
+                part_file.tell(),
+                len(compressed),
+            )
+
+            part_file.write(compressed)
+            part_hasher.update(compressed)
+
+        if part_file is not None:
+            parts[-1]["size"] = part_file.tell()
+            parts[-1]["hash"] = part_hasher.hexdigest()
+
+    finally:
+        if part_file is not None:
+            part_file.close()
+
+    index = DeltaIndex(
+        manifest.name,
+        from_manifest.version,
+        manifest.version,
+        manifest.MerkleNodes,
+        parts,
+        files,
+        removed,
+    )
+
+    index.Save(output_dir)
+
+    return index
+
+
+# ----------------------------------------------------------------------
+def Apply(
+    name,
+    kit_dir,
+    version,
+    output_stream,
+    max_workers=None,
+    store_dir=None,
+    merkle_root=None,
+):
+    """\
+    Upgrades the installed kit to `version` by applying the committed delta; `IsApplicable`
+    must be True. The installed kit is verified before it is modified and each changed file is
+    verified against its hash in the index as it is extracted. When `merkle_root` (the root
+    recorded for `version` in _custom_data.py) is provided, the upgraded kit is verified against
+    it before anything is extracted. Content for architectures that weren't installed isn't
+    added.
+
+    Returns 0 on success or a non-zero value on failure; the previous version remains installed
+    on failure.
+    """
+
+    index = DeltaIndex.Load(kit_dir)
+    assert index is not None and index.version == version, kit_dir
+
+    previous_manifest = _kit_manifest.Manifest.Load(kit_dir)
+    assert previous_manifest is not None and previous_manifest.version == index.from_version, kit_dir
+
+    # Missing and truncated parts are found before anything is extracted (the content of each
+    # file is verified as it is extracted).
+    errors = _parts_manifest.CheckParts(
+        kit_dir,
+        [_parts_manifest.PartInfo(part["name"], part["size"], part["hash"]) for part in index.parts],
+        check_hashes=False,
+    )
+
+    if errors:
+        output_stream.write(_parts_manifest.DescribeErrors(errors))
+        return -1
+
+    with _trace.Span("Verify", name=name):
+        verify_result = _kit_manifest.Verify(
+            previous_manifest,
+            kit_dir,
+            max_workers=max_workers,
+        )
+
+    if not verify_result.IsValid:
+        output_stream.write(verify_result.Describe())
+        output_stream.write("ERROR: The delta can't be applied to '{}' because its content has changed.\n".format(name))
+
+        return -1
+
+    # ----------------------------------------------------------------------
+    def IsInstalled(relative_path):
+        architecture = _kit_manifest.GetArchitecture(relative_path)
+
+        return (
+            architecture is None
+            or previous_manifest.architectures is None
+            or architecture in previous_manifest.architectures
+        )
+
+    # ----------------------------------------------------------------------
+
+    added = sorted(
+        relative_path
+        for relative_path in index.files
+        if relative_path not in previous_manifest.files and IsInstalled(relative_path)
+    )
+
+    replaced = sorted(
+        relative_path
+        for relative_path in index.files
+        if relative_path in previous_manifest.files
+    )
+
+    removed = sorted(
+        relative_path
+        for relative_path in index.removed
+        if relative_path in previous_manifest.files
+    )
+
+    # Verify the upgraded content before anything is extracted
+    if merkle_root is not None:
+        with _trace.Span("VerifyMerkleRoot", name=name):
+            actual_root = _CalculateRoot(index, previous_manifest, added + replaced, removed)
+
+        if actual_root != merkle_root:
+            output_stream.write(
+                "ERROR: The Merkle root of the content upgraded by the delta for '{}' is '{}' but '{}' was expected.\n".format(
+                    name,
+                    actual_root,
+                    merkle_root,
+                ),
+            )
+
+            return -1
+
+    staging_dir = GetStagingDir(kit_dir)
+
+    if os.path.isdir(staging_dir):
+        shutil.rmtree(staging_dir)
+
+    relative_paths = added + replaced
+
+    files = {}
+    bytes_deduplicated = 0
+    bytes_copied = 0
+
+    # Extract (and verify) the new content before the installed kit is modified
+    try:
+        # Content that is already in the store is linked rather than extracted
+        if store_dir is not None:
+            with _trace.Span("Materialize", name=name):
+                files, bytes_deduplicated, bytes_copied = _kit_store.Materialize(
+                    store_dir,
+                    {relative_path: index.files[relative_path] for relative_path in relative_paths},
+                    os.path.join(staging_dir, "New"),
+                    max_workers=max_workers,
+                )
+
+            relative_paths = [relative_path for relative_path in relative_paths if relative_path not in files]
+
+        with _trace.Span("ExtractDelta", name=name):
+            files.update(
+                _Extract(
+                    kit_dir,
+                    index,
+                    os.path.join(staging_dir, "New"),
+                    relative_paths,
+                    max_workers,
+                ),
+            )
+
+    except Exception as ex:
+        output_stream.write("ERROR: Extracting the delta for '{}' failed ({}).\n".format(name, ex))
+
+        _RemoveStaging(kit_dir)
+        return -1
+
+    _SaveJournal(
+        kit_dir,
+        {
+            "format": _JOURNAL_FORMAT_VERSION,
+            "from_version": index.from_version,
+            "version": version,
+            "added": added,
+            "replaced": replaced,
+            "removed": removed,
+        },
+    )
+
+    try:
+        with _trace.Span("MoveDelta", name=name):
+            # Replaced and removed files are moved aside so that they can be restored
+            for relative_path in replaced + removed:
+                _Move(kit_dir, os.path.join(staging_dir, "Old"), relative_path)
+
+            for relative_path in added + replaced:
+                _Move(os.path.join(staging_dir, "New"), kit_dir, relative_path)
+
+            _RemoveEmptyDirs(kit_dir, removed)
+
+        manifest_files = {
+            relative_path: info
+            for relative_path, info in previous_manifest.files.items()
+            if relative_path not in index.files and relative_path not in removed
+        }
+
+        for relative_path in added + replaced:
+            fullpath = os.path.join(kit_dir, *relative_path.split("/"))
+
+            manifest_files[relative_path] = files[relative_path]._replace(
+                mtime_ns=os.stat(fullpath).st_mtime_ns,
+            )
+
+        manifest = _kit_manifest.Manifest(name, version, manifest_files, previous_manifest.architectures)
+
+        # Every file is where the manifest expects it to be
+        with _trace.Span("Verify", name=name):
+            verify_result = _kit_manifest.Verify(
+                manifest,
+                kit_dir,
+                update_stat_info=False,
+                max_workers=max_workers,
+            )
+
+        if not verify_result.IsValid:
+            raise Exception("The upgraded content is not valid:\n{}".format(verify_result.Describe().rstrip()))
+
+        if store_dir is not None:
+            with _trace.Span("Ingest", name=name):
+                ingest_bytes_deduplicated, ingest_bytes_copied = _kit_store.Ingest(manifest, kit_dir, store_dir)
+
+            output_stream.write(
+                _kit_store.DescribeSharing(
+                    bytes_deduplicated + ingest_bytes_deduplicated,
+                    bytes_copied + ingest_bytes_copied,
+                ),
+            )
+
+        manifest.Save(kit_dir)
+
+    except Exception as ex:
+        output_stream.write("ERROR: Applying the delta to '{}' failed ({}).\n".format(name, ex))
+
+        RollBack(kit_dir)
+        output_stream.write("'{}' was restored to '{}'.\n".format(name, index.from_version))
+
+        return -1
+
+    # The manifest describes the new version, so the upgrade is complete
+    _RemoveStaging(kit_dir)
+
+    output_stream.write(
+        "'{}' was upgraded from '{}' ({} added, {} replaced, {} removed).\n".format(
+            name,
+            index.from_version,
+            len(added),
+            len(replaced),
+            len(removed),
+        ),
+    )
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+def RollBack(kit_dir):
+    """\
+    Restores the installed kit to the version it had before an upgrade that failed or was
+    interrupted; returns False if an upgrade wasn't in progress. An upgrade that was interrupted
+    after its manifest was written is complete and isn't rolled back.
+    """
+
+    journal = _LoadJournal(kit_dir)
+    if journal is None:
+        _RemoveStaging(kit_dir)
+        return False
+
+    manifest = _kit_manifest.Manifest.Load(kit_dir)
+
+    if manifest is None or manifest.version != journal["version"]:
+        staging_dir = GetStagingDir(kit_dir)
+
+        for relative_path in journal["added"]:
+            fullpath = os.path.join(kit_dir, *relative_path.split("/"))
+
+            if os.path.isfile(fullpath):
+                os.remove(fullpath)
+
+        # Files that weren't moved aside are still in place
+        for relative_path in journal["replaced"] + journal["removed"]:
+            if os.path.isfile(os.path.join(staging_dir, "Old", *relative_path.split("/"))):
+                _Move(os.path.join(staging_dir, "Old"), kit_dir, relative_path)
+
+        _RemoveEmptyDirs(kit_dir, journal["added"])
+
+    _RemoveStaging(kit_dir)
+
+    return True
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    from_kit_dir=CommandLine.DirectoryTypeInfo(),
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    output_dir=CommandLine.DirectoryTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    part_size=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def CreateDelta(
+    from_kit_dir,
+    kit_dir,
+    output_dir=None,
+    part_size=DEFAULT_PART_SIZE,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """\
+    Writes the delta that upgrades an install of the previous version of a kit (in
+    `from_kit_dir`) to the installed kit in `kit_dir`; the delta is written to `kit_dir` by
+    default and should be committed with the new version.
+    """
+
+    output_dir = output_dir or kit_dir
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        manifests = []
+
+        for this_kit_dir in [from_kit_dir, kit_dir]:
+            manifest = _kit_manifest.Manifest.Load(this_kit_dir)
+            if manifest is None:
+                dm.stream.write("ERROR: The manifest for '{}' does not exist; please run Setup.\n".format(this_kit_dir))
+                dm.result = -1
+
+                return dm.result
+
+            if manifest.architectures is not None:
+                dm.stream.write("ERROR: Only some architectures were installed in '{}'; please run Setup for all configurations.\n".format(this_kit_dir))
+                dm.result = -1
+
+                return dm.result
+
+            dm.stream.write("Verifying '{}'...".format(this_kit_dir))
+            with dm.stream.DoneManager() as this_dm:
+                result = _kit_manifest.Verify(
+                    manifest,
+                    this_kit_dir,
+                    force=True,
+                    max_workers=max_workers,
+                )
+
+                if not result.IsValid:
+                    this_dm.stream.write(result.Describe())
+                    this_dm.result = -1
+
+                    return this_dm.result
+
+            manifests.append(manifest)
+
+        from_manifest, manifest = manifests
+
+        if from_manifest.version == manifest.version:
+            dm.stream.write("ERROR: Both kits were installed with the version '{}'.\n".format(manifest.version))
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Creating the delta for '{}'...".format(manifest.name))
+        with dm.stream.DoneManager() as this_dm:
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir)
+
+            index = Create(
+                from_manifest,
+                manifest,
+                kit_dir,
+                output_dir,
+                part_size=part_size,
+            )
+
+            this_dm.stream.write(
+                "{} changed files were written to {} parts; {} files were removed.\n".format(
+                    len(index.files),
+                    len(index.parts),
+                    len(index.removed),
+                ),
+            )
+
+            # Setup verifies the upgraded kit against this root once it is recorded
+            this_dm.stream.write(
+                "The Merkle root of '{}' ('{}') is '{}'; record it in _MERKLE_ROOTS in _custom_data.py.\n".format(
+                    index.name,
+                    index.version,
+                    index.merkle_nodes[_merkle_tree.ROOT_NODE],
+                ),
+            )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    name=CommandLine.StringTypeInfo(),
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    version=CommandLine.StringTypeInfo(),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    store_dir=CommandLine.DirectoryTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def ApplyDelta(
+    name,
+    kit_dir,
+    version,
+    max_workers=None,
+    store_dir=None,
+    output_stream=sys.stdout,
+):
+    """Upgrades the installed kit to `version` with the committed delta (this is done by Setup)"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        if RollBack(kit_dir):
+            dm.stream.write("An interrupted upgrade of '{}' was rolled back.\n".format(name))
+
+        if not IsApplicable(kit_dir, version):
+            dm.stream.write("ERROR: '{}' does not contain a delta that upgrades the installed kit to '{}'.\n".format(kit_dir, version))
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Upgrading '{}'...".format(name))
+        with dm.stream.DoneManager() as this_dm:
+            this_dm.result = Apply(
+                name,
+                kit_dir,
+                version,
+                this_dm.stream,
+                max_workers=max_workers,
+                store_dir=store_dir or _kit_store.GetStoreDir(),
+                merkle_root=_merkle_tree.GetRecordedRoot(version),
+            )
+
+            return this_dm.result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CalculateRoot(index, previous_manifest, updated, removed):
+    """\
+    Returns the Merkle root of the kit after the `updated` files (added or replaced) and
+    `removed` files have been applied to the install described by `previous_manifest`.
+    """
+
+    file_info = {
+        relative_path: (info.size, info.hash)
+        for relative_path, info in previous_manifest.files.items()
+        if relative_path not in index.files and relative_path not in removed
+    }
+
+    for relative_path in updated:
+        info = index.files[relative_path]
+        file_info[relative_path] = (info.size, info.hash)
+
+    if previous_manifest.architectures is None:
+        return _merkle_tree.GetRoot(file_info)
+
+    # The nodes recorded in the index describe the content of architectures that weren't
+    # installed; shared content is never taken from the index.
+    installed_nodes = _merkle_tree.CalculateNodes(file_info)
+
+    fixed_nodes = {}
+
+    for dirname, node in index.merkle_nodes.items():
+        if dirname in installed_nodes or dirname.rpartition("/")[0] not in installed_nodes:
+            continue
+
+        architecture = _kit_manifest.GetArchitecture("{}/".format(dirname))
+        if architecture is None or architecture in previous_manifest.architectures:
+            continue
+
+        fixed_nodes[dirname] = node
+
+    return _merkle_tree.CalculateNodes(file_info, fixed_nodes)[_merkle_tree.ROOT_NODE]
+
+
+# ----------------------------------------------------------------------
+def _Extract(kit_dir, index, output_dir, relative_paths, max_workers):
+    """\
+    Extracts the files to `output_dir`, verifying the hash of each file as it is written;
+    returns a dict of relative_path -> _kit_manifest.FileInfo.
+    """
+
+    # ----------------------------------------------------------------------
+    def ExtractFile(relative_path):
+        info = index.files[relative_path]
+
+        with open(os.path.join(kit_dir, index.parts[info.part]["name"]), "rb") as f:
+            f.seek(info.offset)
+            compressed = f.read(info.compressed_size)
+
+        _trace.AddCounters(
+            bytes_read=len(compressed),
+        )
+
+        content = lzma.decompress(compressed)
+
+        if len(content) != info.size or hashlib.sha256(content).hexdigest() != info.hash:
+            raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+        _trace.AddCounters(
+            bytes_hashed=info.size,
+        )
+
+        fullpath = os.path.join(output_dir, *relative_path.split("/"))
+
+        dirname = os.path.dirname(fullpath)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        with open(fullpath, "wb") as f:
+            f.write(content)
+
+        return relative_path, _kit_manifest.FileInfo(info.size, os.stat(fullpath).st_mtime_ns, info.hash)
+
+    # ----------------------------------------------------------------------
+
+    max_workers = _kit_hashing.GetNumWorkers(max_workers)
+
+    if max_workers == 1 or len(relative_paths) < 2:
+        return dict(ExtractFile(relative_path) for relative_path in relative_paths)
+
+    with ThreadPoolExecutor(min(max_workers, len(relative_paths))) as executor:
+        return dict(executor.map(_trace.Bind(ExtractFile), relative_paths))
+
+
+# ----------------------------------------------------------------------
+def _Move(source_dir, dest_dir, relative_path):
+    dest = os.path.join(dest_dir, *relative_path.split("/"))
+
+    dirname = os.path.dirname(dest)
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    os.replace(os.path.join(source_dir, *relative_path.split("/")), dest)
+
+
+# ----------------------------------------------------------------------
+def _RemoveEmptyDirs(kit_dir, relative_paths):
+    """Removes the dirs that contained `relative_paths` (and their ancestors) if they are empty"""
+
+    dirnames = set()
+
+    for relative_path in relative_paths:
+        parts = relative_path.split("/")[:-1]
+
+        while parts:
+            dirnames.add(tuple(parts))
+            parts = parts[:-1]
+
+    # Children are removed before their parents
+    for parts in sorted(dirnames, key=len, reverse=True):
+        fullpath = os.path.join(kit_dir, *parts)
+
+        if os.path.isdir(fullpath) and not os.listdir(fullpath):
+            os.rmdir(fullpath)
+
+
+# ----------------------------------------------------------------------
+def _LoadJournal(kit_dir):
+    filename = GetJournalFilename(kit_dir)
+    if not os.path.isfile(filename):
+        return None
+
+    with open(filename) as f:
+        content = json.load(f)
+
+    if content.get("format") != _JOURNAL_FORMAT_VERSION:
+        raise Exception("The upgrade journal '{}' has an unsupported format".format(filename))
+
+    return content
+
+
+# ----------------------------------------------------------------------
+def _SaveJournal(kit_dir, content):
+    filename = GetJournalFilename(kit_dir)
+    temp_filename = "{}.tmp".format(filename)
+
+    with open(temp_filename, "w") as f:
+        json.dump(content, f)
+
+    os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def _RemoveStaging(kit_dir):
+    # The journal is removed first; staged content without a journal is never restored
+    filename = GetJournalFilename(kit_dir)
+    if os.path.isfile(filename):
+        os.remove(filename)
+
+    staging_dir = GetStagingDir(kit_dir)
+    if os.path.isdir(staging_dir):
+        shutil.rmtree(staging_dir)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,149 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_hashing.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 10:03:18
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Hashes the files within an installed kit, using multiple cores when available.
+
+The parallel and sequential implementations produce identical results; the order in which
+files are hashed never influences the tree hash.
+
+The SHA256 in _CUSTOM_DATA is the hash of the '_Install.7z' archive, which is a single stream
+that can only be hashed sequentially; it is verified while the parts are extracted (see
+_kit_install.py). Verifying an installed kit doesn't require the archive: each file is hashed
+(in parallel) and compared with the per-file hashes in the manifest written by that install.
+The tree hash calculated here identifies the content of a manifest; it isn't compared with
+_CUSTOM_DATA.
+"""
+
+import hashlib
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Environment variable that overrides the default number of hashing workers; a value of 1
+# hashes sequentially.
+NUM_WORKERS_ENV_VAR                         = "DEVELOPMENT_ENVIRONMENT_WINDOWS_KITS_HASH_WORKERS"
+
+_HASH_BLOCK_SIZE                            = 1024 * 1024
+
+
+# ----------------------------------------------------------------------
+def GetNumWorkers(max_workers=None):
+    """Returns the number of workers to use when hashing"""
+
+    if max_workers is None:
+        max_workers = os.getenv(NUM_WORKERS_ENV_VAR)
+        if max_workers:
+            max_workers = int(max_workers)
+        else:
+            max_workers = os.cpu_count() or 1
+
+    if max_workers < 1:
+        raise Exception("'{}' is not a valid number of workers".format(max_workers))
+
+    return max_workers
+
+
+# ----------------------------------------------------------------------
+def HashFile(filename):
+    hasher = hashlib.sha256()
+    num_bytes = 0
+
+    with open(filename, "rb") as f:
+        while True:
+            block = f.read(_HASH_BLOCK_SIZE)
+            if not block:
+                break
+
+            hasher.update(block)
+            num_bytes += len(block)
+
+    _trace.AddCounters(
+        bytes_read=num_bytes,
+        bytes_hashed=num_bytes,
+    )
+
+    return hasher.hexdigest()
+
+
+# ----------------------------------------------------------------------
+def HashFiles(
+    items,
+    max_workers=None,
+):
+    """\
+    Hashes files, returning a dict of key -> hash.
+
+    `items` is a list of (key, filename, size); the size is used to schedule the largest files
+    first so that a single large file isn't left to be hashed by one worker while the others
+    sit idle. hashlib and file reads release the GIL, so threads are sufficient to saturate the
+    disk on machines with many cores.
+    """
+
+    max_workers = GetNumWorkers(max_workers)
+
+    with _trace.Span("HashFiles", num_files=len(items), max_workers=max_workers):
+        return _HashFilesImpl(items, max_workers)
+
+
+# ----------------------------------------------------------------------
+def CalculateTreeHash(file_info):
+    """\
+    Returns the hash of a tree given a dict of relative_path -> (size, hash).
+
+    Entries are sorted before they are hashed, so the result does not depend on the order in
+    which the individual files were hashed. This is not the archive hash in _CUSTOM_DATA; it is
+    only compared with tree hashes calculated by this function.
+    """
+
+    hasher = hashlib.sha256()
+
+    for relative_path in sorted(file_info):
+        size, file_hash = file_info[relative_path]
+
+        hasher.update(
+            "{}\t{}\t{}\n".format(relative_path, size, file_hash).encode("utf-8"),
+        )
+
+    return hasher.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _HashFilesImpl(items, max_workers):
+    items = sorted(items, key=lambda item: item[2], reverse=True)
+
+    if max_workers == 1 or len(items) < 2:
+        return {key: HashFile(filename) for key, filename, _ in items}
+
+    hash_file = _trace.Bind(HashFile)
+
+    with ThreadPoolExecutor(min(max_workers, len(items))) as executor:
+        futures = [
+            (key, executor.submit(hash_file, filename))
+            for key, filename, _ in items
+        ]
+
+        return {key: future.result() for key, future in futures}
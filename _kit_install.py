@@ -0,0 +1,650 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_install.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 10:41:52
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Installs a kit directly from its committed '_Install.7z.NNN' parts.
+
+The parts are provided to 7-Zip as the volumes of a multi-volume archive and hashed as they
+are read, so the full archive is never reconstructed on disk.
+
+Progress is recorded in a checkpoint so that an interrupted install resumes where it stopped:
+the parts are not hashed again once their hash has been verified, files that were completely
+extracted are not extracted again, and files that were hashed are not hashed again.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import zlib
+
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+import _install_checkpoint
+import _kit_cache
+import _kit_hashing
+import _kit_manifest
+import _kit_store
+import _merkle_tree
+import _parts_manifest
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+PART_REGEX                                  = re.compile(r"^_Install\.7z\.(?P<index>\d{3})$")
+
+_READ_BLOCK_SIZE                            = 4 * 1024 * 1024
+
+
+# ----------------------------------------------------------------------
+def GetParts(kit_dir):
+    """Returns the fullpaths of the '_Install.7z.NNN' parts in order"""
+
+    parts = []
+
+    for item in os.listdir(kit_dir):
+        match = PART_REGEX.match(item)
+        if match:
+            parts.append((int(match.group("index")), os.path.join(kit_dir, item)))
+
+    if not parts:
+        raise Exception("No '_Install.7z.NNN' parts were found in '{}'".format(kit_dir))
+
+    parts.sort()
+
+    for expected_index, (index, fullpath) in enumerate(parts):
+        if index != expected_index + 1:
+            raise Exception(
+                "'{}' was found, but '_Install.7z.{:03d}' does not exist".format(
+                    fullpath,
+                    expected_index + 1,
+                ),
+            )
+
+    return [fullpath for _, fullpath in parts]
+
+
+# ----------------------------------------------------------------------
+def Get7ZipBinary():
+    for name in ["7z", "7za"]:
+        fullpath = shutil.which(name)
+        if fullpath:
+            return fullpath
+
+    raise Exception("7-Zip could not be found; please make sure that '7z' is in the path")
+
+
+# ----------------------------------------------------------------------
+def RemoveInstalledContent(kit_dir):
+    """Removes all content previously extracted to the kit dir (committed parts are preserved)"""
+
+    for item in os.listdir(kit_dir):
+        if item.startswith("_"):
+            continue
+
+        fullpath = os.path.join(kit_dir, item)
+
+        if _kit_cache.IsLink(fullpath):
+            # The content is linked from the machine-wide cache, which must be preserved
+            _kit_cache.RemoveLink(fullpath)
+        elif os.path.isdir(fullpath):
+            shutil.rmtree(fullpath)
+        else:
+            os.remove(fullpath)
+
+
+# ----------------------------------------------------------------------
+def RemoveIncompleteContent(
+    kit_dir,
+    parts,
+    complete_files=None,
+    max_workers=None,
+):
+    """\
+    Removes the files left by an interrupted extraction that are incomplete, corrupt, or not
+    in the archive; returns the number of files removed.
+
+    Files are compared to the size and CRC recorded in the archive. Files in `complete_files`
+    (relative_path -> _kit_manifest.FileInfo) whose stat information is unchanged are known to
+    be complete and are not read.
+    """
+
+    complete_files = complete_files or {}
+    archive_files = _ListArchive(parts)
+
+    items = []
+    to_remove = []
+
+    for relative_path, fullpath, stat_result in _kit_manifest.EnumerateFiles(kit_dir):
+        info = complete_files.get(relative_path)
+        if (
+            info is not None
+            and info.size == stat_result.st_size
+            and info.mtime_ns == stat_result.st_mtime_ns
+        ):
+            continue
+
+        archive_info = archive_files.get(relative_path)
+
+        if archive_info is None or archive_info[0] != stat_result.st_size:
+            to_remove.append(fullpath)
+        elif archive_info[1]:
+            items.append((fullpath, archive_info[1]))
+
+    # ----------------------------------------------------------------------
+    def IsValid(item):
+        fullpath, expected_crc = item
+        return _CalculateCrc(fullpath) == expected_crc
+
+    # ----------------------------------------------------------------------
+
+    max_workers = _kit_hashing.GetNumWorkers(max_workers)
+
+    if max_workers == 1 or len(items) < 2:
+        is_valid_results = [IsValid(item) for item in items]
+    else:
+        with ThreadPoolExecutor(min(max_workers, len(items))) as executor:
+            is_valid_results = list(executor.map(_trace.Bind(IsValid), items))
+
+    to_remove += [fullpath for (fullpath, _), is_valid in zip(items, is_valid_results) if not is_valid]
+
+    for fullpath in to_remove:
+        os.remove(fullpath)
+
+    return len(to_remove)
+
+
+# ----------------------------------------------------------------------
+def HashParts(parts):
+    """Returns the SHA256 of the archive formed by concatenating the parts"""
+
+    hasher = hashlib.sha256()
+
+    for part in parts:
+        with open(part, "rb") as f:
+            while True:
+                block = f.read(_READ_BLOCK_SIZE)
+                if not block:
+                    break
+
+                hasher.update(block)
+
+                _trace.AddCounters(
+                    bytes_read=len(block),
+                    bytes_hashed=len(block),
+                )
+
+    return hasher.hexdigest()
+
+
+# ----------------------------------------------------------------------
+def Install(
+    name,
+    kit_dir,
+    version,
+    output_stream,
+    max_workers=None,
+    store_dir=None,
+    architectures=None,
+    previous_manifest=None,
+    merkle_root=None,
+):
+    """\
+    Extracts the parts into the kit dir while hashing them, verifies the hash against the
+    expected version, and writes the manifest used during activation.
+
+    `merkle_root` is the root recorded for `version` in _custom_data.py (or None if it isn't
+    recorded); the root of a complete install must match it. The archive is verified against
+    `version` in either case.
+
+    When `store_dir` is provided, the installed files are linked to the content-addressed
+    store so that content shared with other installed kits only exists once on disk.
+
+    When `architectures` is provided, only the shared content and the content for those
+    architectures is extracted. When `previous_manifest` is provided (it must describe a
+    verified partial install of the same version), only the content for the architectures
+    missing from that install is extracted and added to it.
+
+    When the parts manifest has been committed, each part is verified against it before any
+    content is removed or extracted; otherwise, the archive is hashed while it is extracted.
+    The installed content is verified against the expected version in both cases.
+
+    When a previous install of the same content was interrupted, it resumes from its checkpoint.
+
+    Returns 0 on success or a non-zero value on failure.
+    """
+
+    parts_manifest = _parts_manifest.PartsManifest.Load(kit_dir)
+
+    if parts_manifest is not None:
+        # Missing and truncated parts are found without reading any content
+        errors = _parts_manifest.CheckParts(kit_dir, parts_manifest.parts, check_hashes=False)
+        if errors:
+            output_stream.write(_parts_manifest.DescribeErrors(errors))
+            return -1
+
+    parts = GetParts(kit_dir)
+    seven_zip = Get7ZipBinary()
+
+    checkpoint = None
+    resuming = False
+
+    if previous_manifest is None:
+        checkpoint = _install_checkpoint.Checkpoint.Load(kit_dir, name, version, architectures, parts)
+
+    parts_verified = checkpoint is not None and checkpoint.archive_verified
+
+    if parts_manifest is not None and not parts_verified:
+        # Find corrupt parts before any content is removed or extracted; once each part is
+        # verified, the archive formed by them is known to have the hash in the manifest.
+        errors = parts_manifest.Check(
+            kit_dir,
+            version,
+            part_names=[os.path.basename(part) for part in parts],
+            max_workers=max_workers,
+        )
+
+        if errors:
+            output_stream.write(_parts_manifest.DescribeErrors(errors))
+            return -1
+
+        parts_verified = True
+
+    if previous_manifest is None:
+        if architectures is None:
+            filters = []
+        else:
+            filters = [
+                "-xr!{}".format(architecture)
+                for architecture in _kit_manifest.ARCHITECTURES
+                if architecture not in architectures
+            ]
+
+        if checkpoint is None:
+            RemoveInstalledContent(kit_dir)
+            checkpoint = _install_checkpoint.Checkpoint.Create(kit_dir, name, version, architectures, parts)
+
+            if parts_verified:
+                checkpoint.SetArchiveVerified()
+
+        else:
+            resuming = not checkpoint.extracted
+
+            output_stream.write("Resuming the interrupted install of '{}'.\n".format(name))
+
+            if resuming:
+                with _trace.Span("RemoveIncompleteContent", name=name):
+                    num_removed = RemoveIncompleteContent(
+                        kit_dir,
+                        parts,
+                        checkpoint.GetCompleteFiles(),
+                        max_workers=max_workers,
+                    )
+
+                if num_removed:
+                    output_stream.write("{} incomplete files will be extracted again.\n".format(num_removed))
+
+    else:
+        assert previous_manifest.architectures is not None
+
+        missing_architectures = [
+            architecture
+            for architecture in (architectures or _kit_manifest.ARCHITECTURES)
+            if architecture not in previous_manifest.architectures
+        ]
+
+        if architectures is not None:
+            architectures = list(set(architectures).union(previous_manifest.architectures))
+
+        filters = ["-ir!{}".format(architecture) for architecture in missing_architectures]
+
+    # ----------------------------------------------------------------------
+    def OnError():
+        RemoveInstalledContent(kit_dir)
+
+        if checkpoint is not None:
+            checkpoint.Delete()
+
+    # ----------------------------------------------------------------------
+
+    if parts_verified:
+        hash_thread = None
+        hash_result = [version]
+
+    else:
+        # Hash the parts on a separate thread while 7-Zip reads them; the second reader is
+        # (almost always) served from the file system cache.
+        hash_result = []
+
+        # ----------------------------------------------------------------------
+        def HashThreadProc():
+            try:
+                with _trace.Span("HashParts", num_parts=len(parts)):
+                    archive_hash = HashParts(parts)
+
+                # Record the result immediately so that it survives an interrupted extraction
+                if checkpoint is not None and archive_hash == version:
+                    checkpoint.SetArchiveVerified()
+
+                hash_result.append(archive_hash)
+
+            except Exception as ex:
+                hash_result.append(ex)
+
+        # ----------------------------------------------------------------------
+
+        hash_thread = threading.Thread(target=HashThreadProc)
+        hash_thread.start()
+
+    if checkpoint is not None and checkpoint.extracted:
+        return_code = 0
+
+    else:
+        with _trace.Span("Extract", name=name):
+            process = subprocess.Popen(
+                [seven_zip, "x", "-y", "-bd", "-o{}".format(kit_dir), parts[0]]
+                # Files that remain after an interrupted extraction have been validated
+                + (["-aos"] if resuming else [])
+                + filters,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+            )
+
+            extract_output = process.communicate()[0]
+
+        return_code = process.returncode
+
+    if hash_thread is not None:
+        hash_thread.join()
+
+    if return_code != 0:
+        output_stream.write(extract_output)
+        output_stream.write("ERROR: Extracting '{}' failed ({}).\n".format(name, return_code))
+
+        OnError()
+        return return_code
+
+    archive_hash = hash_result[0]
+    if isinstance(archive_hash, Exception):
+        raise archive_hash
+
+    if archive_hash != version:
+        output_stream.write(
+            "ERROR: The hash of '{}' is '{}' but '{}' was expected.\n".format(
+                name,
+                archive_hash,
+                version,
+            ),
+        )
+
+        OnError()
+        return -1
+
+    if checkpoint is not None:
+        checkpoint.SetExtracted()
+
+    with _trace.Span("CreateManifest", name=name):
+        manifest = _kit_manifest.Create(
+            name,
+            version,
+            kit_dir,
+            max_workers=max_workers,
+            architectures=architectures,
+            previous_manifest=previous_manifest,
+            known_files=checkpoint.files if checkpoint is not None else None,
+            on_hashed=checkpoint.AddFiles if checkpoint is not None else None,
+        )
+
+    # The root describes all architectures, so it can only be verified for complete installs
+    if merkle_root is not None and manifest.architectures is None:
+        actual_root = manifest.MerkleNodes[_merkle_tree.ROOT_NODE]
+
+        if actual_root != merkle_root:
+            output_stream.write(
+                "ERROR: The Merkle root of '{}' is '{}' but '{}' was expected.\n".format(
+                    name,
+                    actual_root,
+                    merkle_root,
+                ),
+            )
+
+            OnError()
+            return -1
+
+    if store_dir is not None:
+        with _trace.Span("Ingest", name=name):
+            bytes_deduplicated, bytes_copied = _kit_store.Ingest(manifest, kit_dir, store_dir)
+
+        output_stream.write(_kit_store.DescribeSharing(bytes_deduplicated, bytes_copied))
+
+    manifest.Save(kit_dir)
+
+    if checkpoint is not None:
+        checkpoint.Delete()
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    name=CommandLine.StringTypeInfo(),
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    version=CommandLine.StringTypeInfo(),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    store_dir=CommandLine.DirectoryTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    architecture=CommandLine.EnumTypeInfo(
+        _kit_manifest.ARCHITECTURES,
+        arity="*",
+    ),
+    output_stream=None,
+)
+def StreamInstall(
+    name,
+    kit_dir,
+    version,
+    max_workers=None,
+    store_dir=None,
+    architecture=None,
+    output_stream=sys.stdout,
+):
+    """Extracts and verifies the '_Install.7z.NNN' parts without reconstructing the archive"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        dm.stream.write("Installing '{}'...".format(name))
+        with dm.stream.DoneManager() as this_dm:
+            this_dm.result = Install(
+                name,
+                kit_dir,
+                version,
+                this_dm.stream,
+                max_workers=max_workers,
+                store_dir=store_dir or _kit_store.GetStoreDir(),
+                architectures=architecture or None,
+                merkle_root=_merkle_tree.GetRecordedRoot(version),
+            )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    version=CommandLine.StringTypeInfo(),
+    output_stream=None,
+)
+def CreatePartsManifest(
+    kit_dir,
+    version,
+    output_stream=sys.stdout,
+):
+    """Writes the parts manifest that should be committed with the '_Install.7z.NNN' parts"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        dm.stream.write("Creating '{}'...".format(_parts_manifest.PARTS_MANIFEST_FILENAME))
+        with dm.stream.DoneManager() as this_dm:
+            parts_manifest = _parts_manifest.Create(version, GetParts(kit_dir))
+            parts_manifest.Save(kit_dir)
+
+            this_dm.stream.write("{} parts were written.\n".format(len(parts_manifest.parts)))
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    version=CommandLine.StringTypeInfo(),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def CheckParts(
+    kit_dir,
+    version,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Lists every part that is missing, truncated, or corrupt (these are the parts to fetch again)"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        parts_manifest = _parts_manifest.PartsManifest.Load(kit_dir)
+        if parts_manifest is None:
+            dm.stream.write("ERROR: '{}' does not exist.\n".format(_parts_manifest.PARTS_MANIFEST_FILENAME))
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Checking {} parts...".format(len(parts_manifest.parts)))
+        with dm.stream.DoneManager() as this_dm:
+            errors = parts_manifest.Check(
+                kit_dir,
+                version,
+                part_names=[item for item in os.listdir(kit_dir) if PART_REGEX.match(item)],
+                max_workers=max_workers,
+                stop_on_error=False,
+            )
+
+            if errors:
+                this_dm.stream.write(_parts_manifest.DescribeErrors(errors))
+                this_dm.result = -1
+
+                return this_dm.result
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _ListArchive(parts):
+    """Returns relative_path -> (size, crc) for the files in the archive"""
+
+    result = subprocess.run(
+        [Get7ZipBinary(), "l", "-slt", parts[0]],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+
+    if result.returncode != 0:
+        raise Exception("Listing the content of '{}' failed ({}):\n{}".format(parts[0], result.returncode, result.stdout))
+
+    results = {}
+
+    # Each item is a block of 'Key = Value' lines; the items follow a line of dashes (the
+    # block before it describes the archive itself).
+    in_items = False
+    item = {}
+
+    for line in result.stdout.splitlines() + [""]:
+        if not in_items:
+            in_items = line.startswith("----------")
+            continue
+
+        if not line.strip():
+            if item.get("Path") and item.get("Folder") != "+" and "Size" in item:
+                results[item["Path"].replace("\\", "/")] = (int(item["Size"]), item.get("CRC", "").upper())
+
+            item = {}
+            continue
+
+        key, sep, value = line.partition(" = ")
+        if sep:
+            item[key] = value.strip()
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _CalculateCrc(filename):
+    crc = 0
+
+    with open(filename, "rb") as f:
+        while True:
+            block = f.read(_READ_BLOCK_SIZE)
+            if not block:
+                break
+
+            crc = zlib.crc32(block, crc)
+
+    return "{:08X}".format(crc)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
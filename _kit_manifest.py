@@ -0,0 +1,589 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_manifest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 09:12:41
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Per-file manifest (path, size, mtime, content hash) written next to an installed kit.
+
+The manifest allows activation to verify the installed content by rehashing only those
+files whose stat information has changed since the manifest was written. The Merkle tree of
+the installed content is recorded with the manifest, allowing a subtree to be verified without
+hashing the rest of the kit (see _merkle_tree.py).
+"""
+
+import json
+import os
+import sys
+
+from collections import namedtuple
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+import _kit_hashing
+import _merkle_tree
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+METADATA_DIRNAME                            = "__Metadata__"
+MANIFEST_FILENAME                           = "Manifest.json"
+
+# Architecture-specific content is stored in directories with these names (for example,
+# 'bin/<version>/x64' or 'Lib/<version>/um/x86'); all other content is shared.
+ARCHITECTURES                               = ["x64", "x86", "arm", "arm64"]
+
+SHARED_CONTENT_NAME                         = "shared"
+
+# Version 2 adds the installed architectures; manifests written with version 1 describe
+# kits where all architectures were installed. Version 3 adds the nodes of the Merkle tree.
+_MANIFEST_FORMAT_VERSION                    = 3
+_SUPPORTED_MANIFEST_FORMAT_VERSIONS         = [1, 2, 3]
+
+# Progress is reported after (roughly) this many bytes have been hashed
+_HASH_BATCH_SIZE                            = 256 * 1024 * 1024
+
+# ----------------------------------------------------------------------
+FileInfo                                    = namedtuple("FileInfo", ["size", "mtime_ns", "hash"])
+
+
+# ----------------------------------------------------------------------
+class VerifyResult(namedtuple("VerifyResult", ["added", "removed", "modified", "num_rehashed"])):
+    """Files that differ from those recorded in the manifest"""
+
+    # ----------------------------------------------------------------------
+    @property
+    def IsValid(self):
+        return not self.added and not self.removed and not self.modified
+
+    # ----------------------------------------------------------------------
+    def Describe(self):
+        """Returns a description of the files that differ"""
+
+        lines = []
+
+        for desc, items in [
+            ("Added", self.added),
+            ("Removed", self.removed),
+            ("Modified", self.modified),
+        ]:
+            if not items:
+                continue
+
+            lines.append("{} ({}):".format(desc, len(items)))
+            lines += ["    - {}".format(item) for item in items]
+
+        return "".join("{}\n".format(line) for line in lines)
+
+
+# ----------------------------------------------------------------------
+class Manifest(object):
+    """Information about every file within an installed kit"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, name, version, files, architectures=None, merkle_nodes=None):
+        self.name                           = name
+        self.version                        = version
+        self.files                          = files
+
+        # None if all architectures were installed
+        self.architectures                  = sorted(architectures) if architectures is not None else None
+
+        # The Merkle tree nodes recorded when the manifest was saved (None for manifests written
+        # before the nodes were recorded)
+        self.merkle_nodes                   = merkle_nodes
+
+    # ----------------------------------------------------------------------
+    def HasArchitectures(self, architectures):
+        """Returns True if the content for all of the architectures (None for all) was installed"""
+
+        if self.architectures is None:
+            return True
+
+        if architectures is None:
+            return False
+
+        return set(architectures).issubset(self.architectures)
+
+    # ----------------------------------------------------------------------
+    @property
+    def TreeHash(self):
+        return _kit_hashing.CalculateTreeHash(
+            {k: (v.size, v.hash) for k, v in self.files.items()},
+        )
+
+    # ----------------------------------------------------------------------
+    @property
+    def MerkleNodes(self):
+        """Returns a dict of dir -> hash calculated from the files"""
+
+        return _merkle_tree.CalculateNodes(
+            {k: (v.size, v.hash) for k, v in self.files.items()},
+        )
+
+    # ----------------------------------------------------------------------
+    @property
+    def ArchitectureTreeHashes(self):
+        """\
+        Returns a dict of architecture -> tree hash (with SHARED_CONTENT_NAME for content that
+        isn't architecture-specific), allowing partial installs to be compared by architecture.
+        """
+
+        file_info = {}
+
+        for k, v in self.files.items():
+            file_info.setdefault(
+                GetArchitecture(k) or SHARED_CONTENT_NAME,
+                {},
+            )[k] = (v.size, v.hash)
+
+        return {
+            architecture: _kit_hashing.CalculateTreeHash(info)
+            for architecture, info in file_info.items()
+        }
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        """Returns the manifest associated with the kit or None if a manifest doesn't exist"""
+
+        filename = GetManifestFilename(kit_dir)
+        if not os.path.isfile(filename):
+            return None
+
+        with open(filename) as f:
+            content = json.load(f)
+
+        if content.get("format") not in _SUPPORTED_MANIFEST_FORMAT_VERSIONS:
+            return None
+
+        return cls(
+            content["name"],
+            content["version"],
+            {k: FileInfo(*v) for k, v in content["files"].items()},
+            content.get("architectures"),
+            content.get("merkle_nodes"),
+        )
+
+    # ----------------------------------------------------------------------
+    def Save(self, kit_dir):
+        filename = GetManifestFilename(kit_dir)
+
+        dirname = os.path.dirname(filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        # Write to a temporary file and then move it into place so that a partially written
+        # manifest is never seen by activation.
+        temp_filename = "{}.tmp".format(filename)
+
+        self.merkle_nodes = self.MerkleNodes
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _MANIFEST_FORMAT_VERSION,
+                    "name": self.name,
+                    "version": self.version,
+                    "files": {k: list(v) for k, v in self.files.items()},
+                    "architectures": self.architectures,
+                    "tree_hashes": self.ArchitectureTreeHashes,
+                    "merkle_nodes": self.merkle_nodes,
+                },
+                f,
+                sort_keys=True,
+            )
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def GetMetadataDir(kit_dir):
+    return os.path.join(kit_dir, METADATA_DIRNAME)
+
+
+# ----------------------------------------------------------------------
+def GetManifestFilename(kit_dir):
+    return os.path.join(GetMetadataDir(kit_dir), MANIFEST_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def GetArchitecture(relative_path):
+    """Returns the architecture associated with the file or None if the file is shared content"""
+
+    for part in relative_path.split("/")[:-1]:
+        if part in ARCHITECTURES:
+            return part
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def EnumerateFiles(kit_dir, subtrees=None):
+    """\
+    Yields (relative_path, fullpath, stat_result) for every file in the installed kit (or only
+    the files within `subtrees`, which are relative dirs, when provided).
+
+    Relative paths always use '/' as the separator. Items in the root of the kit dir whose
+    names begin with an underscore (the committed '_Install.7z.NNN' parts, metadata, etc.)
+    and the reconstructed 'Install.7z' archive are not part of the installed content.
+    """
+
+    # ----------------------------------------------------------------------
+    def Impl(fullpath, relative_prefix, is_root):
+        for entry in os.scandir(fullpath):
+            if is_root and (entry.name.startswith("_") or entry.name == "Install.7z"):
+                continue
+
+            relative_path = "{}{}".format(relative_prefix, entry.name)
+
+            # Links in the root refer to content installed in the machine-wide cache
+            if entry.is_dir(follow_symlinks=is_root):
+                yield from Impl(entry.path, "{}/".format(relative_path), False)
+            elif entry.is_file(follow_symlinks=is_root):
+                yield relative_path, entry.path, entry.stat(follow_symlinks=is_root)
+
+    # ----------------------------------------------------------------------
+
+    if subtrees is None:
+        yield from Impl(kit_dir, "", True)
+        return
+
+    for subtree in _merkle_tree.GetOutermostSubtrees(subtrees):
+        if subtree == _merkle_tree.ROOT_NODE:
+            yield from Impl(kit_dir, "", True)
+            continue
+
+        fullpath = os.path.join(kit_dir, *subtree.split("/"))
+
+        if os.path.isdir(fullpath):
+            yield from Impl(fullpath, "{}/".format(subtree), False)
+
+
+# ----------------------------------------------------------------------
+def IsWithinSubtrees(relative_path, subtrees):
+    """Returns True if the file is within one of the subtrees (relative dirs); None is the entire kit"""
+
+    if subtrees is None:
+        return True
+
+    return any(
+        subtree == _merkle_tree.ROOT_NODE or relative_path.startswith("{}/".format(subtree))
+        for subtree in subtrees
+    )
+
+
+# ----------------------------------------------------------------------
+def Create(
+    name,
+    version,
+    kit_dir,
+    max_workers=None,
+    architectures=None,
+    previous_manifest=None,
+    known_files=None,
+    on_hashed=None,
+):
+    """\
+    Creates a manifest by hashing every file in the installed kit.
+
+    Files in `previous_manifest` are not hashed again; this is used when content is added to
+    a partial install. Files in `known_files` (relative_path -> FileInfo) are not hashed again
+    if their stat information is unchanged; this is used when an interrupted install resumes.
+
+    When provided, `on_hashed` is invoked with a dict of relative_path -> FileInfo as batches
+    of files are hashed.
+    """
+
+    previous_files = dict(previous_manifest.files) if previous_manifest is not None else {}
+    known_files = known_files or {}
+
+    stat_results = {}
+    items = []
+
+    for relative_path, fullpath, stat_result in EnumerateFiles(kit_dir):
+        if relative_path in previous_files:
+            continue
+
+        known_info = known_files.get(relative_path)
+        if (
+            known_info is not None
+            and known_info.size == stat_result.st_size
+            and known_info.mtime_ns == stat_result.st_mtime_ns
+        ):
+            previous_files[relative_path] = known_info
+            continue
+
+        stat_results[relative_path] = stat_result
+        items.append((relative_path, fullpath, stat_result.st_size))
+
+    if on_hashed is None:
+        batches = [items]
+    else:
+        batches = list(_CreateBatches(items))
+
+    files = previous_files
+
+    for batch in batches:
+        hashes = _kit_hashing.HashFiles(batch, max_workers=max_workers)
+
+        batch_files = {
+            relative_path: FileInfo(
+                stat_results[relative_path].st_size,
+                stat_results[relative_path].st_mtime_ns,
+                file_hash,
+            )
+            for relative_path, file_hash in hashes.items()
+        }
+
+        files.update(batch_files)
+
+        if on_hashed is not None:
+            on_hashed(batch_files)
+
+    return Manifest(name, version, files, architectures)
+
+
+# ----------------------------------------------------------------------
+def Verify(
+    manifest,
+    kit_dir,
+    update_stat_info=True,
+    force=False,
+    max_workers=None,
+    subtrees=None,
+):
+    """\
+    Compares the installed kit with the manifest, rehashing only those files whose size or
+    modification time differ from the information in the manifest (or every file if `force`
+    is True). When `subtrees` (relative dirs) are provided, only the content within them is
+    compared.
+
+    When `update_stat_info` is True, files that were rehashed and found to be unchanged have
+    their stat information updated in the manifest so that they aren't rehashed the next time.
+    """
+
+    added = []
+    modified = []
+    to_hash = []
+    stat_results = {}
+
+    remaining = set(
+        relative_path
+        for relative_path in manifest.files
+        if IsWithinSubtrees(relative_path, subtrees)
+    )
+
+    for relative_path, fullpath, stat_result in EnumerateFiles(kit_dir, subtrees):
+        info = manifest.files.get(relative_path)
+        if info is None:
+            added.append(relative_path)
+            continue
+
+        remaining.discard(relative_path)
+
+        if stat_result.st_size != info.size:
+            modified.append(relative_path)
+            continue
+
+        if stat_result.st_mtime_ns == info.mtime_ns and not force:
+            continue
+
+        stat_results[relative_path] = stat_result
+        to_hash.append((relative_path, fullpath, stat_result.st_size))
+
+    updated_files = {}
+
+    for relative_path, file_hash in _kit_hashing.HashFiles(
+        to_hash,
+        max_workers=max_workers,
+    ).items():
+        info = manifest.files[relative_path]
+
+        if file_hash != info.hash:
+            modified.append(relative_path)
+            continue
+
+        if stat_results[relative_path].st_mtime_ns != info.mtime_ns:
+            updated_files[relative_path] = info._replace(
+                mtime_ns=stat_results[relative_path].st_mtime_ns,
+            )
+
+    result = VerifyResult(
+        sorted(added),
+        sorted(remaining),
+        sorted(modified),
+        len(to_hash),
+    )
+
+    if update_stat_info and updated_files and result.IsValid:
+        manifest.files.update(updated_files)
+        manifest.Save(kit_dir)
+
+    return result
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    name=CommandLine.StringTypeInfo(),
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    version=CommandLine.StringTypeInfo(),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def CreateManifest(
+    name,
+    kit_dir,
+    version,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Creates the manifest for an installed kit"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        dm.stream.write("Creating the manifest for '{}'...".format(name))
+        with dm.stream.DoneManager() as this_dm:
+            manifest = Create(
+                name,
+                version,
+                kit_dir,
+                max_workers=max_workers,
+            )
+            manifest.Save(kit_dir)
+
+            this_dm.stream.write(
+                "{} files were hashed ({}).\n".format(
+                    len(manifest.files),
+                    manifest.TreeHash,
+                ),
+            )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    name=CommandLine.StringTypeInfo(),
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    version=CommandLine.StringTypeInfo(),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def VerifyManifest(
+    name,
+    kit_dir,
+    version,
+    force=False,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Verifies an installed kit against its manifest; '/force' rehashes every file"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        manifest = Manifest.Load(kit_dir)
+        if manifest is None:
+            dm.stream.write("ERROR: The manifest for '{}' does not exist; please run Setup.\n".format(name))
+            dm.result = -1
+
+            return dm.result
+
+        if manifest.version != version:
+            dm.stream.write(
+                "ERROR: '{}' was installed with the version '{}' but '{}' was expected; please run Setup.\n".format(
+                    name,
+                    manifest.version,
+                    version,
+                ),
+            )
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Verifying '{}'...".format(name))
+        with dm.stream.DoneManager() as this_dm:
+            result = Verify(
+                manifest,
+                kit_dir,
+                force=force,
+                max_workers=max_workers,
+            )
+
+            if not result.IsValid:
+                this_dm.stream.write(result.Describe())
+                this_dm.result = -1
+
+            this_dm.stream.write(
+                "{} of {} files were rehashed.\n".format(
+                    result.num_rehashed,
+                    len(manifest.files),
+                ),
+            )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateBatches(items):
+    """Yields lists of (key, filename, size) items whose sizes total (about) _HASH_BATCH_SIZE"""
+
+    batch = []
+    batch_size = 0
+
+    for item in items:
+        batch.append(item)
+        batch_size += item[2]
+
+        if batch_size >= _HASH_BATCH_SIZE:
+            yield batch
+
+            batch = []
+            batch_size = 0
+
+    if batch:
+        yield batch
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
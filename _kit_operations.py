@@ -0,0 +1,549 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_operations.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 12:18:33
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+In-process versions of the Reconstruct, Install, and Verify operations.
+
+Setup_custom.py and Activate_custom.py invoke these functions directly rather than spawning
+a Python interpreter for each kit; shell commands are only necessary for actions that modify
+the caller's environment.
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+from collections import namedtuple
+
+import CommonEnvironment
+
+import _background_verification
+import _kit_cache
+import _kit_chunks
+import _kit_delta
+import _kit_install
+import _kit_manifest
+import _kit_pack
+import _kit_store
+import _merkle_tree
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+
+# ----------------------------------------------------------------------
+class OperationResult(
+    namedtuple(
+        "OperationResult",
+        [
+            "operation",
+            "name",
+            "return_code",
+            "output",
+            "verify_result",
+        ],
+    ),
+):
+    """\
+    Result of an operation.
+
+    `verify_result` is a `_kit_manifest.VerifyResult` for Verify operations and None for all
+    others.
+    """
+
+    # ----------------------------------------------------------------------
+    @property
+    def IsSuccessful(self):
+        return self.return_code == 0
+
+    # ----------------------------------------------------------------------
+    def __str__(self):
+        return "{} '{}' {} ({}){}".format(
+            self.operation,
+            self.name,
+            "succeeded" if self.IsSuccessful else "failed",
+            self.return_code,
+            "\n\n{}".format(self.output.rstrip()) if self.output.strip() else "",
+        )
+
+
+# ----------------------------------------------------------------------
+def HasManifest(kit_dir):
+    """Returns True if the kit was installed with a manifest and can be verified in-process"""
+
+    return os.path.isfile(_kit_manifest.GetManifestFilename(kit_dir))
+
+
+# ----------------------------------------------------------------------
+def Reconstruct(
+    name,
+    kit_dir,
+    output_filename=None,
+):
+    """\
+    Writes the archive formed by the '_Install.7z.NNN' parts to `output_filename`
+    ("<kit_dir>/Install.7z" by default).
+
+    Setup does not need the reconstructed archive; this is available for tools that do.
+    """
+
+    output_filename = output_filename or os.path.join(kit_dir, "Install.7z")
+    temp_filename = "{}.tmp".format(output_filename)
+
+    with _trace.Span("Reconstruct", name=name):
+        with open(temp_filename, "wb") as dest:
+            for part in _kit_install.GetParts(kit_dir):
+                with open(part, "rb") as source:
+                    shutil.copyfileobj(source, dest)
+
+                _trace.AddCounters(
+                    bytes_read=os.path.getsize(part),
+                )
+
+    os.replace(temp_filename, output_filename)
+
+    return OperationResult("Reconstruct", name, 0, "", None)
+
+
+# ----------------------------------------------------------------------
+def Install(
+    name,
+    kit_dir,
+    version,
+    force=False,
+    max_workers=None,
+    store_dir=None,
+    architectures=None,
+    cache_dir=None,
+    merkle_root=None,
+):
+    """\
+    Extracts and verifies the kit, writing the manifest used by `Verify`.
+
+    `merkle_root` is the root recorded for `version` in _custom_data.py (or None if it isn't
+    recorded); when provided, the kit is verified against it in addition to `version`.
+
+    Nothing is extracted if the kit is already installed and unchanged (unless `force` is True).
+    An install of a previous version is upgraded in place when the committed delta was created
+    from that version; the kit is installed from scratch if the delta can't be applied.
+    Only the shared content and the content for `architectures` (or all architectures if None)
+    is extracted; when an unchanged partial install exists, only the content of missing
+    architectures is added to it.
+
+    Content is shared via the store in `store_dir` (or the store enabled in the environment).
+
+    When `cache_dir` is provided (or the cache is enabled in the environment), the kit is
+    installed once in the machine-wide cache and the kit dir links to it.
+    """
+
+    cache_dir = cache_dir or _kit_cache.GetCacheDir()
+    if cache_dir is not None:
+        with _trace.Span("InstallFromCache", name=name):
+            return _InstallFromCache(
+                name,
+                kit_dir,
+                version,
+                cache_dir,
+                force,
+                max_workers,
+                store_dir,
+                architectures,
+                merkle_root,
+            )
+
+    return _InstallImpl(
+        name,
+        kit_dir,
+        version,
+        force,
+        max_workers,
+        store_dir,
+        architectures,
+        merkle_root,
+    )
+
+
+# ----------------------------------------------------------------------
+def Verify(
+    name,
+    kit_dir,
+    version,
+    force=False,
+    max_workers=None,
+    architectures=None,
+    subtrees=None,
+    merkle_root=None,
+):
+    """\
+    Verifies an installed kit against its manifest; when `architectures` is provided, the
+    content for those architectures must have been installed.
+
+    When `subtrees` (relative dirs) are provided, only the content within them is verified.
+    The content is verified against the manifest, which was written once the committed content
+    was verified against `version`. When `merkle_root` (the root recorded for `version` in
+    _custom_data.py) is provided, the verified content must also be consistent with it (the
+    remainder of the tree is described by the Merkle nodes recorded in the manifest); the root
+    isn't verified for partial installs.
+    """
+
+    manifest = _kit_manifest.Manifest.Load(kit_dir)
+
+    if manifest is None:
+        return OperationResult(
+            "Verify",
+            name,
+            -1,
+            "The manifest for '{}' does not exist; please run Setup.\n".format(name),
+            None,
+        )
+
+    if manifest.version != version:
+        return OperationResult(
+            "Verify",
+            name,
+            -1,
+            "'{}' was installed with the version '{}' but '{}' was expected; please run Setup.\n".format(
+                name,
+                manifest.version,
+                version,
+            ),
+            None,
+        )
+
+    if architectures is not None and not manifest.HasArchitectures(architectures):
+        return OperationResult(
+            "Verify",
+            name,
+            -1,
+            "'{}' was installed for {} but {} is required; please run Setup with {}.\n".format(
+                name,
+                ", ".join("'{}'".format(architecture) for architecture in manifest.architectures) or "no architectures",
+                ", ".join("'{}'".format(architecture) for architecture in architectures),
+                " ".join("'/configuration={}'".format(architecture) for architecture in architectures),
+            ),
+            None,
+        )
+
+    with _trace.Span("Verify", name=name, force=force, num_subtrees=len(subtrees) if subtrees is not None else None):
+        result = _kit_manifest.Verify(
+            manifest,
+            kit_dir,
+            force=force,
+            max_workers=max_workers,
+            subtrees=subtrees,
+        )
+
+    if not result.IsValid:
+        output = result.Describe()
+
+        # Narrow the changes down to the dirs that contain them
+        if manifest.merkle_nodes is not None:
+            mismatches = _merkle_tree.FindMismatches(
+                manifest.merkle_nodes,
+                _merkle_tree.CalculateNodes(_GetChangedFileInfo(manifest, result)),
+            )
+
+            if mismatches:
+                output += "Changed subtrees ({}):\n{}".format(
+                    len(mismatches),
+                    "".join("    - {}\n".format(mismatch or "<root>") for mismatch in mismatches),
+                )
+
+        output += "The content has changed since Setup was run; please run Setup again.\n"
+
+        return OperationResult("Verify", name, -1, output, result)
+
+    # The root describes all architectures, so it can't be verified for partial installs
+    if merkle_root is not None and manifest.architectures is None:
+        file_info = {k: (v.size, v.hash) for k, v in manifest.files.items()}
+
+        with _trace.Span("VerifyMerkleRoot", name=name):
+            if manifest.merkle_nodes is None or subtrees is None:
+                actual_root = _merkle_tree.GetRoot(file_info)
+            else:
+                actual_root = _merkle_tree.CalculateRoot(file_info, manifest.merkle_nodes, subtrees)
+
+        if actual_root != merkle_root:
+            return OperationResult(
+                "Verify",
+                name,
+                -1,
+                "The Merkle root of '{}' is '{}' but '{}' was expected; please run Setup again.\n".format(
+                    name,
+                    actual_root,
+                    merkle_root,
+                ),
+                result,
+            )
+
+    return OperationResult("Verify", name, 0, "", result)
+
+
+# ----------------------------------------------------------------------
+def CalculateMerkleRoot(
+    name,
+    kit_dir,
+    version,
+    max_workers=None,
+):
+    """\
+    Returns the Merkle root of the content committed for the kit, which is the root recorded
+    for `version` in _custom_data.py; the installed content is not used.
+
+    The root of a chunked or packed kit is calculated from the files described by its index
+    (each file is verified against its hash when it is installed). The '_Install.7z.NNN' parts
+    are verified against `version` and extracted to a temporary dir.
+    """
+
+    if _kit_chunks.HasChunks(kit_dir) or _kit_pack.HasPack(kit_dir):
+        if _kit_chunks.HasChunks(kit_dir):
+            index = _kit_chunks.ChunkIndex.Load(kit_dir)
+        else:
+            index = _kit_pack.PackIndex.Load(kit_dir)
+
+        if index is None:
+            raise Exception("The index in '{}' has an unsupported format".format(kit_dir))
+
+        if index.version != version:
+            raise Exception(
+                "The content in '{}' is '{}' but '{}' was expected".format(
+                    kit_dir,
+                    index.version,
+                    version,
+                ),
+            )
+
+        return _merkle_tree.GetRoot({k: (v.size, v.hash) for k, v in index.files.items()})
+
+    parts = _kit_install.GetParts(kit_dir)
+
+    with _trace.Span("HashParts", num_parts=len(parts)):
+        archive_hash = _kit_install.HashParts(parts)
+
+    if archive_hash != version:
+        raise Exception("The hash of '{}' is '{}' but '{}' was expected".format(name, archive_hash, version))
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        with _trace.Span("Extract", name=name):
+            process = subprocess.run(
+                [_kit_install.Get7ZipBinary(), "x", "-y", "-bd", "-o{}".format(temp_dir), parts[0]],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+            )
+
+        if process.returncode != 0:
+            raise Exception("Extracting '{}' failed ({}):\n{}".format(name, process.returncode, process.stdout))
+
+        manifest = _kit_manifest.Create(name, version, temp_dir, max_workers=max_workers)
+
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return manifest.MerkleNodes[_merkle_tree.ROOT_NODE]
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _InstallImpl(
+    name,
+    kit_dir,
+    version,
+    force,
+    max_workers,
+    store_dir,
+    architectures,
+    merkle_root,
+):
+    previous_manifest = None
+    output = ""
+
+    # An upgrade that was interrupted is rolled back before the installed version is examined
+    if _kit_delta.RollBack(kit_dir):
+        output += "An interrupted upgrade of '{}' was rolled back.\n".format(name)
+
+    if not force and _kit_delta.IsApplicable(kit_dir, version):
+        sink = io.StringIO()
+
+        with _trace.Span("ApplyDelta", name=name):
+            return_code = _kit_delta.Apply(
+                name,
+                kit_dir,
+                version,
+                sink,
+                max_workers=max_workers,
+                store_dir=store_dir or _kit_store.GetStoreDir(),
+                merkle_root=merkle_root,
+            )
+
+        output += sink.getvalue()
+
+        if return_code != 0:
+            output += "'{}' will be installed from scratch.\n".format(name)
+
+    if not force and HasManifest(kit_dir):
+        verify_result = Verify(
+            name,
+            kit_dir,
+            version,
+            max_workers=max_workers,
+            merkle_root=merkle_root,
+        )
+
+        if verify_result.IsSuccessful:
+            manifest = _kit_manifest.Manifest.Load(kit_dir)
+
+            if manifest.HasArchitectures(architectures):
+                _background_verification.RemoveStatus(kit_dir)
+
+                return OperationResult(
+                    "Install",
+                    name,
+                    0,
+                    output or "'{}' is already installed.\n".format(name),
+                    None,
+                )
+
+            previous_manifest = manifest
+
+    sink = io.StringIO()
+    sink.write(output)
+
+    # Kits that have been repacked or chunked are installed from the random-access content
+    if _kit_chunks.HasChunks(kit_dir):
+        install_func = _kit_chunks.Install
+    elif _kit_pack.HasPack(kit_dir):
+        install_func = _kit_pack.Install
+    else:
+        install_func = _kit_install.Install
+
+    with _trace.Span("Install", name=name):
+        return_code = install_func(
+            name,
+            kit_dir,
+            version,
+            sink,
+            max_workers=max_workers,
+            store_dir=store_dir or _kit_store.GetStoreDir(),
+            architectures=architectures,
+            previous_manifest=previous_manifest,
+            merkle_root=merkle_root,
+        )
+
+    if return_code == 0:
+        # Failed background verifications describe content that has been replaced
+        _background_verification.RemoveStatus(kit_dir)
+
+    return OperationResult("Install", name, return_code, sink.getvalue(), None)
+
+
+# ----------------------------------------------------------------------
+def _GetChangedFileInfo(manifest, verify_result):
+    """Returns the relative_path -> (size, hash) of the installed content described by a failed verification"""
+
+    file_info = {k: (v.size, v.hash) for k, v in manifest.files.items()}
+
+    for relative_path in verify_result.removed:
+        del file_info[relative_path]
+
+    # The hashes of the changed files aren't needed (or always calculated); they only have to
+    # differ from the recorded hashes.
+    for relative_path in verify_result.modified + verify_result.added:
+        file_info[relative_path] = (-1, "<changed>")
+
+    return file_info
+
+
+# ----------------------------------------------------------------------
+def _InstallFromCache(
+    name,
+    kit_dir,
+    version,
+    cache_dir,
+    force,
+    max_workers,
+    store_dir,
+    architectures,
+    merkle_root,
+):
+    # The kit is relinked to an entry that contains the architectures that it already provides
+    # along with those requested, so adding an architecture never removes another.
+    if architectures is not None:
+        manifest = _kit_manifest.Manifest.Load(kit_dir)
+
+        if manifest is not None and manifest.version == version:
+            if manifest.architectures is None:
+                architectures = None
+            else:
+                architectures = sorted(set(manifest.architectures) | set(architectures))
+
+    with _kit_cache.Lock(cache_dir, version):
+        entry_dir = None if force else _kit_cache.FindEntry(cache_dir, version, architectures)
+
+        if entry_dir is None:
+            entry_dir = _kit_cache.GetEntryDir(cache_dir, version, architectures)
+
+        elif _kit_cache.IsLinked(kit_dir, entry_dir) and HasManifest(kit_dir):
+            return OperationResult(
+                "Install",
+                name,
+                0,
+                "'{}' is already linked to '{}'.\n".format(name, entry_dir),
+                None,
+            )
+
+        # Entries are only created or repaired while the lock is held; verifying an existing
+        # entry only reads the stat information of its files.
+        _kit_cache.LinkParts(kit_dir, entry_dir)
+
+        try:
+            result = _InstallImpl(
+                name,
+                entry_dir,
+                version,
+                force,
+                max_workers,
+                store_dir,
+                architectures,
+                merkle_root,
+            )
+        finally:
+            _kit_cache.RemoveParts(entry_dir)
+
+        if not result.IsSuccessful:
+            return result._replace(
+                output="{}The cache entry '{}' could not be installed.\n".format(result.output, entry_dir),
+            )
+
+        _kit_install.RemoveInstalledContent(kit_dir)
+        _kit_cache.Link(kit_dir, entry_dir)
+
+        _background_verification.RemoveStatus(kit_dir)
+
+    return OperationResult(
+        "Install",
+        name,
+        0,
+        "{}'{}' was linked to '{}'.\n".format(result.output, name, entry_dir),
+        None,
+    )
@@ -0,0 +1,854 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_pack.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 17:36:08
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Random-access storage format for the kit payload.
+
+Files are grouped (in path order, so that subtrees are stored together) into chunks that are
+compressed independently and stored in '_Pack.NNN' parts; '_Pack.json' contains the location
+of every file. Any file can be read by decompressing the single chunk that contains it, and
+chunks can be extracted in parallel.
+
+The index records the version (the identity in _CUSTOM_DATA) of the kit that was packed, and
+the size and hash of every file. Each file is verified against its hash as it is extracted. The
+index can't vouch for itself: when a root is recorded for the version in _MERKLE_ROOTS (in
+_custom_data.py), the Merkle root of the files that it describes must match it before anything
+is extracted.
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import sys
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+import _install_checkpoint
+import _kit_hashing
+import _kit_install
+import _kit_manifest
+import _kit_store
+import _merkle_tree
+import _parts_manifest
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+INDEX_FILENAME                              = "_Pack.json"
+PART_FILENAME_TEMPLATE                      = "_Pack.{:03d}"
+
+DEFAULT_CHUNK_SIZE                          = 4 * 1024 * 1024
+DEFAULT_PART_SIZE                           = 64 * 1024 * 1024
+
+_INDEX_FORMAT_VERSION                       = 1
+
+_LZMA_PRESET                                = 6
+
+# ----------------------------------------------------------------------
+ChunkInfo                                   = namedtuple("ChunkInfo", ["part", "offset", "compressed_size", "size"])
+PackedFileInfo                              = namedtuple("PackedFileInfo", ["size", "hash", "chunk", "offset"])
+
+
+# ----------------------------------------------------------------------
+class PackIndex(object):
+    """Location of every file within the '_Pack.NNN' parts"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        name,
+        version,
+        tree_hashes,
+        parts,
+        chunks,
+        files,
+    ):
+        self.name                           = name
+        self.version                        = version
+        self.tree_hashes                    = tree_hashes
+        self.parts                          = parts
+        self.chunks                         = chunks
+        self.files                          = files
+
+    # ----------------------------------------------------------------------
+    def Select(self, architectures=None, prefixes=None):
+        """\
+        Returns the relative paths of the shared content and the content for `architectures`
+        (or all content if None) that begin with one of `prefixes` (if provided).
+        """
+
+        results = []
+
+        for relative_path in self.files:
+            if architectures is not None:
+                architecture = _kit_manifest.GetArchitecture(relative_path)
+                if architecture is not None and architecture not in architectures:
+                    continue
+
+            if prefixes and not any(relative_path.startswith(prefix) for prefix in prefixes):
+                continue
+
+            results.append(relative_path)
+
+        return results
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        """Returns the index of the packed kit or None if the kit isn't packed"""
+
+        filename = os.path.join(kit_dir, INDEX_FILENAME)
+        if not os.path.isfile(filename):
+            return None
+
+        with open(filename) as f:
+            content = json.load(f)
+
+        if content.get("format") != _INDEX_FORMAT_VERSION:
+            return None
+
+        return cls(
+            content["name"],
+            content["version"],
+            content["tree_hashes"],
+            content["parts"],
+            [ChunkInfo(*chunk) for chunk in content["chunks"]],
+            {k: PackedFileInfo(*v) for k, v in content["files"].items()},
+        )
+
+    # ----------------------------------------------------------------------
+    def Save(self, output_dir):
+        filename = os.path.join(output_dir, INDEX_FILENAME)
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _INDEX_FORMAT_VERSION,
+                    "name": self.name,
+                    "version": self.version,
+                    "tree_hashes": self.tree_hashes,
+                    "parts": self.parts,
+                    "chunks": [list(chunk) for chunk in self.chunks],
+                    "files": {k: list(v) for k, v in self.files.items()},
+                },
+                f,
+                sort_keys=True,
+                indent=1,
+            )
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def HasPack(kit_dir):
+    return os.path.isfile(os.path.join(kit_dir, INDEX_FILENAME))
+
+
+# ----------------------------------------------------------------------
+def Create(
+    manifest,
+    kit_dir,
+    output_dir,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    part_size=DEFAULT_PART_SIZE,
+    max_workers=None,
+):
+    """\
+    Packs the installed kit described by the (verified) manifest into `output_dir`, returning
+    the index.
+    """
+
+    # Group the files into chunks; files larger than the chunk size are stored in a chunk of
+    # their own.
+    chunk_files = [[]]
+    chunk_sizes = [0]
+
+    for relative_path in sorted(manifest.files):
+        size = manifest.files[relative_path].size
+
+        if chunk_files[-1] and chunk_sizes[-1] + size > chunk_size:
+            chunk_files.append([])
+            chunk_sizes.append(0)
+
+        chunk_files[-1].append(relative_path)
+        chunk_sizes[-1] += size
+
+    # ----------------------------------------------------------------------
+    def CompressChunk(relative_paths):
+        content = []
+
+        for relative_path in relative_paths:
+            with open(os.path.join(kit_dir, *relative_path.split("/")), "rb") as f:
+                content.append(f.read())
+
+        return lzma.compress(b"".join(content), preset=_LZMA_PRESET)
+
+    # ----------------------------------------------------------------------
+
+    for item in os.listdir(output_dir):
+        if item == INDEX_FILENAME or item.startswith("_Pack."):
+            os.remove(os.path.join(output_dir, item))
+
+    parts = []
+    chunks = []
+    files = {}
+
+    part_file = None
+    part_hasher = None
+
+    try:
+        for chunk_index, compressed in enumerate(
+            _OrderedMap(
+                CompressChunk,
+                chunk_files,
+                _kit_hashing.GetNumWorkers(max_workers),
+            ),
+        ):
+            if part_file is None or (part_file.tell() and part_file.tell() + len(compressed) > part_size):
+                if part_file is not None:
+                    parts[-1]["size"] = part_file.tell()
+                    parts[-1]["hash"] = part_hasher.hexdigest()
+                    part_file.close()
+
+                parts.append({"name": PART_FILENAME_TEMPLATE.format(len(parts) + 1)})
+
+                part_file = open(os.path.join(output_dir, parts[-1]["name"]), "wb")
+                part_hasher = hashlib.sha256()
+
+            chunks.append(
+                ChunkInfo(len(parts) - 1, part_file.tell(), len(compressed), chunk_sizes[chunk_index]),
+            )
+
+            part_file.write(compressed)
+            part_hasher.update(compressed)
+
+            offset = 0
+
+            for relative_path in chunk_files[chunk_index]:
+                info = manifest.files[relative_path]
+
+                files[relative_path] = PackedFileInfo(info.size, info.hash, chunk_index, offset)
+                offset += info.size
+
+        if part_file is not None:
+            parts[-1]["size"] = part_file.tell()
+            parts[-1]["hash"] = part_hasher.hexdigest()
+
+    finally:
+        if part_file is not None:
+            part_file.close()
+
+    tree_hashes = manifest.ArchitectureTreeHashes
+    tree_hashes[""] = manifest.TreeHash
+
+    index = PackIndex(
+        manifest.name,
+        manifest.version,
+        tree_hashes,
+        parts,
+        chunks,
+        files,
+    )
+
+    index.Save(output_dir)
+
+    return index
+
+
+# ----------------------------------------------------------------------
+def ReadChunk(kit_dir, index, chunk_index):
+    """Returns the decompressed content of a chunk"""
+
+    chunk = index.chunks[chunk_index]
+
+    with open(os.path.join(kit_dir, index.parts[chunk.part]["name"]), "rb") as f:
+        f.seek(chunk.offset)
+        compressed = f.read(chunk.compressed_size)
+
+    _trace.AddCounters(
+        bytes_read=len(compressed),
+    )
+
+    content = lzma.decompress(compressed)
+    if len(content) != chunk.size:
+        raise Exception("Chunk {} is corrupt".format(chunk_index))
+
+    return content
+
+
+# ----------------------------------------------------------------------
+def ReadFile(kit_dir, index, relative_path):
+    """Returns the content of a single file, decompressing only the chunk that contains it"""
+
+    info = index.files.get(relative_path)
+    if info is None:
+        raise Exception("'{}' is not in the pack".format(relative_path))
+
+    content = ReadChunk(kit_dir, index, info.chunk)[info.offset : info.offset + info.size]
+
+    if hashlib.sha256(content).hexdigest() != info.hash:
+        raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+    return content
+
+
+# ----------------------------------------------------------------------
+def Extract(
+    kit_dir,
+    index,
+    output_dir,
+    relative_paths,
+    max_workers=None,
+    on_extracted=None,
+):
+    """\
+    Extracts the files to `output_dir`, verifying the hash of each file as it is written.
+    Chunks are decompressed in parallel (lzma releases the GIL).
+
+    When provided, `on_extracted` is invoked (from any thread) with a dict of
+    relative_path -> _kit_manifest.FileInfo as each chunk is extracted.
+
+    Returns a dict of relative_path -> _kit_manifest.FileInfo.
+    """
+
+    chunk_paths = {}
+
+    for relative_path in relative_paths:
+        chunk_paths.setdefault(index.files[relative_path].chunk, []).append(relative_path)
+
+    # ----------------------------------------------------------------------
+    def ExtractChunk(chunk_index):
+        content = ReadChunk(kit_dir, index, chunk_index)
+        results = {}
+
+        for relative_path in chunk_paths[chunk_index]:
+            info = index.files[relative_path]
+            file_content = content[info.offset : info.offset + info.size]
+
+            if hashlib.sha256(file_content).hexdigest() != info.hash:
+                raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+            _trace.AddCounters(
+                bytes_hashed=info.size,
+            )
+
+            fullpath = os.path.join(output_dir, *relative_path.split("/"))
+
+            dirname = os.path.dirname(fullpath)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname, exist_ok=True)
+
+            with open(fullpath, "wb") as f:
+                f.write(file_content)
+
+            results[relative_path] = _kit_manifest.FileInfo(
+                info.size,
+                os.stat(fullpath).st_mtime_ns,
+                info.hash,
+            )
+
+        if on_extracted is not None:
+            on_extracted(results)
+
+        return results
+
+    # ----------------------------------------------------------------------
+
+    max_workers = _kit_hashing.GetNumWorkers(max_workers)
+
+    results = {}
+
+    # Largest chunks first so that the workers finish at roughly the same time
+    chunk_indexes = sorted(chunk_paths, key=lambda chunk_index: index.chunks[chunk_index].size, reverse=True)
+
+    if max_workers == 1 or len(chunk_indexes) < 2:
+        for chunk_index in chunk_indexes:
+            results.update(ExtractChunk(chunk_index))
+    else:
+        with ThreadPoolExecutor(min(max_workers, len(chunk_indexes))) as executor:
+            for chunk_results in executor.map(_trace.Bind(ExtractChunk), chunk_indexes):
+                results.update(chunk_results)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def Install(
+    name,
+    kit_dir,
+    version,
+    output_stream,
+    max_workers=None,
+    store_dir=None,
+    architectures=None,
+    previous_manifest=None,
+    merkle_root=None,
+):
+    """\
+    Installs the kit from its '_Pack.NNN' parts; this is the equivalent of `_kit_install.Install`
+    for packed kits and accepts the same arguments. An interrupted install resumes from its
+    checkpoint; files that were completely extracted are not extracted again.
+
+    `merkle_root` is the root recorded for `version` in _custom_data.py (or None).
+
+    Returns 0 on success or a non-zero value on failure.
+    """
+
+    index = PackIndex.Load(kit_dir)
+    assert index is not None, kit_dir
+
+    return InstallFromIndex(
+        name,
+        kit_dir,
+        version,
+        output_stream,
+        index,
+        [_parts_manifest.PartInfo(part["name"], part["size"], part["hash"]) for part in index.parts],
+        Extract,
+        max_workers=max_workers,
+        store_dir=store_dir,
+        architectures=architectures,
+        previous_manifest=previous_manifest,
+        merkle_root=merkle_root,
+    )
+
+
+# ----------------------------------------------------------------------
+def InstallFromIndex(
+    name,
+    kit_dir,
+    version,
+    output_stream,
+    index,
+    part_infos,
+    extract_func,
+    max_workers=None,
+    store_dir=None,
+    architectures=None,
+    previous_manifest=None,
+    merkle_root=None,
+):
+    """\
+    Installs the kit from an index of random-access content: a PackIndex or the index of
+    another layout that provides `name`, `version`, `files` (relative_path -> info with `size`
+    and `hash`), and `Select`. `part_infos` (_parts_manifest.PartInfo) describe the committed
+    files that contain the content and `extract_func` accepts the same arguments as `Extract`.
+
+    Each file is verified against the hash in the index as it is extracted. When `merkle_root`
+    (the root recorded for `version` in _custom_data.py) is provided, the files described by the
+    index are verified against it before anything is extracted.
+
+    Returns 0 on success or a non-zero value on failure.
+    """
+
+    if index.version != version:
+        output_stream.write(
+            "ERROR: The index for '{}' contains the version '{}' but '{}' was expected.\n".format(
+                name,
+                index.version,
+                version,
+            ),
+        )
+        return -1
+
+    # Missing and truncated parts are found before any content is removed or extracted (the
+    # content of each file is verified as it is extracted).
+    errors = _parts_manifest.CheckParts(
+        kit_dir,
+        part_infos,
+        check_hashes=False,
+    )
+
+    if errors:
+        output_stream.write(_parts_manifest.DescribeErrors(errors))
+        return -1
+
+    # The index describes every file, so the content that it describes is verified against the
+    # committed root (when it is recorded) before any content is removed or extracted; each file
+    # is verified against the index as it is extracted.
+    if merkle_root is not None:
+        with _trace.Span("VerifyIndex", name=name):
+            index_root = _merkle_tree.GetRoot(
+                {relative_path: (info.size, info.hash) for relative_path, info in index.files.items()},
+            )
+
+        if index_root != merkle_root:
+            output_stream.write(
+                "ERROR: The Merkle root of the content in the index for '{}' is '{}' but '{}' is recorded in _custom_data.py.\n".format(
+                    name,
+                    index_root,
+                    merkle_root,
+                ),
+            )
+            return -1
+
+    checkpoint = None
+
+    if previous_manifest is None:
+        parts = [os.path.join(kit_dir, part.name) for part in part_infos]
+
+        checkpoint = _install_checkpoint.Checkpoint.Load(kit_dir, name, version, architectures, parts)
+
+        if checkpoint is None:
+            _kit_install.RemoveInstalledContent(kit_dir)
+            checkpoint = _install_checkpoint.Checkpoint.Create(kit_dir, name, version, architectures, parts)
+
+            files = {}
+
+        else:
+            # Files that were extracted (and verified) before the install was interrupted are
+            # not extracted again; incomplete files are overwritten.
+            files = checkpoint.GetCompleteFiles()
+
+            output_stream.write(
+                "Resuming the interrupted install of '{}' ({} files were previously extracted).\n".format(
+                    name,
+                    len(files),
+                ),
+            )
+
+    else:
+        files = dict(previous_manifest.files)
+
+        if architectures is not None:
+            architectures = list(set(architectures).union(previous_manifest.architectures))
+
+    # ----------------------------------------------------------------------
+    def OnError():
+        _kit_install.RemoveInstalledContent(kit_dir)
+
+        if checkpoint is not None:
+            checkpoint.Delete()
+
+    # ----------------------------------------------------------------------
+
+    relative_paths = [relative_path for relative_path in index.Select(architectures) if relative_path not in files]
+
+    bytes_deduplicated = 0
+    bytes_copied = 0
+
+    try:
+        # Content that is already in the store is linked rather than extracted (chunks that
+        # only contain such content aren't read).
+        if store_dir is not None:
+            with _trace.Span("Materialize", name=name):
+                materialized, bytes_deduplicated, bytes_copied = _kit_store.Materialize(
+                    store_dir,
+                    {relative_path: index.files[relative_path] for relative_path in relative_paths},
+                    kit_dir,
+                    max_workers=max_workers,
+                )
+
+            files.update(materialized)
+
+            if checkpoint is not None:
+                checkpoint.AddFiles(materialized)
+
+            relative_paths = [relative_path for relative_path in relative_paths if relative_path not in materialized]
+
+        with _trace.Span("ExtractIndex", name=name):
+            files.update(
+                extract_func(
+                    kit_dir,
+                    index,
+                    kit_dir,
+                    relative_paths,
+                    max_workers=max_workers,
+                    on_extracted=checkpoint.AddFiles if checkpoint is not None else None,
+                ),
+            )
+
+    except Exception as ex:
+        output_stream.write("ERROR: Extracting '{}' failed ({}).\n".format(name, ex))
+
+        OnError()
+        return -1
+
+    manifest = _kit_manifest.Manifest(name, version, files, architectures)
+
+    # Every file of a complete install has been materialized; a partial install is a subset of
+    # the verified index.
+    if merkle_root is not None and architectures is None:
+        actual_root = manifest.MerkleNodes[_merkle_tree.ROOT_NODE]
+
+        if actual_root != merkle_root:
+            output_stream.write(
+                "ERROR: The Merkle root of '{}' is '{}' but '{}' is recorded in _custom_data.py.\n".format(
+                    name,
+                    actual_root,
+                    merkle_root,
+                ),
+            )
+
+            OnError()
+            return -1
+
+    if store_dir is not None:
+        with _trace.Span("Ingest", name=name):
+            ingest_bytes_deduplicated, ingest_bytes_copied = _kit_store.Ingest(manifest, kit_dir, store_dir)
+
+        output_stream.write(
+            _kit_store.DescribeSharing(
+                bytes_deduplicated + ingest_bytes_deduplicated,
+                bytes_copied + ingest_bytes_copied,
+            ),
+        )
+
+    manifest.Save(kit_dir)
+
+    if checkpoint is not None:
+        checkpoint.Delete()
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    output_dir=CommandLine.DirectoryTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    chunk_size=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    part_size=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Pack(
+    kit_dir,
+    output_dir=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    part_size=DEFAULT_PART_SIZE,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Repacks an installed kit into '_Pack.NNN' parts (written to the kit dir by default)"""
+
+    output_dir = output_dir or kit_dir
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        manifest = _kit_manifest.Manifest.Load(kit_dir)
+        if manifest is None:
+            dm.stream.write("ERROR: The manifest for '{}' does not exist; please run Setup.\n".format(kit_dir))
+            dm.result = -1
+
+            return dm.result
+
+        if manifest.architectures is not None:
+            dm.stream.write("ERROR: Only some architectures were installed; please run Setup for all configurations.\n")
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Verifying '{}'...".format(manifest.name))
+        with dm.stream.DoneManager() as this_dm:
+            result = _kit_manifest.Verify(
+                manifest,
+                kit_dir,
+                force=True,
+                max_workers=max_workers,
+            )
+
+            if not result.IsValid:
+                this_dm.stream.write(result.Describe())
+                this_dm.result = -1
+
+                return this_dm.result
+
+        dm.stream.write("Packing '{}'...".format(manifest.name))
+        with dm.stream.DoneManager() as this_dm:
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir)
+
+            index = Create(
+                manifest,
+                kit_dir,
+                output_dir,
+                chunk_size=chunk_size,
+                part_size=part_size,
+                max_workers=max_workers,
+            )
+
+            this_dm.stream.write(
+                "{} files were written to {} chunks in {} parts.\n".format(
+                    len(index.files),
+                    len(index.chunks),
+                    len(index.parts),
+                ),
+            )
+
+            # Setup verifies the pack against this root once it is recorded
+            this_dm.stream.write(
+                "The Merkle root of '{}' ('{}') is '{}'; record it in _MERKLE_ROOTS in _custom_data.py.\n".format(
+                    index.name,
+                    index.version,
+                    _merkle_tree.GetRoot(
+                        {relative_path: (info.size, info.hash) for relative_path, info in index.files.items()},
+                    ),
+                ),
+            )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    output_dir=CommandLine.DirectoryTypeInfo(
+        ensure_exists=False,
+    ),
+    prefix=CommandLine.StringTypeInfo(
+        arity="*",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def ExtractPack(
+    kit_dir,
+    output_dir,
+    prefix=None,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Extracts the packed content (or the subtrees that begin with '/prefix=<relative path>')"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        index = PackIndex.Load(kit_dir)
+        if index is None:
+            dm.stream.write("ERROR: '{}' does not contain a pack.\n".format(kit_dir))
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Extracting '{}'...".format(index.name))
+        with dm.stream.DoneManager() as this_dm:
+            results = Extract(
+                kit_dir,
+                index,
+                output_dir,
+                index.Select(prefixes=prefix),
+                max_workers=max_workers,
+            )
+
+            this_dm.stream.write("{} files were extracted.\n".format(len(results)))
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    relative_path=CommandLine.StringTypeInfo(),
+    output_filename=CommandLine.FilenameTypeInfo(
+        ensure_exists=False,
+    ),
+    output_stream=None,
+)
+def ExtractFile(
+    kit_dir,
+    relative_path,
+    output_filename,
+    output_stream=sys.stdout,
+):
+    """Extracts a single file from the pack"""
+
+    index = PackIndex.Load(kit_dir)
+    if index is None:
+        output_stream.write("ERROR: '{}' does not contain a pack.\n".format(kit_dir))
+        return -1
+
+    content = ReadFile(kit_dir, index, relative_path.replace("\\", "/"))
+
+    with open(output_filename, "wb") as f:
+        f.write(content)
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _OrderedMap(func, items, max_workers):
+    """\
+    Yields func(item) for each item in order, with at most 2 * `max_workers` results
+    outstanding so that the compressed content of the entire kit is never held in memory.
+    """
+
+    if max_workers == 1:
+        for item in items:
+            yield func(item)
+
+        return
+
+    func = _trace.Bind(func)
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        pending = []
+
+        for item in items:
+            pending.append(executor.submit(func, item))
+
+            if len(pending) >= 2 * max_workers:
+                yield pending.pop(0).result()
+
+        for future in pending:
+            yield future.result()
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
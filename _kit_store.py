@@ -0,0 +1,410 @@
+# ----------------------------------------------------------------------
+# |
+# |  _kit_store.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 15:47:19
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Content-addressed storage shared by installed kits.
+
+Each unique file is stored once (named by its SHA256) and the installed kits reference the
+stored content via hard links, so files that are identical across kit versions only consume
+disk space once. Installs from an index (packed, chunked, or delta content) link the files that
+are already in the store rather than extracting them.
+
+Content is copied rather than linked when the store is on a different volume; copied content
+isn't shared, so it is reported separately.
+
+Kits that use the store are recorded in it when their content is ingested. Pruning only removes
+content that isn't referenced by the manifest of a recorded kit and has no other links, so
+content copied to another volume isn't removed while a kit still uses it.
+
+Linked files share their content with the store and every other kit that links to it, so an
+installed file must never be modified in place: the change would be made to every kit's copy.
+Tools that change a kit's files must write a new file and rename it over the old one, which
+breaks the link. Content modified in place is detected by verification, and stored content
+that doesn't match its hash is replaced (and not linked) when a kit is installed.
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+import _kit_hashing
+import _kit_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Environment variable that enables the store; the value is the directory that contains the
+# stored content. Kits are installed as independent trees when the variable isn't defined.
+STORE_DIR_ENV_VAR                           = "DEVELOPMENT_ENVIRONMENT_WINDOWS_KITS_STORE"
+
+OBJECTS_DIRNAME                             = "objects"
+KITS_DIRNAME                                = "kits"
+
+
+# ----------------------------------------------------------------------
+def GetStoreDir():
+    """Returns the store dir or None if the store isn't enabled"""
+
+    return os.getenv(STORE_DIR_ENV_VAR) or None
+
+
+# ----------------------------------------------------------------------
+def GetObjectFilename(store_dir, file_hash):
+    return os.path.join(store_dir, OBJECTS_DIRNAME, file_hash[:2], file_hash)
+
+
+# ----------------------------------------------------------------------
+def Materialize(
+    store_dir,
+    files,
+    output_dir,
+    max_workers=None,
+):
+    """\
+    Links the files whose content is in the store into `output_dir` so that they don't have to
+    be extracted; `files` is a dict of relative_path -> info with `size` and `hash`. Stored
+    content is verified against its hash before it is linked (it is shared with every kit that
+    links to it).
+
+    Returns (dict of relative_path -> _kit_manifest.FileInfo for the files that were
+    materialized, bytes_deduplicated, bytes_copied).
+    """
+
+    items = []
+
+    for file_hash, size in set((info.hash, info.size) for info in files.values()):
+        object_filename = GetObjectFilename(store_dir, file_hash)
+
+        if os.path.isfile(object_filename) and os.path.getsize(object_filename) == size:
+            items.append(((file_hash, size), object_filename, size))
+
+    stored = set(
+        key
+        for key, actual_hash in _kit_hashing.HashFiles(items, max_workers=max_workers).items()
+        if actual_hash == key[0]
+    )
+
+    results = {}
+    bytes_deduplicated = 0
+    bytes_copied = 0
+
+    for relative_path, info in files.items():
+        if (info.hash, info.size) not in stored:
+            continue
+
+        fullpath = os.path.join(output_dir, *relative_path.split("/"))
+
+        dirname = os.path.dirname(fullpath)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        if _LinkOrCopy(GetObjectFilename(store_dir, info.hash), fullpath):
+            bytes_deduplicated += info.size
+        else:
+            bytes_copied += info.size
+
+        results[relative_path] = _kit_manifest.FileInfo(info.size, os.stat(fullpath).st_mtime_ns, info.hash)
+
+    return results, bytes_deduplicated, bytes_copied
+
+
+# ----------------------------------------------------------------------
+def Ingest(manifest, kit_dir, store_dir):
+    """\
+    Replaces every file in the installed kit with a hard link to its content in the store,
+    adding content to the store when it doesn't already exist. Stored content that doesn't
+    match its hash is replaced by the (verified) installed file.
+
+    The manifest is updated with the stat information of the linked files (but not saved).
+    Returns (bytes_deduplicated, bytes_copied): the number of bytes that were linked to content
+    already in the store and the number of bytes that were copied because the store is on a
+    different volume.
+    """
+
+    _RegisterKit(store_dir, kit_dir)
+
+    bytes_deduplicated = 0
+    bytes_copied = 0
+
+    for relative_path, info in manifest.files.items():
+        fullpath = os.path.join(kit_dir, *relative_path.split("/"))
+        object_filename = GetObjectFilename(store_dir, info.hash)
+
+        if os.path.isfile(object_filename) and os.path.samefile(object_filename, fullpath):
+            continue
+
+        if _IsValidObject(object_filename, info):
+            if _LinkOrCopy(object_filename, fullpath):
+                bytes_deduplicated += info.size
+            else:
+                bytes_copied += info.size
+
+        else:
+            dirname = os.path.dirname(object_filename)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+
+            # Link the installed file into the store
+            if not _LinkOrCopy(fullpath, object_filename):
+                bytes_copied += info.size
+
+        manifest.files[relative_path] = info._replace(
+            mtime_ns=os.stat(fullpath).st_mtime_ns,
+        )
+
+    return bytes_deduplicated, bytes_copied
+
+
+# ----------------------------------------------------------------------
+def DescribeSharing(bytes_deduplicated, bytes_copied):
+    """Returns a description of the results of `Materialize` and `Ingest` (or an empty string)"""
+
+    output = ""
+
+    if bytes_deduplicated:
+        output += "{} bytes were shared with previously installed content.\n".format(bytes_deduplicated)
+
+    if bytes_copied:
+        output += "{} bytes were copied rather than shared because the store is on a different volume.\n".format(bytes_copied)
+
+    return output
+
+
+# ----------------------------------------------------------------------
+def Prune(store_dir):
+    """\
+    Removes content that is no longer referenced by any installed kit.
+
+    Content is referenced when it is in the manifest of a kit recorded in the store or when
+    links other than the store's exist (for kits ingested before they were recorded).
+
+    Returns (num_files, num_bytes) removed.
+    """
+
+    objects_dir = os.path.join(store_dir, OBJECTS_DIRNAME)
+    if not os.path.isdir(objects_dir):
+        return 0, 0
+
+    referenced = _GetReferencedHashes(store_dir)
+
+    num_files = 0
+    num_bytes = 0
+
+    for root, _, filenames in os.walk(objects_dir):
+        for filename in filenames:
+            # Temp files are written by concurrent installs
+            if filename.endswith(".tmp") or filename in referenced:
+                continue
+
+            fullpath = os.path.join(root, filename)
+            stat_result = os.stat(fullpath)
+
+            if stat_result.st_nlink > 1:
+                continue
+
+            os.remove(fullpath)
+
+            num_files += 1
+            num_bytes += stat_result.st_size
+
+    return num_files, num_bytes
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    store_dir=CommandLine.DirectoryTypeInfo(
+        ensure_exists=False,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Deduplicate(
+    kit_dir,
+    store_dir=None,
+    output_stream=sys.stdout,
+):
+    """Adds the content of an installed kit to the store and links the kit's files to it"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        store_dir = store_dir or GetStoreDir()
+        if store_dir is None:
+            dm.stream.write("ERROR: '/store_dir' was not provided and '{}' is not defined.\n".format(STORE_DIR_ENV_VAR))
+            dm.result = -1
+
+            return dm.result
+
+        manifest = _kit_manifest.Manifest.Load(kit_dir)
+        if manifest is None:
+            dm.stream.write("ERROR: The manifest for '{}' does not exist; please run Setup.\n".format(kit_dir))
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Deduplicating '{}'...".format(manifest.name))
+        with dm.stream.DoneManager() as this_dm:
+            bytes_deduplicated, bytes_copied = Ingest(manifest, kit_dir, store_dir)
+            manifest.Save(kit_dir)
+
+            this_dm.stream.write("{} bytes were already in the store.\n".format(bytes_deduplicated))
+
+            if bytes_copied:
+                this_dm.stream.write("{} bytes were copied because the store is on a different volume.\n".format(bytes_copied))
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    store_dir=CommandLine.DirectoryTypeInfo(
+        arity="?",
+    ),
+    output_stream=None,
+)
+def PruneStore(
+    store_dir=None,
+    output_stream=sys.stdout,
+):
+    """Removes content from the store that is no longer referenced by an installed kit"""
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        store_dir = store_dir or GetStoreDir()
+        if store_dir is None:
+            dm.stream.write("ERROR: '/store_dir' was not provided and '{}' is not defined.\n".format(STORE_DIR_ENV_VAR))
+            dm.result = -1
+
+            return dm.result
+
+        dm.stream.write("Pruning '{}'...".format(store_dir))
+        with dm.stream.DoneManager() as this_dm:
+            num_files, num_bytes = Prune(store_dir)
+
+            this_dm.stream.write("{} files ({} bytes) were removed.\n".format(num_files, num_bytes))
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _IsValidObject(object_filename, info):
+    """Returns True if the stored content exists and matches the size and hash of `info`"""
+
+    return (
+        os.path.isfile(object_filename)
+        and os.path.getsize(object_filename) == info.size
+        and _kit_hashing.HashFile(object_filename) == info.hash
+    )
+
+
+# ----------------------------------------------------------------------
+def _RegisterKit(store_dir, kit_dir):
+    """Records that the kit uses the store"""
+
+    kit_dir = os.path.abspath(kit_dir)
+
+    kits_dir = os.path.join(store_dir, KITS_DIRNAME)
+    if not os.path.isdir(kits_dir):
+        os.makedirs(kits_dir, exist_ok=True)
+
+    filename = os.path.join(
+        kits_dir,
+        hashlib.sha256(os.path.normcase(kit_dir).encode("utf-8")).hexdigest(),
+    )
+
+    if os.path.isfile(filename):
+        return
+
+    temp_filename = "{}.{}.tmp".format(filename, os.getpid())
+
+    with open(temp_filename, "w") as f:
+        f.write(kit_dir)
+
+    os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def _GetReferencedHashes(store_dir):
+    """Returns the hashes of the content in the manifests of the kits recorded in the store"""
+
+    kits_dir = os.path.join(store_dir, KITS_DIRNAME)
+    if not os.path.isdir(kits_dir):
+        return set()
+
+    results = set()
+
+    for item in os.listdir(kits_dir):
+        if item.endswith(".tmp"):
+            continue
+
+        filename = os.path.join(kits_dir, item)
+
+        with open(filename) as f:
+            kit_dir = f.read().strip()
+
+        # Kits that have been removed no longer reference content
+        if not os.path.isdir(kit_dir):
+            os.remove(filename)
+            continue
+
+        # A kit without a manifest is being installed; its content is protected by its links
+        manifest = _kit_manifest.Manifest.Load(kit_dir)
+        if manifest is None:
+            continue
+
+        results.update(info.hash for info in manifest.files.values())
+
+    return results
+
+
+# ----------------------------------------------------------------------
+def _LinkOrCopy(source, dest):
+    """Returns True if the file was linked or False if it was copied"""
+
+    # The temp name ensures that concurrent installs never see a partially written file
+    temp_filename = "{}.{}.tmp".format(dest, os.getpid())
+
+    try:
+        os.link(source, temp_filename)
+        linked = True
+    except OSError:
+        # The store is on a different volume
+        shutil.copy2(source, temp_filename)
+        linked = False
+
+    os.replace(temp_filename, dest)
+
+    return linked
@@ -0,0 +1,388 @@
+# ----------------------------------------------------------------------
+# |
+# |  _merkle_tree.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 23:41:26
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Merkle tree over the directory layout of an installed kit.
+
+The hash of each directory (node) is calculated from the names, sizes, and hashes of the files
+that it contains and the names and hashes of its subdirs; the hash of the root dir identifies
+the entire installed kit. Nodes are recorded in the manifest when it is saved, so:
+
+    - A subtree (for example, the dirs that a configuration adds to PATH, INCLUDE, and LIB) is
+      verified against the root by hashing only the subtree and combining it with the recorded
+      hashes of the nodes outside of it.
+
+    - Differences between two trees are narrowed down to the dirs that contain them by only
+      descending into nodes whose hashes differ.
+
+The root of each version is calculated from the committed content when the kit is committed
+and recorded in _MERKLE_ROOTS in _custom_data.py (see `Root`); installs and activation are
+verified against the recorded root in addition to the version. Kits without a recorded root are
+verified against the version alone.
+"""
+
+import hashlib
+import os
+import re
+import sys
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+
+import _kit_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+ROOT_NODE                                   = ""
+
+_CUSTOM_DATA_FILENAME                       = os.path.join(_script_dir, "_custom_data.py")
+_MERKLE_ROOTS_REGEX                         = re.compile(r"^(?P<prefix>_MERKLE_ROOTS\s*=\s*\{\r?\n)(?P<entries>.*?)^\}", re.MULTILINE | re.DOTALL)
+
+
+# ----------------------------------------------------------------------
+def CalculateNodes(file_info, fixed_nodes=None):
+    """\
+    Returns a dict of dir -> hash for every dir in the tree (ROOT_NODE for the root dir) given
+    a dict of relative_path -> (size, hash).
+
+    `fixed_nodes` (dir -> hash) describes dirs whose content isn't in `file_info` (for example,
+    the content of architectures that weren't installed); their hashes are used as-is.
+    """
+
+    fixed_nodes = fixed_nodes or {}
+
+    files = {}
+    dirs = {ROOT_NODE: set()}
+
+    for relative_path, (size, file_hash) in file_info.items():
+        parent, _, name = relative_path.rpartition("/")
+
+        files.setdefault(parent, {})[name] = (size, file_hash)
+
+        _RegisterDir(dirs, parent)
+
+    for dirname in fixed_nodes:
+        _RegisterDir(dirs, dirname)
+
+    nodes = {}
+
+    # Children are hashed before their parents
+    for dirname in sorted(dirs, key=_GetDepth, reverse=True):
+        if dirname in fixed_nodes:
+            nodes[dirname] = fixed_nodes[dirname]
+            continue
+
+        nodes[dirname] = _HashNode(
+            files.get(dirname, {}),
+            {name: nodes[_Join(dirname, name)] for name in dirs[dirname]},
+        )
+
+    return nodes
+
+
+# ----------------------------------------------------------------------
+def GetRoot(file_info):
+    """Returns the root hash of the tree given a dict of relative_path -> (size, hash)"""
+
+    return CalculateNodes(file_info)[ROOT_NODE]
+
+
+# ----------------------------------------------------------------------
+def GetRecordedRoot(version):
+    """Returns the root recorded for `version` in _MERKLE_ROOTS in _custom_data.py (or None)"""
+
+    return _LoadCustomData()._MERKLE_ROOTS.get(version)
+
+
+# ----------------------------------------------------------------------
+def CalculateRoot(file_info, nodes, subtrees):
+    """\
+    Returns the root hash calculated from the files within `subtrees` (dirs) and the recorded
+    `nodes` of the rest of the tree; each subtree is verified against the root by hashing only
+    the subtree and the files directly within its ancestors.
+    """
+
+    subtrees = GetOutermostSubtrees(subtrees)
+
+    nodes = dict(nodes)
+
+    # Recalculate the nodes within the subtrees
+    subtree_prefixes = tuple("{}/".format(subtree) for subtree in subtrees if subtree)
+
+    for subtree in subtrees:
+        if subtree == ROOT_NODE:
+            return CalculateNodes(file_info)[ROOT_NODE]
+
+        nodes = {
+            dirname: node
+            for dirname, node in nodes.items()
+            if dirname != subtree and not dirname.startswith("{}/".format(subtree))
+        }
+
+    subtree_nodes = CalculateNodes(
+        {
+            relative_path: info
+            for relative_path, info in file_info.items()
+            if relative_path.startswith(subtree_prefixes)
+        },
+    )
+
+    for dirname, node in subtree_nodes.items():
+        if dirname in subtrees or dirname.startswith(subtree_prefixes):
+            nodes[dirname] = node
+
+    # Recalculate the ancestors of the subtrees from their children
+    ancestors = set()
+
+    for subtree in subtrees:
+        while subtree:
+            subtree = subtree.rpartition("/")[0]
+            ancestors.add(subtree)
+
+    files = {}
+    dirs = {}
+
+    for relative_path, (size, file_hash) in file_info.items():
+        parent, _, name = relative_path.rpartition("/")
+
+        if parent in ancestors:
+            files.setdefault(parent, {})[name] = (size, file_hash)
+
+    for dirname in nodes:
+        if dirname == ROOT_NODE:
+            continue
+
+        parent, _, name = dirname.rpartition("/")
+
+        if parent in ancestors:
+            dirs.setdefault(parent, {})[name] = dirname
+
+    for dirname in sorted(ancestors, key=_GetDepth, reverse=True):
+        nodes[dirname] = _HashNode(
+            files.get(dirname, {}),
+            {name: nodes[child] for name, child in dirs.get(dirname, {}).items()},
+        )
+
+    return nodes[ROOT_NODE]
+
+
+# ----------------------------------------------------------------------
+def FindMismatches(expected_nodes, actual_nodes):
+    """\
+    Returns the dirs that contain differences between two trees: the deepest dirs whose hashes
+    differ, found by only descending into nodes whose hashes differ.
+    """
+
+    children = {}
+
+    for dirname in set(expected_nodes).union(actual_nodes):
+        if dirname != ROOT_NODE:
+            children.setdefault(dirname.rpartition("/")[0], []).append(dirname)
+
+    results = []
+
+    # ----------------------------------------------------------------------
+    def Impl(dirname):
+        if expected_nodes.get(dirname) == actual_nodes.get(dirname):
+            return
+
+        mismatched_children = [
+            child for child in children.get(dirname, [])
+            if expected_nodes.get(child) != actual_nodes.get(child)
+        ]
+
+        for child in mismatched_children:
+            Impl(child)
+
+        # When none of the subdirs differ, the differences are in the files directly within the dir
+        if not mismatched_children:
+            results.append(dirname)
+
+    # ----------------------------------------------------------------------
+
+    Impl(ROOT_NODE)
+
+    return sorted(results)
+
+
+# ----------------------------------------------------------------------
+def GetOutermostSubtrees(subtrees):
+    """Returns the subtrees that aren't within another subtree"""
+
+    results = []
+
+    for subtree in sorted(set(subtrees)):
+        if any(
+            result == ROOT_NODE or subtree == result or subtree.startswith("{}/".format(result))
+            for result in results
+        ):
+            continue
+
+        results.append(subtree)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    kit_dir=CommandLine.DirectoryTypeInfo(),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Root(
+    kit_dir,
+    record=False,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """\
+    Calculates the Merkle root of the content committed for the kit (its chunks, pack, or
+    '_Install.7z.NNN' parts) and writes it; the root is recorded in _MERKLE_ROOTS in
+    _custom_data.py when `record` is provided. The installed content is not used.
+    """
+
+    # _kit_operations imports this module
+    import _kit_operations
+
+    kit_dir = os.path.normcase(os.path.realpath(kit_dir))
+
+    for name, version, path_parts in _LoadCustomData()._CUSTOM_DATA:
+        if os.path.normcase(os.path.realpath(os.path.join(_script_dir, *path_parts))) == kit_dir:
+            break
+    else:
+        output_stream.write("ERROR: '{}' is not the dir of a kit in _CUSTOM_DATA.\n".format(kit_dir))
+        return -1
+
+    try:
+        root = _kit_operations.CalculateMerkleRoot(name, kit_dir, version, max_workers=max_workers)
+    except Exception as ex:
+        output_stream.write("ERROR: {}\n".format(ex))
+        return -1
+
+    output_stream.write("{}\n".format(root))
+
+    if record:
+        _RecordRoot(version, root)
+
+    return 0
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _HashNode(files, dirs):
+    """Returns the hash of a dir given dicts of name -> (size, hash) and name -> node"""
+
+    lines = ["F\t{}\t{}\t{}\n".format(name, size, file_hash) for name, (size, file_hash) in files.items()]
+    lines += ["D\t{}\t{}\n".format(name, node) for name, node in dirs.items()]
+
+    hasher = hashlib.sha256()
+
+    for line in sorted(lines, key=lambda line: line.split("\t", 2)[1]):
+        hasher.update(line.encode("utf-8"))
+
+    return hasher.hexdigest()
+
+
+# ----------------------------------------------------------------------
+def _LoadCustomData():
+    # Ensure that the data is loaded from this dir and not some other repository
+    sys.modules.pop("_custom_data", None)
+
+    sys.path.insert(0, _script_dir)
+    try:
+        import _custom_data
+    finally:
+        del sys.path[0]
+
+    return _custom_data
+
+
+# ----------------------------------------------------------------------
+def _RecordRoot(version, root):
+    """Adds or replaces the entry for `version` in _MERKLE_ROOTS in _custom_data.py"""
+
+    with open(_CUSTOM_DATA_FILENAME, newline="") as f:
+        content = f.read()
+
+    match = _MERKLE_ROOTS_REGEX.search(content)
+    if match is None:
+        raise Exception("_MERKLE_ROOTS could not be found in '{}'".format(_CUSTOM_DATA_FILENAME))
+
+    newline = "\r\n" if match.group("prefix").endswith("\r\n") else "\n"
+
+    roots = dict(re.findall(r'"(?P<version>[^"]+)":\s*"(?P<root>[^"]+)"', match.group("entries")))
+    roots[version] = root
+
+    content = "{}{}{}".format(
+        content[:match.start("entries")],
+        "".join('    "{}": "{}",{}'.format(k, v, newline) for k, v in roots.items()),
+        content[match.end("entries"):],
+    )
+
+    temp_filename = "{}.tmp".format(_CUSTOM_DATA_FILENAME)
+
+    with open(temp_filename, "w", newline="") as f:
+        f.write(content)
+
+    os.replace(temp_filename, _CUSTOM_DATA_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def _RegisterDir(dirs, dirname):
+    """Registers the dir with each of its ancestors (stopping at the first ancestor that already contains it)"""
+
+    while dirname:
+        dirs.setdefault(dirname, set())
+
+        parent, _, name = dirname.rpartition("/")
+
+        siblings = dirs.setdefault(parent, set())
+        if name in siblings:
+            break
+
+        siblings.add(name)
+        dirname = parent
+
+
+# ----------------------------------------------------------------------
+def _GetDepth(dirname):
+    return dirname.count("/") + 1 if dirname else 0
+
+
+# ----------------------------------------------------------------------
+def _Join(dirname, name):
+    return "{}/{}".format(dirname, name) if dirname else name
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    try:
+        sys.exit(CommandLine.Main())
+    except KeyboardInterrupt:
+        pass
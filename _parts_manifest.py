@@ -0,0 +1,266 @@
+# ----------------------------------------------------------------------
+# |
+# |  _parts_manifest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 19:31:07
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Committed manifest of the size and hash of each '_Install.7z.NNN' part.
+
+The hash in _CUSTOM_DATA describes the archive formed by all of the parts, so a truncated or
+corrupt part would otherwise only be detected after the entire archive has been extracted and
+hashed, with no indication of which part is bad. The parts manifest is written when the parts
+are committed; Setup checks the parts against it (in parallel) before any content is removed
+or extracted, and names the parts that must be fetched again.
+"""
+
+import hashlib
+import json
+import os
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import CommonEnvironment
+
+import _kit_hashing
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# The name begins with an underscore so that it is preserved with the committed parts
+# rather than being treated as installed content.
+PARTS_MANIFEST_FILENAME                     = "_Install.7z.json"
+
+_PARTS_MANIFEST_FORMAT_VERSION              = 1
+
+_READ_BLOCK_SIZE                            = 4 * 1024 * 1024
+
+# ----------------------------------------------------------------------
+PartInfo                                    = namedtuple("PartInfo", ["name", "size", "hash"])
+PartError                                   = namedtuple("PartError", ["name", "description"])
+
+
+# ----------------------------------------------------------------------
+class PartsManifest(object):
+    """Size and hash of each part of the archive whose hash is `version`"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, version, parts):
+        self.version                        = version
+        self.parts                          = parts
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        """\
+        Returns the parts manifest or None if one hasn't been committed (or its format isn't
+        supported, in which case the parts are verified by hashing the archive).
+        """
+
+        filename = os.path.join(kit_dir, PARTS_MANIFEST_FILENAME)
+        if not os.path.isfile(filename):
+            return None
+
+        with open(filename) as f:
+            content = json.load(f)
+
+        if content.get("format") != _PARTS_MANIFEST_FORMAT_VERSION:
+            return None
+
+        return cls(
+            content["version"],
+            [PartInfo(part["name"], part["size"], part["hash"]) for part in content["parts"]],
+        )
+
+    # ----------------------------------------------------------------------
+    def Save(self, kit_dir):
+        filename = os.path.join(kit_dir, PARTS_MANIFEST_FILENAME)
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _PARTS_MANIFEST_FORMAT_VERSION,
+                    "version": self.version,
+                    "parts": [part._asdict() for part in self.parts],
+                },
+                f,
+                indent=1,
+            )
+
+        os.replace(temp_filename, filename)
+
+    # ----------------------------------------------------------------------
+    def Check(
+        self,
+        kit_dir,
+        version,
+        part_names=None,
+        max_workers=None,
+        stop_on_error=True,
+    ):
+        """\
+        Returns a list of PartError for the parts that are missing, truncated, or corrupt
+        (the list is empty if all parts are valid).
+
+        When provided, `part_names` are the names of the parts that exist in `kit_dir`; parts
+        that are not in the manifest are reported as errors.
+        """
+
+        if self.version != version:
+            return [
+                PartError(
+                    PARTS_MANIFEST_FILENAME,
+                    "describes the version '{}' but '{}' was expected".format(self.version, version),
+                ),
+            ]
+
+        errors = []
+
+        if part_names is not None:
+            expected_names = set(part.name for part in self.parts)
+
+            errors += [
+                PartError(part_name, "is not in '{}'".format(PARTS_MANIFEST_FILENAME))
+                for part_name in part_names
+                if part_name not in expected_names
+            ]
+
+            if errors and stop_on_error:
+                return errors
+
+        return errors + CheckParts(
+            kit_dir,
+            self.parts,
+            max_workers=max_workers,
+            stop_on_error=stop_on_error,
+        )
+
+
+# ----------------------------------------------------------------------
+def Create(version, parts):
+    """\
+    Creates a parts manifest for the parts (fullpaths, in order); raises if the archive formed
+    by the parts doesn't have the hash `version`.
+    """
+
+    archive_hasher = hashlib.sha256()
+    part_infos = []
+
+    for part in parts:
+        part_hasher = hashlib.sha256()
+        size = 0
+
+        with open(part, "rb") as f:
+            while True:
+                block = f.read(_READ_BLOCK_SIZE)
+                if not block:
+                    break
+
+                archive_hasher.update(block)
+                part_hasher.update(block)
+                size += len(block)
+
+        part_infos.append(PartInfo(os.path.basename(part), size, part_hasher.hexdigest()))
+
+    archive_hash = archive_hasher.hexdigest()
+
+    if archive_hash != version:
+        raise Exception("The hash of the parts is '{}' but '{}' was expected".format(archive_hash, version))
+
+    return PartsManifest(version, part_infos)
+
+
+# ----------------------------------------------------------------------
+def CheckParts(
+    kit_dir,
+    parts,
+    max_workers=None,
+    check_hashes=True,
+    stop_on_error=True,
+):
+    """\
+    Returns a list of PartError for the parts (PartInfo) that are missing, truncated, or corrupt.
+
+    Sizes are checked first, so missing and truncated parts are reported without reading any
+    content. Hashes are then calculated in parallel; when `stop_on_error` is True, the check
+    stops at the first corrupt part.
+    """
+
+    errors = []
+    items = []
+
+    for part in parts:
+        fullpath = os.path.join(kit_dir, part.name)
+
+        try:
+            size = os.path.getsize(fullpath)
+        except FileNotFoundError:
+            errors.append(PartError(part.name, "does not exist"))
+            continue
+
+        if size != part.size:
+            errors.append(PartError(part.name, "contains {} bytes but {} were expected".format(size, part.size)))
+            continue
+
+        items.append((part, fullpath))
+
+    if (errors and stop_on_error) or not check_hashes or not items:
+        return errors
+
+    max_workers = _kit_hashing.GetNumWorkers(max_workers)
+
+    with _trace.Span("CheckParts", num_parts=len(items), max_workers=max_workers):
+        hash_file = _trace.Bind(_kit_hashing.HashFile)
+
+        with ThreadPoolExecutor(min(max_workers, len(items))) as executor:
+            futures = {
+                executor.submit(hash_file, fullpath): part
+                for part, fullpath in items
+            }
+
+            for future in as_completed(futures):
+                part = futures[future]
+                part_hash = future.result()
+
+                if part_hash != part.hash:
+                    errors.append(
+                        PartError(
+                            part.name,
+                            "is corrupt (its hash is '{}' but '{}' was expected)".format(part_hash, part.hash),
+                        ),
+                    )
+
+                    if stop_on_error:
+                        # Parts that are being hashed will finish, but no others are started
+                        for other_future in futures:
+                            other_future.cancel()
+
+                        break
+
+    return sorted(errors)
+
+
+# ----------------------------------------------------------------------
+def DescribeErrors(errors):
+    """Returns a description of the errors that names the parts that must be fetched again"""
+
+    return "".join(
+        "ERROR: '{}' {}.\n".format(error.name, error.description)
+        for error in errors
+    ) + "Please fetch the parts listed above again (or update '{}' if the parts were intentionally changed) and run Setup.\n".format(
+        PARTS_MANIFEST_FILENAME,
+    )
@@ -0,0 +1,805 @@
+# ----------------------------------------------------------------------
+# |
+# |  _payload_validation.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 21:02:18
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Validates that the committed payload of a kit is consistent with the hash declared in
+_CUSTOM_DATA and the Merkle root recorded in _MERKLE_ROOTS; used by the SCM hooks. Kits without
+a recorded root are validated against the hash alone.
+
+The content is read from git rather than from the working tree: from the index when changes are
+committed and from each pushed revision when changes are pushed (_custom_data.py is read from
+the same place). Every payload format is validated:
+
+    - '_Install.7z.NNN' parts: each part against the parts manifest (when one is committed) and
+      the archive formed by the parts against the hash in _CUSTOM_DATA.
+    - '_Pack.json' and '_Pack.NNN' parts: the version of the index against _CUSTOM_DATA, the
+      files described by the index against the Merkle root, each part against the index, and
+      each file against its hash.
+    - '_Chunks.json' and '_Chunks/<id>.xz': the version of the index against _CUSTOM_DATA, the
+      files described by the index against the Merkle root, each chunk against the index, and
+      each file against its hash.
+    - '_Delta.json' and '_Delta.NNN' parts: the version that the delta upgrades to against
+      _CUSTOM_DATA, its Merkle root, each part against the index, and each file against its hash.
+
+Only git working copies are validated.
+
+Kits must contain '_Install.7z.NNN' parts, a pack, or chunks.
+
+Hashes are cached by git object id, so only objects that haven't been validated before are
+hashed. The content of a payload is only verified when its objects change, which only happens
+when the payload is updated.
+"""
+
+import ast
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import subprocess
+import tempfile
+
+import CommonEnvironment
+
+import _kit_chunks
+import _kit_delta
+import _kit_install
+import _kit_manifest
+import _kit_pack
+import _merkle_tree
+import _parts_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+HASH_CACHE_FILENAME                         = "PayloadHashes.json"
+
+# Prefixes of the names of payload files within the kit dir
+PAYLOAD_PREFIXES                            = ("_Install.7z.", "_Pack.", "_Chunks", "_Delta.")
+
+_HASH_CACHE_FORMAT_VERSION                  = 2
+
+_READ_BLOCK_SIZE                            = 4 * 1024 * 1024
+
+
+# ----------------------------------------------------------------------
+class Repository(object):
+    """Committed content of the git repository in the index (when `revision` is None) or a revision"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, repo_dir, revision=None):
+        self.repo_dir                       = repo_dir
+        self.revision                       = revision
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Create(cls, dirname, revision=None):
+        """Returns the repository that contains `dirname` (or None if it isn't in a git working copy)"""
+
+        try:
+            process = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel"],
+                cwd=dirname,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            # git isn't installed
+            return None
+
+        if process.returncode != 0:
+            return None
+
+        return cls(os.path.realpath(process.stdout.decode("utf-8").strip()), revision)
+
+    # ----------------------------------------------------------------------
+    def GetRelativePath(self, fullpath):
+        return os.path.relpath(os.path.realpath(fullpath), self.repo_dir).replace(os.path.sep, "/")
+
+    # ----------------------------------------------------------------------
+    def ReadFile(self, relative_path):
+        """Returns the committed content of the file or None if it isn't committed"""
+
+        process = subprocess.run(
+            ["git", "cat-file", "blob", "{}:{}".format(self.revision or "", relative_path)],
+            cwd=self.repo_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+        if process.returncode != 0:
+            return None
+
+        return process.stdout
+
+    # ----------------------------------------------------------------------
+    def ListFiles(self, relative_dir):
+        """Returns a dict of relative_path (within the dir) -> (object id, size) for the committed files"""
+
+        prefix = "{}/".format(relative_dir)
+
+        if self.revision is None:
+            # <mode> <object id> <stage>\t<path>
+            object_ids = {}
+
+            for entry in _Git(self.repo_dir, "ls-files", "-s", "-z", "--", prefix).decode("utf-8").split("\0"):
+                if entry:
+                    info, relative_path = entry.split("\t", 1)
+                    object_ids[relative_path] = info.split()[1]
+
+            sizes = self._GetSizes(set(object_ids.values()))
+
+            files = {relative_path: (object_id, sizes[object_id]) for relative_path, object_id in object_ids.items()}
+
+        else:
+            # <mode> <type> <object id> <size>\t<path>
+            files = {}
+
+            for entry in _Git(self.repo_dir, "ls-tree", "-r", "-l", "-z", self.revision, "--", prefix).decode("utf-8").split("\0"):
+                if entry:
+                    info, relative_path = entry.split("\t", 1)
+                    _, object_type, object_id, size = info.split()
+
+                    if object_type == "blob":
+                        files[relative_path] = (object_id, int(size))
+
+        return {relative_path[len(prefix):]: info for relative_path, info in files.items()}
+
+    # ----------------------------------------------------------------------
+    def Read(self, object_id):
+        """Yields the content of the object in blocks"""
+
+        process = subprocess.Popen(
+            ["git", "cat-file", "blob", object_id],
+            cwd=self.repo_dir,
+            stdout=subprocess.PIPE,
+        )
+
+        try:
+            while True:
+                block = process.stdout.read(_READ_BLOCK_SIZE)
+                if not block:
+                    break
+
+                yield block
+
+        finally:
+            process.stdout.close()
+
+            if process.wait() != 0:
+                raise Exception("The git object '{}' could not be read".format(object_id))
+
+    # ----------------------------------------------------------------------
+    def Hash(self, object_id):
+        hasher = hashlib.sha256()
+
+        for block in self.Read(object_id):
+            hasher.update(block)
+
+        return hasher.hexdigest()
+
+    # ----------------------------------------------------------------------
+    def Write(self, object_id, filename):
+        dirname = os.path.dirname(filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        with open(filename, "wb") as f:
+            for block in self.Read(object_id):
+                f.write(block)
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _GetSizes(self, object_ids):
+        if not object_ids:
+            return {}
+
+        process = subprocess.run(
+            ["git", "cat-file", "--batch-check=%(objectname) %(objectsize)"],
+            cwd=self.repo_dir,
+            input="".join("{}\n".format(object_id) for object_id in object_ids).encode("utf-8"),
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+
+        results = {}
+
+        for line in process.stdout.decode("utf-8").splitlines():
+            object_id, size = line.split()
+            results[object_id] = int(size)
+
+        return results
+
+
+# ----------------------------------------------------------------------
+class HashCache(object):
+    """Hashes of git objects and the payloads that have been verified, keyed by object id"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, kit_dir, objects=None, payloads=None):
+        self.kit_dir                        = kit_dir
+
+        # object id -> SHA256 of its content
+        self.objects                        = objects or {}
+
+        # "<format>:<version>" -> ids of the objects whose content was verified
+        self.payloads                       = payloads or {}
+
+        self._is_modified                   = False
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir):
+        filename = GetHashCacheFilename(kit_dir)
+
+        if os.path.isfile(filename):
+            try:
+                with open(filename) as f:
+                    content = json.load(f)
+
+                if content.get("format") == _HASH_CACHE_FORMAT_VERSION:
+                    return cls(kit_dir, content["objects"], content["payloads"])
+
+            except (ValueError, KeyError):
+                # The cache is corrupt; it will be overwritten
+                pass
+
+        return cls(kit_dir)
+
+    # ----------------------------------------------------------------------
+    def Save(self):
+        if not self._is_modified:
+            return
+
+        filename = GetHashCacheFilename(self.kit_dir)
+
+        dirname = os.path.dirname(filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _HASH_CACHE_FORMAT_VERSION,
+                    "objects": self.objects,
+                    "payloads": self.payloads,
+                },
+                f,
+            )
+
+        os.replace(temp_filename, filename)
+
+        self._is_modified = False
+
+    # ----------------------------------------------------------------------
+    def GetHash(self, repository, object_id):
+        """Returns the SHA256 of the object, hashing it only if it hasn't been hashed before"""
+
+        object_hash = self.objects.get(object_id)
+
+        if object_hash is None:
+            object_hash = repository.Hash(object_id)
+
+            self.objects[object_id] = object_hash
+            self._is_modified = True
+
+        return object_hash
+
+    # ----------------------------------------------------------------------
+    def IsVerified(self, key, object_ids):
+        return self.payloads.get(key) == object_ids
+
+    # ----------------------------------------------------------------------
+    def SetVerified(self, key, object_ids):
+        self.payloads[key] = object_ids
+        self._is_modified = True
+
+
+# ----------------------------------------------------------------------
+def GetHashCacheFilename(kit_dir):
+    return os.path.join(_kit_manifest.GetMetadataDir(kit_dir), HASH_CACHE_FILENAME)
+
+
+# ----------------------------------------------------------------------
+def LoadCustomData(repository):
+    """\
+    Returns (_CUSTOM_DATA, _MERKLE_ROOTS) as committed; the values are read from
+    _custom_data.py without executing it.
+    """
+
+    content = repository.ReadFile(repository.GetRelativePath(os.path.join(_script_dir, "_custom_data.py")))
+    if content is None:
+        raise Exception("_custom_data.py is not committed")
+
+    values = {}
+
+    for node in ast.parse(content.decode("utf-8")).body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id in ["_CUSTOM_DATA", "_MERKLE_ROOTS"]
+        ):
+            values[node.targets[0].id] = ast.literal_eval(node.value)
+
+    return values.get("_CUSTOM_DATA", []), values.get("_MERKLE_ROOTS", {})
+
+
+# ----------------------------------------------------------------------
+def IsAffected(kit_dir, changed_filenames):
+    """\
+    Returns True if any of the changed files (absolute or relative to the repository root) are
+    part of the kit's payload; when `kit_dir` is None, files that are part of the payload of any
+    kit are considered. Nothing is read from the repository.
+    """
+
+    custom_data_filename = os.path.normcase(os.path.join(_script_dir, "_custom_data.py"))
+
+    if kit_dir is not None:
+        kit_dir = os.path.normcase(os.path.realpath(kit_dir))
+
+    for filename in changed_filenames:
+        filename = os.path.normcase(os.path.realpath(os.path.join(_script_dir, filename)))
+
+        if filename == custom_data_filename:
+            return True
+
+        if kit_dir is None:
+            # Payload files are in the kit dir or its '_Chunks' dir
+            if any(
+                name.startswith(PAYLOAD_PREFIXES)
+                for name in os.path.relpath(filename, _script_dir).split(os.path.sep)[-2:]
+            ):
+                return True
+
+            continue
+
+        relative_path = os.path.relpath(filename, kit_dir)
+        if relative_path.startswith(os.pardir):
+            continue
+
+        if relative_path.split(os.path.sep)[0].startswith(PAYLOAD_PREFIXES):
+            return True
+
+    return False
+
+
+# ----------------------------------------------------------------------
+def Validate(
+    name,
+    version,
+    kit_dir,
+    repository,
+    merkle_root,
+    changed_filenames=None,
+):
+    """\
+    Returns a list of errors (the list is empty if the payload is consistent). The payload is
+    read from `repository` and `merkle_root` is the root recorded for `version` in the
+    committed _custom_data.py (or None if it isn't recorded, in which case the Merkle root of
+    the payload isn't checked).
+
+    When `changed_filenames` is provided, nothing is validated unless the payload (or
+    _custom_data.py) has changed.
+    """
+
+    if changed_filenames is not None and not IsAffected(kit_dir, changed_filenames):
+        return []
+
+    files = repository.ListFiles(repository.GetRelativePath(kit_dir))
+
+    part_names = sorted(relative_path for relative_path in files if _kit_install.PART_REGEX.match(relative_path))
+
+    if not part_names and _kit_pack.INDEX_FILENAME not in files and _kit_chunks.INDEX_FILENAME not in files:
+        return ["'{}' does not contain '_Install.7z.NNN' parts, a pack, or chunks".format(name)]
+
+    hash_cache = HashCache.Load(kit_dir)
+    staging = _Staging(repository, files)
+
+    errors = []
+
+    try:
+        if part_names:
+            errors += _ValidateParts(name, version, files, part_names, repository, hash_cache, staging)
+
+        if _kit_pack.INDEX_FILENAME in files:
+            errors += _ValidatePack(name, version, merkle_root, files, repository, hash_cache, staging)
+
+        if _kit_chunks.INDEX_FILENAME in files:
+            errors += _ValidateChunks(name, version, merkle_root, files, hash_cache, staging)
+
+        if _kit_delta.INDEX_FILENAME in files:
+            errors += _ValidateDelta(name, version, merkle_root, files, repository, hash_cache, staging)
+
+        return errors
+
+    finally:
+        staging.Delete()
+        hash_cache.Save()
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+class _Staging(object):
+    """Temporary dir that committed payload files are written to (when they are needed) so that they are read by the same code as installs"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, repository, files):
+        self._repository                    = repository
+        self._files                         = files
+        self._dir                           = None
+        self._written                       = set()
+
+    # ----------------------------------------------------------------------
+    def Get(self, relative_paths):
+        """Returns the staging dir after the files have been written to it"""
+
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp()
+
+        for relative_path in relative_paths:
+            if relative_path in self._written:
+                continue
+
+            self._repository.Write(
+                self._files[relative_path][0],
+                os.path.join(self._dir, *relative_path.split("/")),
+            )
+
+            self._written.add(relative_path)
+
+        return self._dir
+
+    # ----------------------------------------------------------------------
+    def Delete(self):
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+
+# ----------------------------------------------------------------------
+def _ValidateParts(name, version, files, part_names, repository, hash_cache, staging):
+    for expected_index, part_name in enumerate(part_names):
+        if int(_kit_install.PART_REGEX.match(part_name).group("index")) != expected_index + 1:
+            return ["'_Install.7z.{:03d}' in '{}' does not exist".format(expected_index + 1, name)]
+
+    errors = []
+
+    if _parts_manifest.PARTS_MANIFEST_FILENAME in files:
+        parts_manifest = _parts_manifest.PartsManifest.Load(staging.Get([_parts_manifest.PARTS_MANIFEST_FILENAME]))
+    else:
+        parts_manifest = None
+
+    if parts_manifest is not None:
+        if parts_manifest.version != version:
+            return [
+                "'{}' in '{}' describes the version '{}' but '{}' is declared in _CUSTOM_DATA".format(
+                    _parts_manifest.PARTS_MANIFEST_FILENAME,
+                    name,
+                    parts_manifest.version,
+                    version,
+                ),
+            ]
+
+        errors += _CheckParts(name, files, parts_manifest.parts, repository, hash_cache)
+
+        errors += [
+            "'{}' in '{}' is not in '{}'".format(part_name, name, _parts_manifest.PARTS_MANIFEST_FILENAME)
+            for part_name in part_names
+            if part_name not in set(part.name for part in parts_manifest.parts)
+        ]
+
+        if errors:
+            return errors
+
+    # The archive is only hashed when the payload has been updated
+    object_ids = [files[part_name][0] for part_name in part_names]
+    key = "archive:{}".format(version)
+
+    if not hash_cache.IsVerified(key, object_ids):
+        hasher = hashlib.sha256()
+
+        for object_id in object_ids:
+            for block in repository.Read(object_id):
+                hasher.update(block)
+
+        if hasher.hexdigest() != version:
+            return [
+                "The hash of the archive formed by the parts in '{}' is '{}' but '{}' is declared in _CUSTOM_DATA".format(
+                    name,
+                    hasher.hexdigest(),
+                    version,
+                ),
+            ]
+
+        hash_cache.SetVerified(key, object_ids)
+
+    return errors
+
+
+# ----------------------------------------------------------------------
+def _ValidatePack(name, version, merkle_root, files, repository, hash_cache, staging):
+    index = _kit_pack.PackIndex.Load(staging.Get([_kit_pack.INDEX_FILENAME]))
+
+    errors = _CheckIndex(name, version, merkle_root, _kit_pack.INDEX_FILENAME, index)
+    if errors:
+        return errors
+
+    part_infos = [_parts_manifest.PartInfo(part["name"], part["size"], part["hash"]) for part in index.parts]
+
+    errors = _CheckParts(name, files, part_infos, repository, hash_cache)
+    if errors:
+        return errors
+
+    # ----------------------------------------------------------------------
+    def Verify(kit_dir):
+        chunk_paths = {}
+
+        for relative_path, info in index.files.items():
+            chunk_paths.setdefault(info.chunk, []).append(relative_path)
+
+        for chunk_index, relative_paths in chunk_paths.items():
+            content = _kit_pack.ReadChunk(kit_dir, index, chunk_index)
+
+            for relative_path in relative_paths:
+                info = index.files[relative_path]
+
+                if hashlib.sha256(content[info.offset : info.offset + info.size]).hexdigest() != info.hash:
+                    raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+    # ----------------------------------------------------------------------
+
+    return _VerifyContent(
+        name,
+        "pack:{}".format(version),
+        files,
+        [_kit_pack.INDEX_FILENAME] + [part.name for part in part_infos],
+        Verify,
+        hash_cache,
+        staging,
+    )
+
+
+# ----------------------------------------------------------------------
+def _ValidateChunks(name, version, merkle_root, files, hash_cache, staging):
+    index = _kit_chunks.ChunkIndex.Load(staging.Get([_kit_chunks.INDEX_FILENAME]))
+
+    errors = _CheckIndex(name, version, merkle_root, _kit_chunks.INDEX_FILENAME, index)
+    if errors:
+        return errors
+
+    chunk_paths = [_kit_chunks.GetChunkRelativePath(chunk.id) for chunk in index.chunks]
+
+    for chunk, relative_path in zip(index.chunks, chunk_paths):
+        if relative_path not in files:
+            errors.append("'{}' in '{}' does not exist".format(relative_path, name))
+        elif files[relative_path][1] != chunk.compressed_size:
+            errors.append(
+                "'{}' in '{}' contains {} bytes but {} are expected".format(
+                    relative_path,
+                    name,
+                    files[relative_path][1],
+                    chunk.compressed_size,
+                ),
+            )
+
+    if errors:
+        return errors
+
+    # ----------------------------------------------------------------------
+    def Verify(kit_dir):
+        # Files may span chunks, so each file is hashed as the chunks that contain it are read
+        # (in order).
+        chunk_paths = {}
+        hashers = {}
+
+        for relative_path, info in index.files.items():
+            chunk_indexes = index.GetChunkIndexes(relative_path)
+
+            if not chunk_indexes:
+                if hashlib.sha256(b"").hexdigest() != info.hash:
+                    raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+                continue
+
+            for chunk_index in chunk_indexes:
+                chunk_paths.setdefault(chunk_index, []).append(relative_path)
+
+            hashers[relative_path] = (hashlib.sha256(), chunk_indexes[-1])
+
+        for chunk_index in sorted(chunk_paths):
+            content = _kit_chunks.ReadChunk(kit_dir, index, chunk_index)
+            chunk_offset = index.chunk_offsets[chunk_index]
+
+            for relative_path in chunk_paths[chunk_index]:
+                info = index.files[relative_path]
+                hasher, last_chunk_index = hashers[relative_path]
+
+                hasher.update(
+                    content[
+                        max(info.offset - chunk_offset, 0) : info.offset + info.size - chunk_offset
+                    ],
+                )
+
+                if chunk_index == last_chunk_index and hasher.hexdigest() != info.hash:
+                    raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+    # ----------------------------------------------------------------------
+
+    return _VerifyContent(
+        name,
+        "chunks:{}".format(version),
+        files,
+        [_kit_chunks.INDEX_FILENAME] + chunk_paths,
+        Verify,
+        hash_cache,
+        staging,
+    )
+
+
+# ----------------------------------------------------------------------
+def _ValidateDelta(name, version, merkle_root, files, repository, hash_cache, staging):
+    index = _kit_delta.DeltaIndex.Load(staging.Get([_kit_delta.INDEX_FILENAME]))
+
+    if index is None:
+        return ["The format of '{}' in '{}' is not supported".format(_kit_delta.INDEX_FILENAME, name)]
+
+    if index.version != version:
+        return [
+            "'{}' in '{}' upgrades to the version '{}' but '{}' is declared in _CUSTOM_DATA".format(
+                _kit_delta.INDEX_FILENAME,
+                name,
+                index.version,
+                version,
+            ),
+        ]
+
+    actual_root = index.merkle_nodes.get(_merkle_tree.ROOT_NODE)
+    if merkle_root is not None and actual_root != merkle_root:
+        return [
+            "The Merkle root in '{}' in '{}' is '{}' but '{}' is recorded in _custom_data.py".format(
+                _kit_delta.INDEX_FILENAME,
+                name,
+                actual_root,
+                merkle_root,
+            ),
+        ]
+
+    part_infos = [_parts_manifest.PartInfo(part["name"], part["size"], part["hash"]) for part in index.parts]
+
+    errors = _CheckParts(name, files, part_infos, repository, hash_cache)
+    if errors:
+        return errors
+
+    # ----------------------------------------------------------------------
+    def Verify(kit_dir):
+        for relative_path, info in index.files.items():
+            with open(os.path.join(kit_dir, index.parts[info.part]["name"]), "rb") as f:
+                f.seek(info.offset)
+                content = lzma.decompress(f.read(info.compressed_size))
+
+            if len(content) != info.size or hashlib.sha256(content).hexdigest() != info.hash:
+                raise Exception("The content of '{}' is corrupt".format(relative_path))
+
+    # ----------------------------------------------------------------------
+
+    return _VerifyContent(
+        name,
+        "delta:{}".format(version),
+        files,
+        [_kit_delta.INDEX_FILENAME] + [part.name for part in part_infos],
+        Verify,
+        hash_cache,
+        staging,
+    )
+
+
+# ----------------------------------------------------------------------
+def _CheckIndex(name, version, merkle_root, index_filename, index):
+    """Returns errors if the index isn't for `version` or the files that it describes don't have the Merkle root (when it is recorded)"""
+
+    if index is None:
+        return ["The format of '{}' in '{}' is not supported".format(index_filename, name)]
+
+    if index.version != version:
+        return [
+            "'{}' in '{}' describes the version '{}' but '{}' is declared in _CUSTOM_DATA".format(
+                index_filename,
+                name,
+                index.version,
+                version,
+            ),
+        ]
+
+    if merkle_root is None:
+        return []
+
+    actual_root = _merkle_tree.GetRoot({k: (v.size, v.hash) for k, v in index.files.items()})
+
+    if actual_root != merkle_root:
+        return [
+            "The Merkle root of the content in '{}' in '{}' is '{}' but '{}' is recorded in _custom_data.py".format(
+                index_filename,
+                name,
+                actual_root,
+                merkle_root,
+            ),
+        ]
+
+    return []
+
+
+# ----------------------------------------------------------------------
+def _CheckParts(name, files, part_infos, repository, hash_cache):
+    """Returns errors for parts (_parts_manifest.PartInfo) that don't exist or don't have the expected size and hash"""
+
+    errors = []
+
+    for part in part_infos:
+        if part.name not in files:
+            errors.append("'{}' in '{}' does not exist".format(part.name, name))
+            continue
+
+        object_id, size = files[part.name]
+
+        if size != part.size:
+            errors.append("'{}' in '{}' contains {} bytes but {} are expected".format(part.name, name, size, part.size))
+            continue
+
+        # Only objects that haven't been validated before are hashed
+        part_hash = hash_cache.GetHash(repository, object_id)
+
+        if part_hash != part.hash:
+            errors.append(
+                "The hash of '{}' in '{}' is '{}' but '{}' is expected".format(
+                    part.name,
+                    name,
+                    part_hash,
+                    part.hash,
+                ),
+            )
+
+    return errors
+
+
+# ----------------------------------------------------------------------
+def _VerifyContent(name, key, files, relative_paths, verify_func, hash_cache, staging):
+    """\
+    Verifies the content of the payload with `verify_func` (which is invoked with the dir
+    that the payload files were written to) unless the objects were verified before.
+    """
+
+    object_ids = [files[relative_path][0] for relative_path in relative_paths]
+
+    if hash_cache.IsVerified(key, object_ids):
+        return []
+
+    try:
+        verify_func(staging.Get(relative_paths))
+    except Exception as ex:
+        return ["The payload in '{}' is not valid: {}".format(name, ex)]
+
+    hash_cache.SetVerified(key, object_ids)
+
+    return []
+
+
+# ----------------------------------------------------------------------
+def _Git(dirname, *args):
+    return subprocess.check_output(["git"] + list(args), cwd=dirname)
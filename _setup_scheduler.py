@@ -0,0 +1,188 @@
+# ----------------------------------------------------------------------
+# |
+# |  _setup_scheduler.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 18:14:51
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Installs the kits in _CUSTOM_DATA, running independent kits at the same time.
+
+Each kit is installed (and indexed) by a task on a bounded pool, and errors are reported per
+kit. The hashing workers available on the machine are divided between the tasks that run at
+the same time, so running kits concurrently never oversubscribes the machine.
+
+_CUSTOM_DATA currently contains a single kit, so the pool only adds concurrency once more
+versions are shipped. This module doesn't implement a separate read/decompress/write/hash
+pipeline within a kit; the installers overlap those stages themselves:
+
+    - 7-Zip reads and decompresses the parts (as the volumes of one archive) while another
+      thread hashes them; the page cache bounds the work in flight.
+    - Packed and chunked kits decompress, write, and hash independent chunks on a bounded
+      pool of workers.
+"""
+
+import os
+import time
+import traceback
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import CommonEnvironment
+
+import _case_folded_overlay
+import _include_index
+import _kit_hashing
+import _kit_operations
+import _symbol_index
+import _trace
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Environment variable that overrides the number of kits installed at the same time
+NUM_PARALLEL_INSTALLS_ENV_VAR               = "DEVELOPMENT_ENVIRONMENT_WINDOWS_KITS_PARALLEL_INSTALLS"
+
+# ----------------------------------------------------------------------
+# `merkle_root` is the root recorded for the version in _custom_data.py (None if it isn't recorded,
+# in which case the kit is only verified against the version)
+Entry                                       = namedtuple("Entry", ["name", "version", "kit_dir", "merkle_root"])
+
+
+# ----------------------------------------------------------------------
+class EntryResult(namedtuple("EntryResult", ["entry", "return_code", "output", "elapsed"])):
+    """Result of installing a single entry"""
+
+    # ----------------------------------------------------------------------
+    @property
+    def IsSuccessful(self):
+        return self.return_code == 0
+
+    # ----------------------------------------------------------------------
+    def __str__(self):
+        return "Installing '{}' {} ({}){}".format(
+            self.entry.name,
+            "succeeded" if self.IsSuccessful else "failed",
+            self.return_code,
+            "\n\n{}".format(self.output.rstrip()) if self.output.strip() else "",
+        )
+
+
+# ----------------------------------------------------------------------
+def GetNumParallelInstalls(num_entries, max_parallel=None):
+    if max_parallel is None:
+        max_parallel = os.getenv(NUM_PARALLEL_INSTALLS_ENV_VAR)
+        if max_parallel:
+            max_parallel = int(max_parallel)
+        else:
+            max_parallel = num_entries
+
+    if max_parallel < 1:
+        raise Exception("'{}' is not a valid number of parallel installs".format(max_parallel))
+
+    return max(1, min(max_parallel, num_entries))
+
+
+# ----------------------------------------------------------------------
+def Run(
+    entries,
+    configurations,
+    architectures=None,
+    max_parallel=None,
+    max_workers=None,
+    create_overlay=False,
+    on_complete=None,
+):
+    """\
+    Installs and indexes the entries, returning an EntryResult for each (in the order provided).
+
+    A failure in one entry does not prevent the others from being installed. `on_complete`
+    is invoked with each EntryResult as it completes. When `create_overlay` is True, the
+    case-folded overlay used when cross-compiling is built for each entry.
+    """
+
+    if not entries:
+        return []
+
+    max_parallel = GetNumParallelInstalls(len(entries), max_parallel)
+
+    # Divide the hashing workers between the entries that are installed at the same time
+    max_workers = max(1, _kit_hashing.GetNumWorkers(max_workers) // max_parallel)
+
+    # ----------------------------------------------------------------------
+    def Task(entry):
+        start = time.perf_counter()
+
+        try:
+            with _trace.Span("InstallEntry", name=entry.name):
+                result = _kit_operations.Install(
+                    entry.name,
+                    entry.kit_dir,
+                    entry.version,
+                    max_workers=max_workers,
+                    architectures=architectures,
+                    merkle_root=entry.merkle_root,
+                )
+
+                return_code = result.return_code
+                output = result.output
+
+                if result.IsSuccessful:
+                    # Index the headers so that build tools can resolve includes without searching
+                    # the Include directory; hashes are reused from the manifest.
+                    with _trace.Span("IncludeIndex", name=entry.name):
+                        _include_index.Create(
+                            entry.kit_dir,
+                            {},
+                            max_workers=max_workers,
+                        ).Save(entry.kit_dir)
+
+                    # Index the symbols exported by the libraries added to LIB for each configuration;
+                    # libraries that are unchanged since the previous index was written are not read again.
+                    for configuration in configurations:
+                        with _trace.Span("SymbolIndex", name=entry.name, configuration=configuration):
+                            _symbol_index.Update(
+                                entry.kit_dir,
+                                configuration,
+                                {},
+                                max_workers=max_workers,
+                            )
+
+                    # The overlay is only rebuilt when the installed content has changed
+                    if create_overlay:
+                        with _trace.Span("CaseFoldedOverlay", name=entry.name):
+                            _case_folded_overlay.Update(
+                                entry.kit_dir,
+                                {},
+                                max_workers=max_workers,
+                            )
+
+        except Exception:
+            return_code = -1
+            output = traceback.format_exc()
+
+        entry_result = EntryResult(entry, return_code, output, time.perf_counter() - start)
+
+        if on_complete is not None:
+            on_complete(entry_result)
+
+        return entry_result
+
+    # ----------------------------------------------------------------------
+
+    if max_parallel == 1:
+        return [Task(entry) for entry in entries]
+
+    with ThreadPoolExecutor(max_parallel) as executor:
+        return list(executor.map(_trace.Bind(Task), entries))
@@ -0,0 +1,468 @@
+# ----------------------------------------------------------------------
+# |
+# |  _symbol_index.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 15:03:44
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Index of the symbols exported by the '.lib' archives added to LIB during activation.
+
+An index is created for each configuration by reading the linker member of every archive in
+'Lib/<version>/ucrt/<arch>' and 'Lib/<version>/um/<arch>'. Archives whose content hasn't
+changed are not read again when the index is rebuilt (for example, after the kit version
+changes).
+"""
+
+import json
+import os
+import struct
+import sys
+
+from collections import namedtuple
+
+import CommonEnvironment
+from CommonEnvironment import CommandLine
+from CommonEnvironment.StreamDecorator import StreamDecorator
+
+sys.path.insert(0, os.getenv("DEVELOPMENT_ENVIRONMENT_FUNDAMENTAL"))
+from RepositoryBootstrap.Impl.ActivationActivity import ActivationActivity
+
+del sys.path[0]
+
+import _activation_plan
+import _kit_hashing
+import _kit_manifest
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+INDEX_FILENAME_TEMPLATE                     = "SymbolIndex.{configuration}.json"
+
+# The subdirs added to LIB during activation, in order
+LIB_SUBDIRS                                 = ["ucrt", "um"]
+
+_INDEX_FORMAT_VERSION                       = 1
+
+_ARCHIVE_SIGNATURE                          = b"!<arch>\n"
+_ARCHIVE_HEADER_SIZE                        = 60
+
+# ----------------------------------------------------------------------
+SymbolInfo                                  = namedtuple("SymbolInfo", ["lib", "member"])
+
+
+# ----------------------------------------------------------------------
+class LibInfo(namedtuple("LibInfo", ["size", "hash", "members", "symbols"])):
+    """\
+    Content of a single archive.
+
+    `members` is a list of member names and `symbols` is a dict of symbol -> index in `members`.
+    """
+
+
+# ----------------------------------------------------------------------
+class SymbolIndex(object):
+    """Symbols exported by the archives of a configuration"""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, configuration, lib_dir, libs):
+        self.configuration                  = configuration
+        self.lib_dir                        = lib_dir
+        self.libs                           = libs
+
+        self._lookup                        = {}
+
+        # Archives are added in LIB order so that the first result is the one the linker uses
+        for lib in sorted(libs, key=_LibSortKey):
+            info = libs[lib]
+
+            for symbol, member_index in info.symbols.items():
+                self._lookup.setdefault(symbol, []).append(
+                    SymbolInfo(lib, info.members[member_index]),
+                )
+
+    # ----------------------------------------------------------------------
+    @property
+    def NumSymbols(self):
+        return len(self._lookup)
+
+    # ----------------------------------------------------------------------
+    def Find(self, symbol):
+        """Returns a list of SymbolInfo for every archive that exports the symbol (in LIB order)"""
+
+        return self._lookup.get(symbol, [])
+
+    # ----------------------------------------------------------------------
+    def GetFullpath(self, lib):
+        return os.path.join(self.lib_dir, *lib.split("/"))
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Load(cls, kit_dir, configuration):
+        """Returns the index associated with the kit and configuration or None if an index doesn't exist"""
+
+        filename = GetIndexFilename(kit_dir, configuration)
+        if not os.path.isfile(filename):
+            return None
+
+        with open(filename) as f:
+            content = json.load(f)
+
+        if content.get("format") != _INDEX_FORMAT_VERSION:
+            return None
+
+        return cls(
+            configuration,
+            os.path.join(kit_dir, *content["lib_dir"].split("/")),
+            {
+                lib: LibInfo(
+                    value["size"],
+                    value["hash"],
+                    value["members"],
+                    value["symbols"],
+                )
+                for lib, value in content["libs"].items()
+            },
+        )
+
+    # ----------------------------------------------------------------------
+    def Save(self, kit_dir):
+        filename = GetIndexFilename(kit_dir, self.configuration)
+
+        dirname = os.path.dirname(filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        temp_filename = "{}.tmp".format(filename)
+
+        with open(temp_filename, "w") as f:
+            json.dump(
+                {
+                    "format": _INDEX_FORMAT_VERSION,
+                    "lib_dir": os.path.relpath(self.lib_dir, kit_dir).replace(os.path.sep, "/"),
+                    "libs": {lib: info._asdict() for lib, info in self.libs.items()},
+                },
+                f,
+                separators=(",", ":"),
+            )
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def GetIndexFilename(kit_dir, configuration):
+    return os.path.join(
+        _kit_manifest.GetMetadataDir(kit_dir),
+        INDEX_FILENAME_TEMPLATE.format(configuration=configuration),
+    )
+
+
+# ----------------------------------------------------------------------
+def ReadArchiveSymbols(filename):
+    """\
+    Returns (members, symbols) for a COFF archive, where `members` is a list of member names
+    and `symbols` is a dict of symbol -> index in `members`.
+
+    Only the first linker member and the headers of the members that it references are read.
+    """
+
+    with open(filename, "rb") as f:
+        if f.read(len(_ARCHIVE_SIGNATURE)) != _ARCHIVE_SIGNATURE:
+            raise Exception("'{}' is not a COFF archive".format(filename))
+
+        header_name, content_size = _ReadMemberHeader(f, filename)
+        if header_name != "/":
+            # The archive doesn't have a symbol table
+            return [], {}
+
+        content = f.read(content_size)
+        if len(content) != content_size:
+            raise Exception("The linker member in '{}' is truncated".format(filename))
+
+        (num_symbols,) = struct.unpack_from(">I", content, 0)
+        offsets = struct.unpack_from(">{}I".format(num_symbols), content, 4)
+        names = content[4 + 4 * num_symbols:].split(b"\0")[:num_symbols]
+
+        # The long names member (if any) follows the optional second linker member
+        long_names = b""
+
+        f.seek(_Align(f.tell()))
+
+        for _ in range(2):
+            header = f.read(_ARCHIVE_HEADER_SIZE)
+            if len(header) != _ARCHIVE_HEADER_SIZE:
+                break
+
+            name = header[:16].decode("ascii").rstrip()
+            size = int(header[48:58].decode("ascii").strip())
+
+            if name == "//":
+                long_names = f.read(size)
+                break
+
+            if name != "/":
+                break
+
+            f.seek(_Align(f.tell() + size))
+
+        # Resolve the name of each member referenced by the symbol table
+        members = []
+        member_lookup = {}
+
+        for offset in sorted(set(offsets)):
+            f.seek(offset)
+            member_name, _ = _ReadMemberHeader(f, filename)
+
+            if member_name.startswith("/") and member_name[1:].isdigit():
+                start = int(member_name[1:])
+                end = long_names.find(b"\0", start)
+                if end == -1:
+                    end = len(long_names)
+
+                member_name = long_names[start:end].decode("utf-8").rstrip("/\n")
+            else:
+                member_name = member_name.rstrip("/")
+
+            member_lookup[offset] = len(members)
+            members.append(member_name)
+
+        return (
+            members,
+            {
+                name.decode("utf-8"): member_lookup[offset]
+                for name, offset in zip(names, offsets)
+            },
+        )
+
+
+# ----------------------------------------------------------------------
+def Create(
+    kit_dir,
+    configuration,
+    library_version_info,
+    previous_index=None,
+    max_workers=None,
+):
+    """\
+    Creates the index for a configuration.
+
+    Archives whose size and hash match an archive with the same name in `previous_index` are
+    not read; hashes are taken from the kit's manifest when it is available.
+    """
+
+    lib_dir = ActivationActivity.GetVersionedDirectory(
+        library_version_info,
+        kit_dir,
+        "Lib",
+    )
+    assert os.path.isdir(lib_dir), lib_dir
+
+    manifest = _kit_manifest.Manifest.Load(kit_dir)
+    manifest_files = manifest.files if manifest is not None else {}
+
+    manifest_prefix = "{}/".format(os.path.relpath(lib_dir, kit_dir).replace(os.path.sep, "/"))
+
+    previous_libs = previous_index.libs if previous_index is not None else {}
+
+    items = []
+    to_hash = []
+
+    for lib_subdir in LIB_SUBDIRS:
+        this_dir = os.path.join(lib_dir, lib_subdir, configuration)
+        if not os.path.isdir(this_dir):
+            continue
+
+        for item in os.listdir(this_dir):
+            if not item.lower().endswith(".lib"):
+                continue
+
+            fullpath = os.path.join(this_dir, item)
+            if not os.path.isfile(fullpath):
+                continue
+
+            lib = "{}/{}/{}".format(lib_subdir, configuration, item)
+            size = os.path.getsize(fullpath)
+
+            info = manifest_files.get("{}{}".format(manifest_prefix, lib))
+            if info is not None and info.size == size:
+                file_hash = info.hash
+            else:
+                file_hash = None
+                to_hash.append((lib, fullpath, size))
+
+            items.append((lib, fullpath, size, file_hash))
+
+    hashes = _kit_hashing.HashFiles(to_hash, max_workers=max_workers)
+
+    libs = {}
+
+    for lib, fullpath, size, file_hash in items:
+        file_hash = file_hash or hashes[lib]
+
+        previous_info = previous_libs.get(lib)
+        if (
+            previous_info is not None
+            and previous_info.size == size
+            and previous_info.hash == file_hash
+        ):
+            libs[lib] = previous_info
+            continue
+
+        members, symbols = ReadArchiveSymbols(fullpath)
+        libs[lib] = LibInfo(size, file_hash, members, symbols)
+
+    return SymbolIndex(configuration, lib_dir, libs)
+
+
+# ----------------------------------------------------------------------
+def Update(
+    kit_dir,
+    configuration,
+    library_version_info,
+    max_workers=None,
+):
+    """Creates and saves the index for a configuration, reusing the content of the existing index"""
+
+    index = Create(
+        kit_dir,
+        configuration,
+        library_version_info,
+        previous_index=SymbolIndex.Load(kit_dir, configuration),
+        max_workers=max_workers,
+    )
+    index.Save(kit_dir)
+
+    return index
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Command Line Functionality
+# |
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    configuration=CommandLine.StringTypeInfo(
+        arity="+",
+    ),
+    kit_dir=CommandLine.DirectoryTypeInfo(
+        arity="?",
+    ),
+    max_workers=CommandLine.IntTypeInfo(
+        min=1,
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Build(
+    configuration,
+    kit_dir=None,
+    max_workers=None,
+    output_stream=sys.stdout,
+):
+    """Builds the symbol index for each configuration"""
+
+    kit_dir = kit_dir or _activation_plan.GetKitDir()
+
+    with StreamDecorator(output_stream).DoneManager(
+        line_prefix="",
+        prefix="\nResults: ",
+        suffix="\n",
+    ) as dm:
+        for this_configuration in configuration:
+            dm.stream.write("Indexing '{}'...".format(this_configuration))
+            with dm.stream.DoneManager() as this_dm:
+                index = Update(
+                    kit_dir,
+                    this_configuration,
+                    {},
+                    max_workers=max_workers,
+                )
+
+                this_dm.stream.write(
+                    "{} symbols in {} libraries were indexed.\n".format(
+                        index.NumSymbols,
+                        len(index.libs),
+                    ),
+                )
+
+        return dm.result
+
+
+# ----------------------------------------------------------------------
+@CommandLine.EntryPoint
+@CommandLine.Constraints(
+    configuration=CommandLine.StringTypeInfo(),
+    symbol=CommandLine.StringTypeInfo(
+        arity="+",
+    ),
+    kit_dir=CommandLine.DirectoryTypeInfo(
+        arity="?",
+    ),
+    output_stream=None,
+)
+def Find(
+    configuration,
+    symbol,
+    kit_dir=None,
+    output_stream=sys.stdout,
+):
+    """Writes the libraries (and archive members) that export each symbol"""
+
+    kit_dir = kit_dir or _activation_plan.GetKitDir()
+
+    index = SymbolIndex.Load(kit_dir, configuration)
+    if index is None:
+        output_stream.write(
+            "ERROR: The symbol index for '{}' does not exist; please run Setup.\n".format(configuration),
+        )
+        return -1
+
+    result = 0
+
+    for this_symbol in symbol:
+        infos = index.Find(this_symbol)
+        if not infos:
+            output_stream.write("ERROR: '{}' was not found.\n".format(this_symbol))
+            result = -1
+
+            continue
+
+        output_stream.write("{}\n".format(this_symbol))
+
+        for info in infos:
+            output_stream.write("    {} ({})\n".format(index.GetFullpath(info.lib), info.member))
+
+    return result
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Align(offset):
+    return offset + (offset & 1)
+
+
+# ----------------------------------------------------------------------
+def _ReadMemberHeader(f, filename):
+    header = f.read(_ARCHIVE_HEADER_SIZE)
+    if len(header) != _ARCHIVE_HEADER_SIZE or header[58:60] != b"`\n":
+        raise Exception("An invalid member header was encountered in '{}'".format(filename))
+
+    return header[:16].decode("ascii").rstrip(), int(header[48:58].decode("ascii").strip())
+
+
+# ----------------------------------------------------------------------
+def _LibSortKey(lib):
+    lib_subdir, _, name = lib.split("/", 2)
+    return LIB_SUBDIRS.index(lib_subdir), name.lower()
@@ -0,0 +1,251 @@
+# ----------------------------------------------------------------------
+# |
+# |  _trace.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-17 16:48:30
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""\
+Opt-in timing trace for Setup and Activation.
+
+When the environment variable is defined, the spans recorded during Setup and Activation
+(with durations and the number of bytes read and hashed) are written to the file that it
+names in the Chrome trace event format; the file can be viewed with chrome://tracing or
+https://ui.perfetto.dev. Spans are appended to the file when it already exists, so a Setup
+followed by several activations produces a single trace.
+
+Byte counts are added to the innermost span open on the calling thread. Functions run by
+worker threads are wrapped with `Bind` so that their counts are added to the span that submitted
+them; when a span ends, its counts are added to the span that encloses it.
+
+Recording is a no-op when the environment variable isn't defined.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+
+from contextlib import contextmanager
+
+import CommonEnvironment
+
+import _file_lock
+
+# ----------------------------------------------------------------------
+_script_fullpath                            = CommonEnvironment.ThisFullpath()
+_script_dir, _script_name                   = os.path.split(_script_fullpath)
+# ----------------------------------------------------------------------
+
+# Environment variable that enables tracing; the value is the name of the trace file
+TRACE_FILENAME_ENV_VAR                      = "DEVELOPMENT_ENVIRONMENT_WINDOWS_KITS_TRACE"
+
+# Guards `_events` and the counters of every span; a span's counters are updated by each of
+# the worker threads bound to it.
+_lock                                       = threading.Lock()
+_events                                     = []
+
+# The counters of the spans open on each thread, from outermost to innermost
+_thread_data                                = threading.local()
+
+
+# ----------------------------------------------------------------------
+def IsEnabled():
+    return bool(os.getenv(TRACE_FILENAME_ENV_VAR))
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def Span(span_name, **args):
+    """\
+    Records the duration of the block.
+
+    Byte counts provided to `AddCounters` while the span is open are added to the span's
+    args; counts are inclusive of work done in nested spans and by worker threads that run
+    functions wrapped with `Bind`.
+    """
+
+    if not IsEnabled():
+        yield
+        return
+
+    span_args = dict(args)
+    counters = {}
+
+    spans = _GetOpenSpans()
+    spans.append(counters)
+
+    # The wall clock time is used for the timestamp so that spans recorded by different
+    # processes can be compared; the duration uses the higher resolution counter.
+    timestamp = time.time()
+    start = time.perf_counter()
+
+    try:
+        yield
+
+    finally:
+        end = time.perf_counter()
+
+        spans.pop()
+
+        with _lock:
+            span_args.update(counters)
+
+            if spans:
+                _AddCounters(spans[-1], counters)
+
+            _events.append(
+                {
+                    "name": span_name,
+                    "ph": "X",
+                    "ts": _ToMicroseconds(timestamp),
+                    "dur": _ToMicroseconds(end - start),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": span_args,
+                },
+            )
+
+
+# ----------------------------------------------------------------------
+def AddCounters(**counters):
+    """Adds values (for example, bytes_read=<n>) to the innermost span open on the current thread"""
+
+    spans = getattr(_thread_data, "spans", None)
+    if not spans:
+        return
+
+    with _lock:
+        _AddCounters(spans[-1], counters)
+
+
+# ----------------------------------------------------------------------
+def Bind(func):
+    """\
+    Returns a function that invokes `func` with the innermost span open on the current thread
+    as its enclosing span; used for functions run by worker threads.
+    """
+
+    spans = getattr(_thread_data, "spans", None)
+    if not spans:
+        return func
+
+    counters = spans[-1]
+
+    # ----------------------------------------------------------------------
+    def Invoke(*args, **kwargs):
+        worker_spans = _GetOpenSpans()
+        worker_spans.append(counters)
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            worker_spans.pop()
+
+    # ----------------------------------------------------------------------
+
+    return Invoke
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def Session(span_name, **args):
+    """Records a span that includes all others and writes the trace when complete"""
+
+    try:
+        with Span(span_name, **args):
+            yield
+
+    finally:
+        Save()
+
+
+# ----------------------------------------------------------------------
+def Save():
+    """\
+    Appends the events recorded so far to the trace file; the file is locked while it is updated
+    so that events saved concurrently by other processes (for example, background verification)
+    aren't lost.
+    """
+
+    filename = os.getenv(TRACE_FILENAME_ENV_VAR)
+    if not filename:
+        return
+
+    with _lock:
+        events = list(_events)
+        del _events[:]
+
+    if not events:
+        return
+
+    with _file_lock.Lock("{}.lock".format(filename)):
+        content = {"traceEvents": []}
+
+        if os.path.isfile(filename):
+            try:
+                with open(filename) as f:
+                    content = json.load(f)
+            except ValueError:
+                # The trace is corrupt; it will be overwritten below
+                pass
+
+        content.setdefault("traceEvents", []).extend(events)
+
+        temp_filename = "{}.{}.tmp".format(filename, os.getpid())
+
+        with open(temp_filename, "w") as f:
+            json.dump(content, f)
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+def Execute(span_name, command_line):
+    """\
+    Runs a command that would otherwise be emitted as a shell statement so that its duration
+    can be recorded. Returns (return_code, output).
+    """
+
+    with Span(span_name, command_line=command_line):
+        result = subprocess.run(
+            command_line,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+        )
+
+    return result.returncode, result.stdout
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _GetOpenSpans():
+    spans = getattr(_thread_data, "spans", None)
+    if spans is None:
+        spans = []
+        _thread_data.spans = spans
+
+    return spans
+
+
+# ----------------------------------------------------------------------
+def _AddCounters(span_counters, counters):
+    for key, value in counters.items():
+        span_counters[key] = span_counters.get(key, 0) + value
+
+
+# ----------------------------------------------------------------------
+def _ToMicroseconds(value):
+    return int(value * 1000000)